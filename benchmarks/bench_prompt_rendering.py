@@ -0,0 +1,64 @@
+"""Benchmark per-item prompt building: the original two-pass substitution vs. the compiled template.
+
+Usage:
+    python benchmarks/bench_prompt_rendering.py [--items 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.agents import TitleAbstractReviewer
+from lattereview.providers.base_provider import BaseProvider
+
+
+class _NullProvider(BaseProvider):
+    def set_response_format(self, response_format):
+        self.response_format = response_format
+
+
+def _items(n):
+    abstract = "Background: " + "randomized controlled trial of an intervention in adults. " * 30
+    return [f"Review Task ID: A-{i}\n=== title ===\nStudy {i}\n\n=== abstract ===\n{abstract}" for i in range(n)]
+
+
+def _two_pass(reviewer, text):
+    prompt = reviewer._process_prompt(reviewer.formatted_prompt, {"item": text})
+    return reviewer._process_prompt(prompt, {"additional_context": reviewer._process_additional_context("ctx")})
+
+
+async def _compiled(reviewer, items):
+    for text in items:
+        await reviewer._build_input_prompt(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+
+    reviewer = TitleAbstractReviewer(
+        provider=_NullProvider(), inclusion_criteria="Adults", additional_context="ctx", verbose=False
+    )
+    items = _items(args.items)
+
+    started = time.perf_counter()
+    for text in items:
+        _two_pass(reviewer, text)
+    two_pass = time.perf_counter() - started
+
+    started = time.perf_counter()
+    asyncio.run(_compiled(reviewer, items))
+    compiled = time.perf_counter() - started
+
+    print(f"{args.items} items")
+    print(f"two-pass substitution: {two_pass:.2f}s ({two_pass / args.items * 1e6:.1f} us/item)")
+    print(f"compiled template:     {compiled:.2f}s ({compiled / args.items * 1e6:.1f} us/item)")
+    print(f"speedup: {two_pass / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,4 @@ from .basic_reviewer import BasicReviewer
 from .scoring_reviewer import ScoringReviewer
 from .abstraction_reviewer import AbstractionReviewer
 from .title_abstract_reviewer import TitleAbstractReviewer
+from .cascade_reviewer import CascadeReviewer
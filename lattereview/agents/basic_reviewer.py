@@ -2,14 +2,31 @@
 
 import asyncio
 import datetime
+import functools
+import json
 import os
+import time
 from pathlib import Path
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError, create_model
 import re
-from typing import List, Optional, Dict, Any, Union, Callable
+from typing import AsyncIterable, AsyncIterator, Iterable, List, Optional, Dict, Any, Tuple, Union, Callable
 from tqdm.asyncio import tqdm
+from .prompt_template import PromptTemplate, compile_prompt
+from ..utils.budget import BUDGET_EXHAUSTED, SpendingBudget, estimate_tokens, exhausted_budget
+from ..utils.cache import ResponseCache
+from ..utils.retry import MALFORMED_RESPONSE, RetryPolicy, RetryBudget, classify_error
+from ..utils.scheduler import AdaptiveConcurrencyLimiter
+from ..utils.validation import load_json, response_format_model, validate_response
 
 DEFAULT_CONCURRENT_REQUESTS = 20
+DEFAULT_MAX_ADAPTIVE_CONCURRENT_REQUESTS = 200
+DEFAULT_MAX_RETRIES = 3
+BATCH_ERROR = "batch_error"
+CHARS_PER_TOKEN = 4  # rough estimate used for pack token budgets
+TASK_ID_PATTERN = re.compile(r"^\s*Review Task ID: (\S+)")
+PROMPT_LAYOUTS = ("default", "static_prefix")
+STATIC_PREFIX_ITEM_REFERENCE = "(provided at the end of this message)"
+TOKEN_USAGE_KEYS = ("input_tokens", "output_tokens", "cached_input_tokens")
 
 
 class AgentError(Exception):
@@ -18,24 +35,77 @@ class AgentError(Exception):
     pass
 
 
+class ReviewItemError(AgentError):
+    """Raised when an item cannot be reviewed after all permitted retries."""
+
+    def __init__(self, message: str, error_type: str, attempts: int, input_prompt: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.error_type = error_type
+        self.attempts = attempts
+        self.input_prompt = input_prompt
+
+
+class _NoConcurrencyLimit:
+    """Async context manager standing in for a concurrency limiter when none is given."""
+
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _packed_response_format(format_items: Tuple[Tuple[str, Any], ...]) -> Tuple[Dict[str, Any], Any]:
+    """Build the pack format and item model of a response format once, so repeated packs reuse the same models."""
+    fields = {key: (value, ...) for key, value in format_items}
+    packed_item_model = create_model("PackedReviewItem", review_task_id=(str, ...), **fields)
+    return {"items": List[packed_item_model]}, response_format_model(dict(format_items))
+
+
+@functools.lru_cache(maxsize=256)
+def _static_prefix_template(formatted_prompt: str) -> PromptTemplate:
+    """Compile the "static_prefix" layout of a formatted prompt once, so each item only fills its trailing slots."""
+    static_prefix = compile_prompt(formatted_prompt).render(
+        {"item": STATIC_PREFIX_ITEM_REFERENCE, "additional_context": ""}
+    )
+    return PromptTemplate(f"{static_prefix} **Input item:** <<${{item}}$>> ${{additional_context}}$")
+
+
 class BasicReviewer(BaseModel):
     generic_prompt: Optional[str] = None
     prompt_path: Optional[Union[str, Path]] = None
     response_format: Dict[str, Any] = None
     provider: Optional[Any] = None
     model_args: Dict[str, Any] = {}
-    max_concurrent_requests: int = DEFAULT_CONCURRENT_REQUESTS
+    max_concurrent_requests: int = DEFAULT_CONCURRENT_REQUESTS  # per reviewer; endpoint limits live on the provider
+    adaptive_concurrency: bool = False  # if True, max_concurrent_requests is only the starting window
+    max_adaptive_concurrent_requests: int = DEFAULT_MAX_ADAPTIVE_CONCURRENT_REQUESTS
+    concurrency_history: List[Dict[str, Any]] = []
+    max_retries: int = DEFAULT_MAX_RETRIES
+    retry_policy: Optional[RetryPolicy] = None  # falls back to the provider's policy, then to max_retries
+    failures: List[Dict[str, Any]] = []  # items that failed in the latest review_items call
+    response_cache: Optional[ResponseCache] = None  # falls back to the provider's cache
+    spending_budget: Optional[SpendingBudget] = None  # caps this reviewer's dollars and tokens across its runs
     name: str = "BasicReviewer"
     backstory: str = "a generic base agent"
     input_description: str = ""
     examples: Union[str, List[Union[str, Dict[str, Any]]]] = None
     reasoning: str = None
     system_prompt: Optional[str] = None
+    packed_system_prompt: Optional[str] = None  # system prompt of multi-item requests when packing is enabled
     formatted_prompt: Optional[str] = None
     cost_so_far: float = 0
     memory: List[Dict[str, Any]] = []
     identity: Dict[str, Any] = {}
     additional_context: Optional[Union[Callable, str]] = None
+    pack_size: int = 1  # items sent together in one request; 1 disables packing
+    pack_token_budget: Optional[int] = None  # optional cap on the estimated tokens of the items in one pack
+    prompt_layout: str = "default"  # "static_prefix" moves the item and context to the end for prefix caching
+    token_usage: Dict[str, int] = {}  # input, output and cached input tokens reported by the provider
+    request_timing: Dict[str, float] = {}  # live requests sent ("requests") and the seconds they took ("seconds")
+    stream_responses: bool = False  # parse responses as they stream in, failing fast on malformed output
+    stream_stop_after: Optional[List[str]] = None  # with streaming, stop generating once these keys are complete
     verbose: bool = True
 
     class Config:
@@ -61,7 +131,11 @@ class BasicReviewer(BaseModel):
                 if not os.path.exists(self.prompt_path):
                     raise FileNotFoundError(f"Review prompt template not found at {self.prompt_path}")
                 self.generic_prompt = self.prompt_path.read_text(encoding="utf-8")
-            keys_to_replace = self._extract_prompt_keywords(self.generic_prompt)
+            if self.prompt_layout not in PROMPT_LAYOUTS:
+                raise AgentError(
+                    f"Invalid prompt_layout: {self.prompt_layout}. Must be one of {', '.join(PROMPT_LAYOUTS)}."
+                )
+            keys_to_replace = compile_prompt(self.generic_prompt).keywords
             # Remove "item" and "additional_context" from the keys as they will be populated later
             keys_to_replace = [key for key in keys_to_replace if key not in ["item", "additional_context"]]
             self.formatted_prompt = self._process_prompt(
@@ -70,6 +144,9 @@ class BasicReviewer(BaseModel):
 
             # Build the system prompt
             self.system_prompt = self._build_system_prompt()
+            self.packed_system_prompt = self._build_system_prompt(packed=True) if self._packing_enabled() else None
+            if (self.pack_size > 1 or self.pack_token_budget is not None) and callable(self.additional_context):
+                self._log(f"Warning: {self.name} reviews items one by one, as its additional context is a callable")
 
             # Build the agent's identity
             self.identity = {
@@ -78,24 +155,30 @@ class BasicReviewer(BaseModel):
                 "model_args": self.model_args,
             }
 
-            # Configure the provider
+            # The system prompt and response format are sent with each request, so the provider is never
+            # modified and can be shared by reviewers running at the same time
             if not self.provider:
                 raise AgentError("Provider not initialized")
-            self.provider.set_response_format(self.response_format)
-            self.provider.system_prompt = self.system_prompt
         except Exception as e:
             raise AgentError(f"Error in setup: {str(e)}")
 
-    def _build_system_prompt(self) -> str:
-        """Build the system prompt for the agent."""
+    def _build_system_prompt(self, packed: bool = False) -> str:
+        """Build the system prompt for the agent, or for requests reviewing several items at once if `packed`."""
         try:
+            keys = ", ".join(f"{k} ({v})" for k, v in self.response_format.items())
+            if packed:
+                output = (
+                    "Your final output should have a single key, items: a list with one entry per input item, "
+                    f"each with the following keys: review_task_id (str), {keys}."
+                )
+            else:
+                output = f"Your final output should have the following keys: {keys}."
             return self._clean_text(
                 f"""
                 Your name is: <<{self.name}>> 
                 Your backstory is: <<{self.backstory}>>.
                 Your task is to review input itmes with the following description: <<{self.input_description}>>.
-                Your final output should have the following keys: \
-                    {", ".join(f"{k} ({v})" for k, v in self.response_format.items())}.
+                {output}
                 """
             )
         except Exception as e:
@@ -170,6 +253,8 @@ class BasicReviewer(BaseModel):
         try:
             self.memory = []
             self.cost_so_far = 0
+            self.token_usage = {}
+            self.request_timing = {}
             self.identity = {}
         except Exception as e:
             raise AgentError(f"Error resetting memory: {str(e)}")
@@ -192,22 +277,109 @@ class BasicReviewer(BaseModel):
         if self.verbose:
             print(x)
 
+    def _get_retry_policy(self) -> RetryPolicy:
+        """Return the retry policy of the reviewer, else of its provider, else a default one."""
+        if self.retry_policy:
+            return self.retry_policy
+        if getattr(self.provider, "retry_policy", None):
+            return self.provider.retry_policy
+        return RetryPolicy(max_retries=self.max_retries)
+
+    def _concurrency_slot(self, concurrency_limiter: Optional[Any]) -> Any:
+        """Return an async context manager holding one slot of the given limiter."""
+        if concurrency_limiter is None:
+            return _NoConcurrencyLimit()
+        if isinstance(concurrency_limiter, AdaptiveConcurrencyLimiter):
+            return concurrency_limiter.slot()
+        return concurrency_limiter
+
+    def _new_concurrency_limiter(self) -> Any:
+        """Create the concurrency limiter for one run of this reviewer."""
+        if self.adaptive_concurrency:
+            concurrency_limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=self.max_concurrent_requests, max_limit=self.max_adaptive_concurrent_requests
+            )
+            self.concurrency_history = concurrency_limiter.history
+            return concurrency_limiter
+        return asyncio.Semaphore(self.max_concurrent_requests)
+
+    async def _review_indexed(
+        self,
+        index: int,
+        text_input_string: str,
+        image_path_list: List[str],
+        concurrency_limiter: Optional[Any] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+        response_format: Optional[Any] = None,
+    ) -> tuple[int, Any, Optional[str], Any, Optional[Dict[str, Any]]]:
+        """Review one item of a run, turning a final failure into a failure record instead of raising."""
+        try:
+            response, input_prompt, cost = await self.review_item(
+                text_input_string,
+                image_path_list,
+                concurrency_limiter=concurrency_limiter,
+                retry_budget=retry_budget,
+                spending_budgets=spending_budgets,
+                response_format=response_format,
+            )
+            return index, response, input_prompt, cost, None
+        except ReviewItemError as e:
+            failure = {"index": index, "error": str(e), "error_type": e.error_type, "attempts": e.attempts}
+            return index, None, e.input_prompt, 0.0, failure
+
+    def _record_request_time(self, seconds: float) -> None:
+        """Add the latency of one live request to `request_timing`."""
+        self.request_timing["requests"] = self.request_timing.get("requests", 0) + 1
+        self.request_timing["seconds"] = self.request_timing.get("seconds", 0.0) + seconds
+
+    def _record_review(self, input_prompt: Optional[str], response: Any, cost: Any, keep_memory: bool = True) -> float:
+        """Add a reviewed item to the memory and cost tracking, returning its total cost."""
+        usage = {}
+        if isinstance(cost, dict):
+            usage = {key: cost[key] for key in TOKEN_USAGE_KEYS if key in cost}
+            for key, value in usage.items():
+                self.token_usage[key] = self.token_usage.get(key, 0) + value
+            cost = cost["total_cost"]
+        self.cost_so_far += cost
+        if keep_memory:
+            self.memory.append(
+                {
+                    "system_prompt": self.system_prompt,
+                    "model_args": self.model_args,
+                    "input_prompt": input_prompt,
+                    "response": response,
+                    "cost": cost,
+                    "usage": usage,
+                }
+            )
+        return cost
+
     async def review_items(
-        self, text_input_strings: List[str], image_path_lists: List[List[str]] = None, tqdm_keywords: dict = None
+        self,
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]] = None,
+        tqdm_keywords: dict = None,
+        concurrency_limiter: Optional[Any] = None,
+        on_result: Optional[Callable[[int, Any, Any, Optional[Dict[str, Any]]], None]] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
     ) -> List[Dict[str, Any]]:
-        """Review a list of items asynchronously with concurrency control and progress bar."""
+        """Review a list of items asynchronously with concurrency control and progress bar.
+
+        Items that still fail after retries are returned as None and described in `self.failures`.
+        A `concurrency_limiter` (e.g. an asyncio.Semaphore shared with other reviewers) replaces the reviewer's own.
+        `on_result(index, response, cost, failure)` is called as soon as each item completes.
+        Items not sent because a spending budget ran out fail with the error type "budget_exhausted".
+        Returns the responses in input order and the total cost of the call.
+        """
         try:
             self.setup()
             if not image_path_lists:
                 image_path_lists = [[]] * len(text_input_strings)
-            semaphore = asyncio.Semaphore(self.max_concurrent_requests)
-
-            async def limited_review_item(
-                text_input_string: str, image_path_list: List[str], index: int
-            ) -> tuple[int, Dict[str, Any], Dict[str, float]]:
-                async with semaphore:
-                    response, input_prompt, cost = await self.review_item(text_input_string, image_path_list)
-                    return index, response, input_prompt, cost
+            if concurrency_limiter is None:
+                concurrency_limiter = self._new_concurrency_limiter()
+            retry_budget = self._get_retry_policy().new_budget()
+            self.failures = []
 
             # Building the tqdm desc
             if tqdm_keywords:
@@ -216,60 +388,472 @@ class BasicReviewer(BaseModel):
             else:
                 tqdm_desc = f"Reviewing {len(text_input_strings)} items - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
-            # Create tasks with indices
-            tasks = [
-                limited_review_item(text_input_string, image_path_list, i)
-                for i, (text_input_string, image_path_list) in enumerate(zip(text_input_strings, image_path_lists))
-            ]
-
-            # Collect results with indices
-            initial_results = []
-            async for result in tqdm(asyncio.as_completed(tasks), total=len(text_input_strings), desc=tqdm_desc):
-                initial_results.append(await result)
+            unattributed_cost = 0.0
+            if self._packing_enabled():
+                initial_results, unattributed_cost = await self._review_packed(
+                    text_input_strings,
+                    image_path_lists,
+                    concurrency_limiter,
+                    retry_budget,
+                    tqdm_desc,
+                    on_result,
+                    spending_budgets,
+                )
+            else:
+                # Create tasks with indices
+                tasks = [
+                    self._review_indexed(
+                        i, text_input_string, image_path_list, concurrency_limiter, retry_budget, spending_budgets
+                    )
+                    for i, (text_input_string, image_path_list) in enumerate(zip(text_input_strings, image_path_lists))
+                ]
+
+                # Collect results with indices
+                initial_results = []
+                progress = tqdm(asyncio.as_completed(tasks), total=len(text_input_strings), desc=tqdm_desc)
+                async for result in progress:
+                    result = await result
+                    initial_results.append(result)
+                    if on_result is not None:
+                        index, response, _, cost, failure = result
+                        on_result(index, response, cost, failure)
+                    if isinstance(concurrency_limiter, AdaptiveConcurrencyLimiter):
+                        progress.set_postfix(window=concurrency_limiter.window, refresh=False)
+
+            if isinstance(concurrency_limiter, AdaptiveConcurrencyLimiter):
+                self._log(
+                    f"Adaptive concurrency window for {self.name}: final {concurrency_limiter.window}, "
+                    f"peak {max(entry['window'] for entry in concurrency_limiter.history)}"
+                )
 
             # Sort by original index and separate response and cost
             initial_results.sort(key=lambda x: x[0])  # Sort by index
             results = []
+            total_cost = unattributed_cost
 
-            for i, response, input_prompt, cost in initial_results:
+            for i, response, input_prompt, cost, failure in initial_results:
+                if failure:
+                    self.failures.append(failure)
+                total_cost += self._record_review(input_prompt, response, cost)
+                results.append(response)
+
+            if self.failures:
+                self._log(f"{self.name} failed to review {len(self.failures)} of {len(text_input_strings)} items")
+
+            return results, total_cost
+        except Exception as e:
+            raise AgentError(f"Error reviewing items: {str(e)}")
+
+    def _packing_enabled(self) -> bool:
+        """Packing is off when the additional context is a callable, since that context is built for each item."""
+        requested = self.pack_size > 1 or self.pack_token_budget is not None
+        return requested and not callable(self.additional_context)
+
+    def _build_packs(self, text_input_strings: List[str], image_path_lists: List[List[str]]) -> List[List[int]]:
+        """Group item positions into packs by count and estimated tokens; items with images are sent alone."""
+        max_items = self.pack_size if self.pack_size > 1 else len(text_input_strings)
+        packs, current, current_tokens = [], [], 0
+        for i, (text, images) in enumerate(zip(text_input_strings, image_path_lists)):
+            if images:
+                packs.append([i])
+                continue
+            tokens = len(text) // CHARS_PER_TOKEN
+            over_budget = self.pack_token_budget is not None and current_tokens + tokens > self.pack_token_budget
+            if current and (len(current) >= max_items or over_budget):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    def _task_id(self, text_input_string: str, index: int) -> str:
+        """Return the item's Review Task ID, or its position when the text carries none."""
+        match = TASK_ID_PATTERN.match(text_input_string)
+        return match.group(1) if match else str(index)
+
+    def _pack_text(self, text_input_strings: List[str], positions: List[int]) -> str:
+        """Combine several items into one item text, each introduced by its Review Task ID."""
+        parts = [
+            f"The following {len(positions)} items are reviewed together. Review each one independently and return "
+            f"exactly one entry per item in `items`, with its Review Task ID as `review_task_id`."
+        ]
+        for i in positions:
+            text = text_input_strings[i]
+            if not TASK_ID_PATTERN.match(text):
+                text = f"Review Task ID: {i}\n{text}"
+            parts.append(text)
+        return "\n\n".join(parts)
+
+    def _packed_response_format(self) -> Tuple[Dict[str, Any], Any]:
+        """Return the list-shaped response format of a pack and the model validating one of its items."""
+        return _packed_response_format(tuple(self.response_format.items()))
+
+    def _unpack_response(self, response: Any, task_ids: Dict[str, int], item_model: Any) -> Dict[int, str]:
+        """Map each valid entry of a packed response back to its item position."""
+        response = load_json(response)
+        unpacked = {}
+        for entry in (response or {}).get("items") or []:
+            if not isinstance(entry, dict):
+                continue
+            position = task_ids.get(str(entry.get("review_task_id")))
+            if position is None or position in unpacked:
+                continue
+            try:
+                item = item_model.model_validate({key: entry.get(key) for key in self.response_format})
+            except ValidationError:
+                continue
+            unpacked[position] = json.dumps(item.model_dump())
+        return unpacked
+
+    async def _review_packed(
+        self,
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]],
+        concurrency_limiter: Any,
+        retry_budget: RetryBudget,
+        tqdm_desc: str,
+        on_result: Optional[Callable[[int, Any, Any, Optional[Dict[str, Any]]], None]] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> Tuple[List[tuple], float]:
+        """Review items several per request, then fall back to single-item requests for anything left unanswered.
+
+        Returns per-item results in the `(index, response, input_prompt, cost, failure)` shape of `_review_indexed`,
+        and the cost of packs that answered none of their items (already added to `cost_so_far`).
+        """
+        packs = self._build_packs(text_input_strings, image_path_lists)
+        multi_item_packs = [pack for pack in packs if len(pack) > 1]
+        leftovers = [pack[0] for pack in packs if len(pack) == 1]
+        results = []
+        unattributed_cost = 0.0
+
+        def finish(result: tuple) -> None:
+            results.append(result)
+            if on_result is not None:
+                index, response, _, cost, failure = result
+                on_result(index, response, cost, failure)
+
+        if multi_item_packs:
+            packed_format, item_model = self._packed_response_format()
+            tasks = [
+                self._review_indexed(
+                    pack_number,
+                    self._pack_text(text_input_strings, pack),
+                    [],
+                    concurrency_limiter,
+                    retry_budget,
+                    spending_budgets,
+                    response_format=packed_format,
+                )
+                for pack_number, pack in enumerate(multi_item_packs)
+            ]
+            async for result in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc=f"{tqdm_desc} (packed)"):
+                pack_number, response, input_prompt, cost, failure = await result
+                pack = multi_item_packs[pack_number]
+                unpacked = {}
+                if failure is None:
+                    task_ids = {self._task_id(text_input_strings[i], i): i for i in pack}
+                    try:
+                        unpacked = self._unpack_response(response, task_ids, item_model)
+                    except (TypeError, ValueError, AttributeError):
+                        unpacked = {}
+                # The pack's cost is shared by the items it answered, or kept once if it answered none
                 if isinstance(cost, dict):
                     cost = cost["total_cost"]
-                self.cost_so_far += cost
-                results.append(response)
-                self.memory.append(
-                    {
-                        "system_prompt": self.system_prompt,
-                        "model_args": self.model_args,
-                        "input_prompt": input_prompt,
-                        "response": response,
-                        "cost": cost,
-                    }
+                for position, item_response in unpacked.items():
+                    finish((position, item_response, input_prompt, cost / len(unpacked), None))
+                if not unpacked and cost:
+                    unattributed_cost += self._record_review(input_prompt, None, cost)
+                leftovers.extend(i for i in pack if i not in unpacked)
+
+        if leftovers:
+            if multi_item_packs:
+                self._log(f"{self.name}: {len(leftovers)} items were sent on their own")
+            tasks = [
+                self._review_indexed(
+                    i, text_input_strings[i], image_path_lists[i], concurrency_limiter, retry_budget, spending_budgets
                 )
+                for i in sorted(leftovers)
+            ]
+            async for result in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc=tqdm_desc):
+                finish(await result)
+        return results, unattributed_cost
+
+    async def review_items_batch(
+        self,
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]] = None,
+        on_result: Optional[Callable[[int, Any, Any, Optional[Dict[str, Any]]], None]] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> tuple[List[Any], float]:
+        """Review a list of items through the provider's batch API instead of live requests.
+
+        All prompts are submitted as one batch and mapped back by position once it completes. Items the batch
+        could not answer are returned as None and described in `self.failures`. Nothing is submitted if a spending
+        budget is already exhausted; a submitted batch is charged to the budgets once it completes.
+        Returns the responses in input order and the total cost of the call.
+        """
+        try:
+            self.setup()
+            if not image_path_lists:
+                image_path_lists = [[]] * len(text_input_strings)
+            self.failures = []
+            budgets = [budget for budget in (self.spending_budget, *spending_budgets) if budget is not None]
+            exhausted = exhausted_budget(budgets)
+            if exhausted is not None:
+                message = f"Spending budget exhausted ({exhausted.describe()})"
+                for i in range(len(text_input_strings)):
+                    failure = {"index": i, "error": message, "error_type": BUDGET_EXHAUSTED, "attempts": 0}
+                    self.failures.append(failure)
+                    if on_result is not None:
+                        on_result(i, None, 0.0, failure)
+                self._log(f"{self.name}: batch not submitted, {message}")
+                return [None] * len(text_input_strings), 0.0
+            input_prompts = [await self._build_input_prompt(text) for text in text_input_strings]
+            self._log(f"{self.name}: submitting a batch of {len(input_prompts)} requests")
+            batch_results = await self.provider.get_json_responses_batch(
+                [(str(i), prompt, images) for i, (prompt, images) in enumerate(zip(input_prompts, image_path_lists))],
+                system_message=self.system_prompt,
+                response_format=self.response_format,
+                **self.model_args,
+            )
+
+            results = []
+            total_cost = 0.0
+            for i, input_prompt in enumerate(input_prompts):
+                response, cost, error = batch_results[str(i)]
+                for budget in budgets:
+                    budget.charge(cost, estimate_tokens(self.system_prompt, input_prompt, response))
+                error_type = BATCH_ERROR
+                if error is None:
+                    try:
+                        response = self._validated_response(response)
+                    except ValueError as e:
+                        error, error_type = f"Malformed JSON response: {str(e)}", MALFORMED_RESPONSE
+                failure = None
+                if error is not None:
+                    failure = {"index": i, "error": error, "error_type": error_type, "attempts": 1}
+                    self.failures.append(failure)
+                    response = None
+                total_cost += self._record_review(input_prompt, response, cost)
+                if on_result is not None:
+                    on_result(i, response, cost, failure)
+                results.append(response)
 
-            return results, cost
+            if self.failures:
+                self._log(f"{self.name} failed to review {len(self.failures)} of {len(text_input_strings)} items")
+            return results, total_cost
         except Exception as e:
-            raise AgentError(f"Error reviewing items: {str(e)}")
+            raise AgentError(f"Error reviewing items in batch: {str(e)}")
+
+    async def astream_review_items(
+        self,
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        max_pending: Optional[int] = None,
+        keep_memory: bool = True,
+    ) -> AsyncIterator[Tuple[int, Any, float]]:
+        """Review items from a sync or async iterable, yielding `(index, response, cost)` as each completes.
+
+        Items are text input strings or `(text_input_string, image_path_list)` tuples. At most `max_pending`
+        items (default: twice `max_concurrent_requests`) are read ahead of the results, so an unbounded feed is
+        screened with constant memory and the consumer's pace applies backpressure. Failed items are yielded with
+        a None response and listed in `self.failures`. Set `keep_memory=False` to skip the per-item memory log.
+        """
+        self.setup()
+        concurrency_limiter = self._new_concurrency_limiter()
+        retry_budget = self._get_retry_policy().new_budget()
+        self.failures = []
+        max_pending = max_pending or 2 * self.max_concurrent_requests
+        exhausted = object()
+
+        if hasattr(items, "__aiter__"):
+            async_iterator = items.__aiter__()
+
+            async def next_item() -> Any:
+                try:
+                    return await async_iterator.__anext__()
+                except StopAsyncIteration:
+                    return exhausted
+
+        else:
+            iterator = iter(items)
+
+            async def next_item() -> Any:
+                return next(iterator, exhausted)
+
+        index = 0
+        pending = set()
+        fetch = None  # reading the next item is awaited alongside the reviews, so a quiet feed never stalls results
+        try:
+            while True:
+                if fetch is None and index is not None and len(pending) < max_pending:
+                    fetch = asyncio.ensure_future(next_item())
+                waiting = pending | {fetch} if fetch else pending
+                if not waiting:
+                    return
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if fetch in done:
+                    item = fetch.result()
+                    fetch = None
+                    if item is exhausted:
+                        index = None
+                    else:
+                        text_input_string, image_path_list = item if isinstance(item, tuple) else (item, [])
+                        pending.add(
+                            asyncio.ensure_future(
+                                self._review_indexed(
+                                    index, text_input_string, image_path_list, concurrency_limiter, retry_budget
+                                )
+                            )
+                        )
+                        index += 1
+                for task in done & pending:
+                    pending.discard(task)
+                    i, response, input_prompt, cost, failure = task.result()
+                    if failure:
+                        self.failures.append(failure)
+                    yield i, response, self._record_review(input_prompt, response, cost, keep_memory)
+        except Exception as e:
+            raise AgentError(f"Error streaming review items: {str(e)}")
+        finally:
+            for task in pending | ({fetch} if fetch else set()):
+                task.cancel()
+
+    async def _build_input_prompt(self, text_input_string: str) -> str:
+        """Render the item prompt, including any additional context."""
+        if self.additional_context == "" or not self.additional_context:
+            context = self.additional_context
+        elif isinstance(self.additional_context, str):
+            context = self._process_additional_context(self.additional_context)
+        elif isinstance(self.additional_context, Callable):
+            context = await self.additional_context(text_input_string)
+            context = self._process_additional_context(context)
+        else:
+            raise AgentError("Additional context must be a string or callable")
+        # The compiled template is cached per formatted prompt, so per item this is a single join
+        return self._item_template().render({"item": text_input_string, "additional_context": context})
+
+    def _render_prompt(self, text_input_string: str) -> str:
+        """Render the item prompt without awaiting a callable additional context, e.g. to count its tokens."""
+        context = self.additional_context if isinstance(self.additional_context, str) else ""
+        if context:
+            context = self._process_additional_context(context)
+        return self._item_template().render({"item": text_input_string, "additional_context": context})
+
+    def _item_template(self) -> Any:
+        """Return the compiled template items are rendered with, according to `prompt_layout`.
+
+        With "static_prefix" every item shares the same leading text (the task, criteria, instructions and examples),
+        and the item and its additional context come last, so provider-side prefix caches can reuse the static part.
+        Both templates are compiled once per formatted prompt.
+        """
+        if self.prompt_layout != "static_prefix":
+            return compile_prompt(self.formatted_prompt)
+        return _static_prefix_template(self.formatted_prompt)
+
+    async def _get_json_response(
+        self, input_prompt: str, image_path_list: List[str], response_format: Optional[Any] = None
+    ) -> tuple[Any, Dict[str, float]]:
+        """Ask the provider for a response, going through the response cache when one is configured.
+
+        The reviewer's system prompt and response format (or `response_format`, e.g. for packs) go with the request.
+        Streamed responses go through `get_cached_json_response`, which also works without a cache.
+        """
+        # Only packs pass their own format, and they are described by the packed system prompt
+        request_format = {
+            "system_message": self.packed_system_prompt if response_format is not None else self.system_prompt,
+            "response_format": response_format or self.response_format,
+        }
+        if self.stream_responses:
+            # Packs have their own format, so they are always read to the end
+            request_format["streamed"] = True
+            request_format["stop_after"] = self.stream_stop_after if response_format is None else None
+        response_cache = self.response_cache or getattr(self.provider, "response_cache", None)
+        if response_cache is None and not self.stream_responses:
+            return await self.provider.get_json_response(
+                input_prompt, image_path_list, **request_format, **self.model_args
+            )
+        return await self.provider.get_cached_json_response(
+            input_prompt, image_path_list, response_cache=response_cache, **request_format, **self.model_args
+        )
+
+    def _validated_response(self, response: Any, response_format: Optional[Any] = None) -> Any:
+        """Repair a response if needed and validate it against the reviewer's format, coercing its values.
+
+        Packs (a `response_format` is given) are only repaired: their items are validated one by one on unpacking.
+        Streams stopped early only need their `stream_stop_after` keys. Text is returned as normalized JSON text.
+        """
+        if response_format is not None:
+            parsed = load_json(response)
+        elif self.stream_responses and self.stream_stop_after:
+            required = {key: self.response_format[key] for key in self.stream_stop_after}
+            validated = validate_response(response, response_format_model(required))
+            received = load_json(response)
+            parsed = {key: validated.get(key, received.get(key)) for key in self.response_format}
+        else:
+            parsed = validate_response(response, response_format_model(self.response_format))
+        return json.dumps(parsed) if isinstance(response, (str, bytes)) else parsed
 
     async def review_item(
-        self, text_input_string: str, image_path_list: List[str] = []
+        self,
+        text_input_string: str,
+        image_path_list: List[str] = [],
+        concurrency_limiter: Optional[Any] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+        response_format: Optional[Any] = None,
     ) -> tuple[Dict[str, Any], Dict[str, float]]:
-        """Review a single item asynchronously with error handling."""
-        num_tried = 0
-        while num_tried < self.max_retries:
+        """Review a single item asynchronously, retrying transient errors with backoff.
+
+        The concurrency slot is held only while a request is in flight, never while backing off. No request is sent
+        once the reviewer's or one of the given spending budgets is exhausted; each response is charged to all of them.
+        """
+        retry_policy = self._get_retry_policy()
+        budgets = [budget for budget in (self.spending_budget, *spending_budgets) if budget is not None]
+        input_prompt = None
+        attempt = 0
+        while True:
             try:
-                input_prompt = self._process_prompt(self.formatted_prompt, {"item": text_input_string})
-                if self.additional_context == "" or not self.additional_context:
-                    context = self.additional_context
-                elif isinstance(self.additional_context, str):
-                    context = self._process_additional_context(self.additional_context)
-                elif isinstance(self.additional_context, Callable):
-                    context = await self.additional_context(text_input_string)
-                    context = self._process_additional_context(context)
-                else:
-                    raise AgentError("Additional context must be a string or callable")
-                input_prompt = self._process_prompt(input_prompt, {"additional_context": context})
-                response, cost = await self.provider.get_json_response(input_prompt, image_path_list, **self.model_args)
+                async with self._concurrency_slot(concurrency_limiter):
+                    # Checked once a slot is free, so queued items stop as soon as a budget runs out
+                    exhausted = exhausted_budget(budgets)
+                    if exhausted is not None:
+                        message = f"Spending budget exhausted ({exhausted.describe()})"
+                        raise ReviewItemError(message, BUDGET_EXHAUSTED, attempt, input_prompt)
+                    if input_prompt is None:
+                        input_prompt = await self._build_input_prompt(text_input_string)
+                    started = time.monotonic()
+                    response, cost = await self._get_json_response(input_prompt, image_path_list, response_format)
+                    cache_hit = isinstance(cost, dict) and cost.get("cache_hit", False)
+                    if not cache_hit:
+                        self._record_request_time(time.monotonic() - started)
+                # Cache hits spent no tokens, so they are charged nothing
+                tokens = 0 if cache_hit else estimate_tokens(self.system_prompt, input_prompt, response)
+                for budget in budgets:
+                    budget.charge(cost, tokens)
+                # Responses that cannot be repaired or validated are retried like any other transient error
+                response = self._validated_response(response, response_format)
                 return response, input_prompt, cost
+            except ReviewItemError:
+                raise
             except Exception as e:
-                self._log(f"Error reviewing item: {str(e)}. Retrying {num_tried}/{self.max_retries}")
-        raise AgentError("Error reviewing item!")
+                error_type = classify_error(e)
+                if not retry_policy.is_retryable(error_type) or attempt >= retry_policy.max_retries:
+                    raise ReviewItemError(
+                        f"Error reviewing item after {attempt + 1} attempt(s) ({error_type}): {str(e)}",
+                        error_type,
+                        attempt + 1,
+                        input_prompt,
+                    ) from e
+                if retry_budget is not None and not retry_budget.try_spend():
+                    raise ReviewItemError(
+                        f"Retry budget exhausted ({error_type}): {str(e)}", error_type, attempt + 1, input_prompt
+                    ) from e
+                delay = retry_policy.compute_delay(attempt, e)
+                attempt += 1
+                self._log(
+                    f"Error reviewing item ({error_type}): {str(e)}. "
+                    f"Retrying {attempt}/{retry_policy.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,250 @@
+"""Two-stage reviewer: a cheap model screens every item and a stronger one re-reviews the uncertain ones."""
+
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .basic_reviewer import BasicReviewer, AgentError, TOKEN_USAGE_KEYS
+from ..utils.budget import BUDGET_EXHAUSTED, SpendingBudget
+from ..utils.validation import load_json
+
+DEFAULT_CERTAINTY_THRESHOLD = 80
+UNCERTAIN_EVALUATIONS = [2, 3, 4]  # the middle of TitleAbstractReviewer's 1-5 scale
+
+
+def _merge_costs(*costs: Any) -> Dict[str, float]:
+    """Add up cost dictionaries (or bare floats) of several calls into one cost dictionary."""
+    merged = {"total_cost": 0.0}
+    for cost in costs:
+        if isinstance(cost, dict):
+            merged["total_cost"] += cost["total_cost"]
+            for key in TOKEN_USAGE_KEYS:
+                if key in cost:
+                    merged[key] = merged.get(key, 0) + cost[key]
+        else:
+            merged["total_cost"] += cost or 0.0
+    return merged
+
+
+class CascadeReviewer(BasicReviewer):
+    """Run `first_reviewer` over every item and escalate the uncertain ones to `second_reviewer`.
+
+    An item is escalated when its first-pass `certainty` is below `certainty_threshold`, its `evaluation` is one
+    of `escalate_evaluations`, or its first pass failed; an `escalation_rule` replaces the first two checks.
+    The final answer comes from the second reviewer for escalated items and from the first one otherwise. Both
+    outputs are kept in the response, next to an `escalated` flag.
+    """
+
+    first_reviewer: Optional[BasicReviewer] = None  # cheap or fast reviewer run on every item
+    second_reviewer: Optional[BasicReviewer] = None  # stronger reviewer run on escalated items only
+    certainty_threshold: Optional[int] = DEFAULT_CERTAINTY_THRESHOLD
+    escalate_evaluations: List[Any] = UNCERTAIN_EVALUATIONS
+    escalation_rule: Optional[Callable[[Dict[str, Any]], bool]] = None  # True if a first-pass answer is escalated
+    reviewed_count: int = 0
+    escalated_count: int = 0
+    name: str = "CascadeReviewer"
+    backstory: str = "a cascade of a fast and a strong reviewer"
+
+    def setup(self) -> None:
+        """Check the two reviewers and derive the cascade's response format from theirs."""
+        try:
+            if self.first_reviewer is None or self.second_reviewer is None:
+                raise AgentError("CascadeReviewer needs a first_reviewer and a second_reviewer")
+            if list(self.first_reviewer.response_format) != list(self.second_reviewer.response_format):
+                raise AgentError("The first and second reviewers must have the same response format keys")
+            self.response_format = {
+                **self.first_reviewer.response_format,
+                "escalated": bool,
+                "first_output": dict,
+                "second_output": Optional[dict],
+            }
+            self.identity = {
+                "first_reviewer": self.first_reviewer.name,
+                "second_reviewer": self.second_reviewer.name,
+            }
+        except Exception as e:
+            raise AgentError(f"Error in setup: {str(e)}")
+
+    @property
+    def escalation_rate(self) -> float:
+        """Share of the items reviewed so far that were escalated to the second reviewer."""
+        return self.escalated_count / self.reviewed_count if self.reviewed_count else 0.0
+
+    def reset_memory(self) -> None:
+        """Reset the cascade's memory, cost tracking and escalation counts."""
+        super().reset_memory()
+        self.reviewed_count = 0
+        self.escalated_count = 0
+
+    def _spending_budgets(self, spending_budgets: Iterable[SpendingBudget]) -> List[SpendingBudget]:
+        """The cascade's own budget, which both of its reviewers spend from, followed by the given ones."""
+        return [budget for budget in (self.spending_budget, *spending_budgets) if budget is not None]
+
+    def _parse(self, output: Any) -> Optional[Dict[str, Any]]:
+        try:
+            return load_json(output)
+        except ValueError:
+            return None
+
+    def needs_escalation(self, output: Any) -> bool:
+        """Return True if a first-pass output should be reviewed again by the second reviewer."""
+        answer = self._parse(output)
+        if not isinstance(answer, dict):
+            return True
+        if self.escalation_rule is not None:
+            return bool(self.escalation_rule(answer))
+        certainty = answer.get("certainty")
+        if self.certainty_threshold is not None and certainty is not None and certainty < self.certainty_threshold:
+            return True
+        return answer.get("evaluation") in self.escalate_evaluations
+
+    def _combine(self, first_output: Any, second_output: Any, escalated: bool) -> str:
+        """Build the cascade's response: the final answer, the escalation flag and both raw answers."""
+        first_answer = self._parse(first_output)
+        second_answer = self._parse(second_output) if escalated else None
+        final_answer = (second_answer if escalated else first_answer) or {}
+        response = {key: final_answer.get(key) for key in self.first_reviewer.response_format}
+        response.update({"escalated": escalated, "first_output": first_answer, "second_output": second_answer})
+        return json.dumps(response)
+
+    async def _review_indexed(
+        self,
+        index: int,
+        text_input_string: str,
+        image_path_list: List[str],
+        concurrency_limiter: Optional[Any] = None,
+        retry_budget: Optional[Any] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> tuple[int, Any, Optional[str], Any, Optional[Dict[str, Any]]]:
+        """Review one item through the cascade, as used by pipelined workflows and streaming."""
+        spending_budgets = self._spending_budgets(spending_budgets)
+        _, first_output, input_prompt, first_cost, first_failure = await self.first_reviewer._review_indexed(
+            index, text_input_string, image_path_list, concurrency_limiter, retry_budget, spending_budgets
+        )
+        self.first_reviewer._record_review(input_prompt, first_output, first_cost)
+        if first_failure and first_failure["error_type"] == BUDGET_EXHAUSTED:
+            return index, None, text_input_string, first_cost, first_failure
+        escalated = self.needs_escalation(first_output)
+        second_output, second_cost, failure = None, 0.0, None
+        if escalated:
+            _, second_output, second_prompt, second_cost, failure = await self.second_reviewer._review_indexed(
+                index, text_input_string, image_path_list, concurrency_limiter, retry_budget, spending_budgets
+            )
+            self.second_reviewer._record_review(second_prompt, second_output, second_cost)
+        self.reviewed_count += 1
+        self.escalated_count += int(escalated)
+        response = None if failure else self._combine(first_output, second_output, escalated)
+        return index, response, text_input_string, _merge_costs(first_cost, second_cost), failure
+
+    async def review_items(
+        self,
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]] = None,
+        tqdm_keywords: dict = None,
+        concurrency_limiter: Optional[Any] = None,
+        on_result: Optional[Callable[[int, Any, Any, Optional[Dict[str, Any]]], None]] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> tuple[List[Any], float]:
+        """Review all items with the first reviewer, then the escalated ones with the second reviewer."""
+        spending_budgets = self._spending_budgets(spending_budgets)
+
+        async def run_pass(reviewer: BasicReviewer, texts: List[str], images: List[List[str]], callback: Callable):
+            return await reviewer.review_items(
+                texts,
+                images,
+                tqdm_keywords,
+                concurrency_limiter=concurrency_limiter,
+                on_result=callback,
+                spending_budgets=spending_budgets,
+            )
+
+        try:
+            return await self._review_cascade(text_input_strings, image_path_lists, run_pass, on_result)
+        except Exception as e:
+            raise AgentError(f"Error reviewing items: {str(e)}")
+
+    async def review_items_batch(
+        self,
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]] = None,
+        on_result: Optional[Callable[[int, Any, Any, Optional[Dict[str, Any]]], None]] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> tuple[List[Any], float]:
+        """Like `review_items`, with each pass submitted through its reviewer's batch API."""
+        spending_budgets = self._spending_budgets(spending_budgets)
+
+        async def run_pass(reviewer: BasicReviewer, texts: List[str], images: List[List[str]], callback: Callable):
+            return await reviewer.review_items_batch(
+                texts, images, on_result=callback, spending_budgets=spending_budgets
+            )
+
+        try:
+            return await self._review_cascade(text_input_strings, image_path_lists, run_pass, on_result)
+        except Exception as e:
+            raise AgentError(f"Error reviewing items in batch: {str(e)}")
+
+    async def _review_cascade(
+        self,
+        text_input_strings: List[str],
+        image_path_lists: Optional[List[List[str]]],
+        run_pass: Callable,
+        on_result: Optional[Callable[[int, Any, Any, Optional[Dict[str, Any]]], None]] = None,
+    ) -> tuple[List[Any], float]:
+        self.setup()
+        if not image_path_lists:
+            image_path_lists = [[]] * len(text_input_strings)
+        self.failures = []
+
+        first_costs: Dict[int, Any] = {}
+        first_outputs, first_total = await run_pass(
+            self.first_reviewer,
+            text_input_strings,
+            image_path_lists,
+            lambda i, response, cost, failure: first_costs.__setitem__(i, cost),
+        )
+        # Items the first reviewer never sent because a budget ran out are not escalated either
+        failures = {
+            failure["index"]: failure
+            for failure in self.first_reviewer.failures
+            if failure["error_type"] == BUDGET_EXHAUSTED
+        }
+        escalated = [
+            i for i, output in enumerate(first_outputs) if i not in failures and self.needs_escalation(output)
+        ]
+
+        second_outputs: Dict[int, Any] = {}
+        second_costs: Dict[int, Any] = {}
+        second_total = 0.0
+        if escalated:
+            outputs, second_total = await run_pass(
+                self.second_reviewer,
+                [text_input_strings[i] for i in escalated],
+                [image_path_lists[i] for i in escalated],
+                lambda i, response, cost, failure: second_costs.__setitem__(escalated[i], cost),
+            )
+            second_outputs = dict(zip(escalated, outputs))
+            # Failure records index the escalated subset; map them back to the cascade's items
+            for failure in self.second_reviewer.failures:
+                position = escalated[failure["index"]]
+                failures[position] = {**failure, "index": position}
+
+        self.reviewed_count += len(text_input_strings)
+        self.escalated_count += len(escalated)
+        self._log(
+            f"{self.name}: escalated {len(escalated)} of {len(text_input_strings)} items "
+            f"from {self.first_reviewer.name} to {self.second_reviewer.name}"
+        )
+
+        results = []
+        for i, text_input_string in enumerate(text_input_strings):
+            failure = failures.get(i)
+            response = None if failure else self._combine(first_outputs[i], second_outputs.get(i), i in second_outputs)
+            cost = _merge_costs(first_costs.get(i, 0.0), second_costs.get(i, 0.0))
+            if failure:
+                self.failures.append(failure)
+            self._record_review(text_input_string, response, cost)
+            if on_result is not None:
+                on_result(i, response, cost, failure)
+            results.append(response)
+
+        if self.failures:
+            self._log(f"{self.name} failed to review {len(self.failures)} of {len(text_input_strings)} items")
+        return results, first_total + second_total
@@ -0,0 +1,60 @@
+"""Prompt templates compiled once into static segments and slots, so rendering an item is a single join."""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(.*?)\}\$")
+
+
+def _clean_segment(segment: str) -> str:
+    """Collapse whitespace like `BasicReviewer._clean_text`, keeping one space at either edge if there was any."""
+    core = " ".join(segment.split())
+    if not core:
+        return " " if segment else ""
+    prefix = " " if segment[0].isspace() else ""
+    suffix = " " if segment[-1].isspace() else ""
+    return f"{prefix}{core}{suffix}"
+
+
+class PromptTemplate:
+    """A prompt split into whitespace-normalized static segments around `${name}$` slots.
+
+    Rendering gives the same text as substituting every slot and then collapsing all whitespace, but only the slot
+    values are cleaned; the static text was cleaned once at compile time.
+    """
+
+    def __init__(self, prompt: str) -> None:
+        self.prompt = prompt
+        pieces = PLACEHOLDER_PATTERN.split(prompt)
+        self.segments: Tuple[str, ...] = tuple(_clean_segment(piece) for piece in pieces[0::2])
+        self.slots: Tuple[str, ...] = tuple(pieces[1::2])
+
+    @property
+    def keywords(self) -> List[str]:
+        """Slot names in order of first appearance."""
+        return list(dict.fromkeys(self.slots))
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """Fill the slots; missing, None and empty values leave the slot empty."""
+        parts = []
+        previous_ends_with_space = False
+        pieces = [self.segments[0]]
+        for name, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(name)
+            pieces.append(_clean_segment(str(value)) if value is not None and value != "" else "")
+            pieces.append(segment)
+        for piece in pieces:
+            # Adjacent pieces may each bring an edge space; collapse them to one like a full clean would
+            if previous_ends_with_space and piece.startswith(" "):
+                piece = piece[1:]
+            if piece:
+                parts.append(piece)
+                previous_ends_with_space = piece.endswith(" ")
+        return "".join(parts).strip()
+
+
+@lru_cache(maxsize=256)
+def compile_prompt(prompt: str) -> PromptTemplate:
+    """Return the compiled template for a prompt, compiling each distinct prompt only once."""
+    return PromptTemplate(prompt)
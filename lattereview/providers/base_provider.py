@@ -1,8 +1,21 @@
 """Base class for all API providers with consistent error handling and type hints."""
 
-from typing import Optional, Any, List, Dict, Union
+import asyncio
+import functools
+import json
+import os
+import tempfile
+from typing import Optional, Any, AsyncContextManager, AsyncIterator, List, Dict, Tuple, Union
 import pydantic
 from tokencost import calculate_prompt_cost, calculate_completion_cost
+from ..utils.cache import ResponseCache, make_cache_key
+from ..utils.http_clients import SharedTransport, get_http_clients
+from ..utils.images import image_data_url, load_images
+from ..utils.json_stream import JsonStreamParser
+from ..utils.pricing import cost_from_usage
+from ..utils.retry import RetryPolicy
+from ..utils.scheduler import RequestLease, endpoint_key, get_scheduler
+from ..utils.validation import response_format_model, validate_response
 
 
 class ProviderError(Exception):
@@ -35,6 +48,15 @@ class ClientNotInitializedError(ProviderError):
     pass
 
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _zero_cost() -> Dict[str, float]:
+    """Cost dictionary of a request that was not billed."""
+    return {"input_cost": 0.0, "output_cost": 0.0, "total_cost": 0.0}
+
+
 class BaseProvider(pydantic.BaseModel):
     provider: str = "DefaultProvider"
     client: Optional[Any] = None
@@ -44,6 +66,17 @@ class BaseProvider(pydantic.BaseModel):
     response_format: Optional[Any] = None
     last_response: Optional[Any] = None
     calculate_cost: bool = True # if False, the cost will be -1 for both input and output
+    requests_per_minute: Optional[int] = None  # shared by every provider using the same endpoint and key
+    tokens_per_minute: Optional[int] = None
+    max_concurrent_requests: Optional[int] = None
+    retry_policy: Optional[RetryPolicy] = None  # used by reviewers that do not define their own
+    response_cache: Optional[ResponseCache] = None
+    batch_completion_window: str = "24h"
+    batch_poll_interval: float = 30.0  # seconds between batch status checks
+    batch_discount: float = 0.5  # batch requests are billed at this fraction of the live price
+    image_max_pixels: Optional[int] = None  # images above this many pixels are downscaled before sending
+    image_detail: Optional[str] = None  # "low", "high" or "auto"; sent to vision APIs and used to downscale
+    share_connections: bool = True  # send requests through the endpoint's process-wide connection pool
 
     class Config:
         arbitrary_types_allowed = True
@@ -66,16 +99,255 @@ class BaseProvider(pydantic.BaseModel):
         """Get a response from the provider."""
         raise NotImplementedError("Subclasses must implement get_response")
 
+    async def warm_up(self) -> Dict[str, bool]:
+        """Prepare the model before the first request of a run; hosted APIs have nothing to prepare."""
+        return {}
+
     async def get_json_response(
         self,
         input_prompt: str,
         image_path_list: List[str],
         message_list: Optional[List[Dict[str, str]]] = None,
         system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
     ) -> tuple[Any, Dict[str, float]]:
-        """Get a JSON-formatted response from the provider."""
+        """Get a JSON-formatted response, with an optional per-request system message and response format."""
         raise NotImplementedError("Subclasses must implement get_json_response")
 
+    async def get_streamed_json_response(
+        self,
+        input_prompt: str,
+        image_path_list: List[str] = [],
+        message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
+        stop_after: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> tuple[Any, Dict[str, float]]:
+        """Stream a JSON response, parsing and validating each field as it arrives.
+
+        Malformed output raises as soon as it is detected instead of after the whole completion. With `stop_after`,
+        generation is cancelled once those fields are complete, and the fields not received yet are null.
+        """
+        try:
+            response_format_class = self._response_format_class(response_format)
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
+            parser = JsonStreamParser(response_format_class, stop_after)
+            usage = None
+            chunks = self._stream_json_chunks(message_list, kwargs, response_format_class)
+            try:
+                async for text, chunk_usage in chunks:
+                    usage = chunk_usage or usage
+                    if parser.done:
+                        continue  # the object is complete; only the usage block is still awaited
+                    parser.feed(text)
+                    if stop_after is not None and parser.complete:
+                        break
+            finally:
+                await chunks.aclose()  # closing the stream cancels the generation
+            parser.close()
+            cost = await self._get_response_cost(input_prompt, parser.text, usage)
+            return json.dumps(parser.result()), cost
+        except Exception as e:
+            raise ResponseError(f"Error streaming JSON response: {str(e)}")
+
+    async def get_cached_json_response(
+        self,
+        input_prompt: str,
+        image_path_list: List[str],
+        response_cache: Optional[ResponseCache] = None,
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
+        streamed: bool = False,
+        stop_after: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> tuple[Any, Dict[str, float]]:
+        """Get a JSON-formatted response, serving deterministic requests from the response cache when possible.
+
+        Cache hits cost nothing, never reach the network and are flagged with `cache_hit` in their cost dictionary.
+        Only responses valid for the request's response format (after repair) are stored or served, so an invalid
+        reply is fetched again on retry instead of being replayed from the cache. Streamed responses are only stored
+        when they were read to the end (no `stop_after`).
+        """
+        request_format = {"system_message": system_message, "response_format": response_format}
+        if streamed:
+            fetch = functools.partial(self.get_streamed_json_response, stop_after=stop_after)
+        else:
+            fetch = self.get_json_response
+        cache = response_cache or self.response_cache
+        if cache is None or not cache.is_cacheable(kwargs):
+            return await fetch(input_prompt, image_path_list, **request_format, **kwargs)
+        key = await asyncio.to_thread(
+            make_cache_key,
+            self.provider,
+            self.model,
+            system_message or self.system_prompt,
+            input_prompt,
+            kwargs,
+            self.response_format if response_format is None else response_format,
+            image_path_list,
+        )
+        cached = await cache.aget(key)
+        # Entries stored before responses were validated may be invalid; they are fetched again and replaced
+        if cached is not None and self._is_valid_response(cached, response_format):
+            return cached, {**_zero_cost(), "cache_hit": True}
+        response, cost = await fetch(input_prompt, image_path_list, **request_format, **kwargs)
+        if streamed and stop_after is not None:
+            return response, cost
+        if self._is_valid_response(response, response_format):
+            try:
+                await cache.aset(key, response)
+            except (TypeError, ValueError):
+                pass
+        return response, cost
+
+    def _is_valid_response(self, response: Any, response_format: Optional[Any] = None) -> bool:
+        """Return True if a response validates against the request's response format, repairing it if needed."""
+        try:
+            validate_response(response, self._response_format_class(response_format))
+            return True
+        except (TypeError, ValueError):
+            return False
+
+    async def get_json_responses_batch(
+        self,
+        requests: List[Tuple[str, str, List[str]]],
+        batch_file_path: Optional[str] = None,
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Tuple[Any, Dict[str, float], Optional[str]]]:
+        """Send JSON requests through the provider's batch API and wait for the results.
+
+        `requests` holds `(custom_id, input_prompt, image_path_list)` tuples, rendered one per line into an
+        OpenAI-format JSONL batch file. Returns `(response, cost, error)` per custom_id; `error` is None on success.
+        """
+        try:
+            response_format_class = self._response_format_class(response_format)
+            await self._load_images(path for _, _, image_path_list in requests for path in image_path_list or [])
+            lines = [
+                json.dumps(
+                    {
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": self._batch_request_body(
+                            input_prompt, image_path_list, kwargs, system_message, response_format_class
+                        ),
+                    }
+                )
+                for custom_id, input_prompt, image_path_list in requests
+            ]
+            if batch_file_path is None:
+                fd, batch_file_path = tempfile.mkstemp(prefix="lattereview_batch_", suffix=".jsonl")
+                os.close(fd)
+            with open(batch_file_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+            file_id = await self._batch_upload_file(batch_file_path)
+            batch_id = await self._batch_create(file_id)
+            batch = await self._batch_retrieve(batch_id)
+            while getattr(batch, "status", None) not in BATCH_TERMINAL_STATUSES:
+                await asyncio.sleep(self.batch_poll_interval)
+                batch = await self._batch_retrieve(batch_id)
+
+            output_lines = []
+            for file_key in ("output_file_id", "error_file_id"):
+                result_file_id = getattr(batch, file_key, None)
+                if result_file_id:
+                    content = await self._batch_file_content(result_file_id)
+                    output_lines.extend(line for line in content.splitlines() if line.strip())
+        except Exception as e:
+            raise ResponseError(f"Error running batch: {str(e)}")
+
+        prompts = {custom_id: input_prompt for custom_id, input_prompt, _ in requests}
+        results = {}
+        for line in output_lines:
+            # A bad line only fails its own request; lines that cannot be parsed are reported as missing below
+            try:
+                record = json.loads(line)
+                custom_id = record.get("custom_id")
+            except (ValueError, AttributeError):
+                continue
+            if custom_id not in prompts:
+                continue
+            try:
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    error = record.get("error") or (response.get("body") or {}).get("error") or response
+                    results[custom_id] = (None, _zero_cost(), f"status {response.get('status_code')}: {error}")
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                if not isinstance(content, str):
+                    raise ValueError(f"response has no text content: {content!r}")
+                cost = await self._get_response_cost(prompts[custom_id], content, response["body"].get("usage"))
+                cost = {
+                    key: value * self.batch_discount if key.endswith("_cost") else value for key, value in cost.items()
+                }
+                results[custom_id] = (content, cost, None)
+            except Exception as e:
+                results[custom_id] = (None, _zero_cost(), f"Invalid batch result: {type(e).__name__}: {str(e)}")
+        for custom_id in prompts:
+            if custom_id not in results:
+                results[custom_id] = (None, _zero_cost(), f"No result in batch {batch_id} (status: {batch.status})")
+        return results
+
+    def _batch_request_body(
+        self,
+        input_prompt: str,
+        image_path_list: List[str],
+        kwargs: Optional[Dict[str, Any]] = None,
+        system_message: Optional[str] = None,
+        response_format_class: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """Build the chat completion body of one batch request, asking for the structured response format."""
+        response_format_class = response_format_class or self._response_format_class(None)
+        schema = response_format_class.model_json_schema()
+        schema["additionalProperties"] = False
+        return {
+            "model": self._batch_model_name(),
+            "messages": self._prepare_message_list(input_prompt, image_path_list, system_message=system_message),
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": response_format_class.__name__, "schema": schema, "strict": True},
+            },
+            **(kwargs or {}),
+        }
+
+    def _response_format_class(self, response_format: Optional[Any]) -> Any:
+        """Return the pydantic model of a request's response format, or the provider's own one if none is given.
+
+        Passing the format with each request leaves the provider unchanged, so reviewers can share one provider.
+        """
+        if response_format is None:
+            response_format = getattr(self, "response_format_class", None) or self.response_format
+        if isinstance(response_format, dict):
+            return response_format_model(response_format)
+        if response_format is None:
+            raise ValueError("Response format is not set")
+        return response_format
+
+    def _batch_model_name(self) -> str:
+        """Return the model name as the batch endpoint expects it."""
+        return self.model
+
+    async def _batch_upload_file(self, path: str) -> str:
+        """Upload a JSONL batch file and return its file id."""
+        raise NotImplementedError(f"{self.provider} does not support batch requests")
+
+    async def _batch_create(self, file_id: str) -> str:
+        """Create a batch from an uploaded file and return the batch id."""
+        raise NotImplementedError(f"{self.provider} does not support batch requests")
+
+    async def _batch_retrieve(self, batch_id: str) -> Any:
+        """Return the batch object, which has `status`, `output_file_id` and `error_file_id`."""
+        raise NotImplementedError(f"{self.provider} does not support batch requests")
+
+    async def _batch_file_content(self, file_id: str) -> str:
+        """Return the text content of a batch result file."""
+        raise NotImplementedError(f"{self.provider} does not support batch requests")
+
     def _prepare_message_list(
         self,
         input_prompt: str,
@@ -91,17 +363,135 @@ class BaseProvider(pydantic.BaseModel):
         raise NotImplementedError("Subclasses must implement _fetch_response")
 
     async def _fetch_json_response(
-        self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]] = None
+        self,
+        message_list: List[Dict[str, str]],
+        kwargs: Optional[Dict[str, Any]] = None,
+        response_format_class: Optional[Any] = None,
     ) -> Any:
         """Fetch the JSON-formatted response from the provider."""
         raise NotImplementedError("Subclasses must implement _fetch_json_response")
 
+    def _stream_json_chunks(
+        self,
+        message_list: List[Dict[str, str]],
+        kwargs: Optional[Dict[str, Any]] = None,
+        response_format_class: Optional[Any] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a JSON-formatted response as (text, usage) pairs; usage is None until the provider reports it."""
+        raise NotImplementedError(f"{self.provider} does not support streamed JSON responses")
+
     def _extract_content(self, response: Any) -> Any:
         """Extract content from the provider's response."""
         raise NotImplementedError("Subclasses must implement _extract_content")
 
+    def endpoint_key(self) -> str:
+        """Return the key under which this provider's requests are rate limited."""
+        endpoint = getattr(self, "base_url", None) or getattr(self, "host", None)
+        return endpoint_key(self.provider, endpoint, self.api_key)
+
+    def _shared_transport(self, base_url: Optional[str]) -> Optional[SharedTransport]:
+        """Return the shared connection pool of an endpoint and this provider's API key, if connections are shared."""
+        if not self.share_connections:
+            return None
+        return get_http_clients().transport(base_url, self.api_key)
+
+    def _encode_image(self, image_path: str) -> str:
+        """Return an image as a base64 data URL, downscaled to the provider's image settings and cached."""
+        return image_data_url(image_path, self.image_max_pixels, self.image_detail)
+
+    def _image_url(self, image_path: str) -> Dict[str, str]:
+        """Build the `image_url` part of an OpenAI-style message for an image."""
+        image_url = {"url": self._encode_image(image_path)}
+        if self.image_detail:
+            image_url["detail"] = self.image_detail
+        return image_url
+
+    async def _load_images(self, image_path_list: Any) -> None:
+        """Encode a request's images into the shared image cache in worker threads, off the event loop."""
+        await load_images(image_path_list, self.image_max_pixels, self.image_detail)
+
+    def _request_slot(
+        self, message_list: List[Dict[str, Any]], kwargs: Optional[Dict[str, Any]] = None
+    ) -> AsyncContextManager[RequestLease]:
+        """Reserve a slot for one request with the process-wide scheduler."""
+        scheduler = get_scheduler()
+        key = self.endpoint_key()
+        scheduler.configure(
+            key,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            max_concurrent_requests=self.max_concurrent_requests,
+        )
+        return scheduler.slot(key, tokens=self._estimate_request_tokens(message_list, kwargs))
+
+    def _estimate_request_tokens(
+        self, message_list: List[Dict[str, Any]], kwargs: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Roughly estimate the tokens a request will consume (about 4 characters per token)."""
+        num_chars = 0
+        for message in message_list or []:
+            content = message.get("content")
+            if isinstance(content, str):
+                num_chars += len(content)
+            elif isinstance(content, list):
+                num_chars += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+        kwargs = kwargs or {}
+        max_output_tokens = kwargs.get("max_tokens") or kwargs.get("max_completion_tokens") or 0
+        return num_chars // 4 + int(max_output_tokens)
+
+    def _get_usage(self, usage: Any) -> Dict[str, int]:
+        """Extract input, output and cached input token counts from a response's usage block, if it has one.
+
+        Reads OpenAI-style `prompt_tokens_details.cached_tokens`, Anthropic-style `cache_read_input_tokens`
+        (as reported through LiteLLM) and Ollama's `prompt_eval_count`/`eval_count`.
+        """
+
+        def field(source: Any, name: str) -> Any:
+            return source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+
+        if not usage:
+            return {}
+        input_tokens = field(usage, "prompt_tokens")
+        if input_tokens is None:
+            input_tokens = field(usage, "prompt_eval_count")
+        output_tokens = field(usage, "completion_tokens")
+        if output_tokens is None:
+            output_tokens = field(usage, "eval_count")
+        details = field(usage, "prompt_tokens_details")
+        cached_tokens = field(details, "cached_tokens") if details else None
+        if cached_tokens is None:
+            cached_tokens = field(usage, "cache_read_input_tokens")
+        counts = {"input_tokens": input_tokens, "output_tokens": output_tokens, "cached_input_tokens": cached_tokens}
+        return {key: int(value) for key, value in counts.items() if isinstance(value, (int, float))}
+
+    async def _get_response_cost(self, input_prompt: str, completion_text: str, usage: Any) -> Dict[str, float]:
+        """Price a call from the usage block of its response, with its token counts.
+
+        The prompt and completion are only tokenized when the response reports no usage or the model has no known
+        price, and then off the event loop.
+        """
+        counts = self._get_usage(usage)
+        if not self.calculate_cost:
+            cost = self._get_cost(input_prompt, completion_text)
+        else:
+            cost = self._price_usage(counts)
+            if cost is None:
+                cost = await asyncio.to_thread(self._get_cost, input_prompt, completion_text)
+        cost.update(counts)
+        return cost
+
+    def _price_usage(self, counts: Dict[str, int]) -> Optional[Dict[str, float]]:
+        """Price reported token counts with the cached price table, or return None if they cannot be priced."""
+        return cost_from_usage(self.model, counts)
+
+    def _settle_lease(self, lease: RequestLease, usage: Any) -> None:
+        """Replace a request's estimated tokens with the reported ones in the scheduler's token budget."""
+        counts = self._get_usage(usage)
+        if "input_tokens" in counts or "output_tokens" in counts:
+            lease.settle(counts.get("input_tokens", 0) + counts.get("output_tokens", 0))
+
     def _get_cost(self, input_messages: List[str], completion_text: str) -> Dict[str, float]:
-        """Calculate the cost of a prompt completion."""
+        """Calculate the cost of a prompt completion by tokenizing it."""
         try:        
             if self.calculate_cost:
                 input_cost = calculate_prompt_cost(input_messages, self.model)
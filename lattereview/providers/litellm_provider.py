@@ -1,13 +1,14 @@
 """LiteLLM API provider implementation with comprehensive error handling and type safety."""
 
-import base64
 import inspect
-from typing import Optional, List, Dict, Any, Union, Tuple, Type
+from typing import Optional, List, Dict, Any, AsyncIterator, Union, Tuple, Type
 import json
-from pydantic import BaseModel, create_model
+from pydantic import BaseModel
 import litellm
-from litellm import acompletion, completion_cost
-from .base_provider import BaseProvider, ProviderError, ResponseError, InvalidResponseFormatError
+from litellm import acompletion, cost_per_token
+from ..utils.http_clients import get_http_clients
+from ..utils.validation import response_format_model
+from .base_provider import BATCH_ENDPOINT, BaseProvider, ProviderError, ResponseError, InvalidResponseFormatError
 
 litellm.drop_params = True  # Drop unsupported parameters from the API
 litellm.enable_json_schema_validation = True  # Enable client-side JSON schema validation
@@ -26,6 +27,9 @@ class LiteLLMProvider(BaseProvider):
             data_with_provider["custom_llm_provider"] = custom_llm_provider
 
         super().__init__(**data_with_provider)
+        if self.share_connections and litellm.aclient_session is None:
+            # LiteLLM sends requests to many backends; they share one set of pools, kept per origin by httpx
+            litellm.aclient_session = get_http_clients().client(follow_redirects=True)
 
     def set_response_format(self, response_format: Dict[str, Any]) -> None:
         """Set the response format for JSON responses."""
@@ -34,8 +38,7 @@ class LiteLLMProvider(BaseProvider):
                 raise InvalidResponseFormatError("Response format cannot be empty")
             if isinstance(response_format, dict):
                 self.response_format = response_format
-                fields = {key: (value, ...) for key, value in response_format.items()}
-                self.response_format_class = create_model("ResponseFormat", **fields)
+                self.response_format_class = response_format_model(response_format)
             elif self._check_basemodel_class(response_format):
                 self.response_format_class = response_format
         except Exception as e:
@@ -46,15 +49,16 @@ class LiteLLMProvider(BaseProvider):
         input_prompt: str,
         image_path_list: List[str] = [],
         message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
         **kwargs: Any,
     ) -> Tuple[Any, Dict[str, float]]:
         """Get a response from LiteLLM."""
         try:
-            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list)
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
             response = await self._fetch_response(message_list, kwargs)
             txt_response = self._extract_content(response)
-            cost = completion_cost(completion_response=response)
-
+            cost = await self._get_response_cost(input_prompt, txt_response, getattr(response, "usage", None))
             return txt_response, cost
         except Exception as e:
             raise ResponseError(f"Error getting response: {str(e)}")
@@ -64,17 +68,19 @@ class LiteLLMProvider(BaseProvider):
         input_prompt: str,
         image_path_list: List[str] = [],
         message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
         **kwargs: Any,
     ) -> Tuple[Any, Dict[str, float]]:
-        """Get a JSON response from LiteLLM using the defined schema."""
+        """Get a JSON response from LiteLLM using the request's schema, or the provider's if none is given."""
         try:
-            if not self.response_format_class:
-                raise ValueError("Response format is not set")
+            response_format_class = self._response_format_class(response_format)
 
-            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list)
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
 
             # Pass response format directly to acompletion
-            kwargs["response_format"] = self.response_format_class
+            kwargs["response_format"] = response_format_class
 
             response = await self._fetch_response(message_list, kwargs)
             txt_response = self._extract_content(response)
@@ -83,7 +89,9 @@ class LiteLLMProvider(BaseProvider):
             if isinstance(txt_response, str):
                 txt_response = json.loads(txt_response)
 
-            cost = completion_cost(completion_response=response)
+            cost = await self._get_response_cost(
+                input_prompt, json.dumps(txt_response), getattr(response, "usage", None)
+            )
 
             return txt_response, cost
         except Exception as e:
@@ -104,7 +112,7 @@ class LiteLLMProvider(BaseProvider):
                 else:
                     content = [{"type": "text", "text": input_prompt}]
                     for image_input in image_path_list:
-                        content.append({"type": "image_url", "image_url": {"url": self._encode_image(image_input)}})
+                        content.append({"type": "image_url", "image_url": self._image_url(image_input)})
                     message_list.append({"role": "user", "content": content})
             else:
                 if len(image_path_list) == 0:
@@ -115,7 +123,7 @@ class LiteLLMProvider(BaseProvider):
                 else:
                     content = [{"type": "text", "text": input_prompt}]
                     for image_input in image_path_list:
-                        content.append({"type": "image_url", "image_url": {"url": self._encode_image(image_input)}})
+                        content.append({"type": "image_url", "image_url": self._image_url(image_input)})
                     message_list = [
                         {"role": "system", "content": system_message or self.system_prompt},
                         {"role": "user", "content": content},
@@ -127,13 +135,65 @@ class LiteLLMProvider(BaseProvider):
     async def _fetch_response(self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]] = None) -> Any:
         """Fetch the raw response from LiteLLM."""
         try:
-            response = await acompletion(
-                model=self.model, messages=message_list, custom_llm_provider=self.custom_llm_provider, **(kwargs or {})
-            )
+            async with self._request_slot(message_list, kwargs) as lease:
+                response = await acompletion(
+                    model=self.model,
+                    messages=message_list,
+                    custom_llm_provider=self.custom_llm_provider,
+                    **(kwargs or {}),
+                )
+                self._settle_lease(lease, getattr(response, "usage", None))
             return response
         except Exception as e:
             raise ResponseError(f"Error fetching response: {str(e)}")
 
+    async def _stream_json_chunks(
+        self,
+        message_list: List[Dict[str, str]],
+        kwargs: Optional[Dict[str, Any]] = None,
+        response_format_class: Optional[Any] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a structured response from LiteLLM; the usage block arrives with the last chunk."""
+        kwargs = {**(kwargs or {}), "response_format": response_format_class or self._response_format_class(None)}
+        async with self._request_slot(message_list, kwargs) as lease:
+            response = await acompletion(
+                model=self.model,
+                messages=message_list,
+                custom_llm_provider=self.custom_llm_provider,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs,
+            )
+            try:
+                async for chunk in response:
+                    usage = getattr(chunk, "usage", None)
+                    if usage:
+                        self._settle_lease(lease, usage)
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    yield text or "", usage
+            finally:
+                await response.aclose()
+
+    def _price_usage(self, counts: Dict[str, int]) -> Optional[Dict[str, float]]:
+        """Price reported token counts, falling back to LiteLLM's own price map for provider-specific models."""
+        cost = super()._price_usage(counts)
+        if cost is not None or "input_tokens" not in counts or "output_tokens" not in counts:
+            return cost
+        try:
+            input_cost, output_cost = cost_per_token(
+                model=self.model,
+                prompt_tokens=counts["input_tokens"],
+                completion_tokens=counts["output_tokens"],
+                custom_llm_provider=self.custom_llm_provider,
+            )
+        except Exception:
+            return None
+        return {
+            "input_cost": float(input_cost),
+            "output_cost": float(output_cost),
+            "total_cost": float(input_cost + output_cost),
+        }
+
     def _extract_content(self, response: Any) -> str:
         """Extract content from the response, handling both direct content and tool calls."""
         try:
@@ -158,11 +218,43 @@ class LiteLLMProvider(BaseProvider):
         except Exception as e:
             raise ResponseError(f"Error extracting content: {str(e)}")
 
-    # Function to encode the image
-    def _encode_image(self, image_path):
-        with open(image_path, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode("utf-8")
-            return f"data:image/{image_path.split('.')[-1]};base64,{base64_image}"
+    def _batch_llm_provider(self) -> str:
+        """Return the LiteLLM provider whose batch API is used (OpenAI-compatible providers only)."""
+        if self.custom_llm_provider:
+            return self.custom_llm_provider
+        return self.model.split("/", 1)[0] if "/" in self.model else "openai"
+
+    def _batch_model_name(self) -> str:
+        prefix = f"{self._batch_llm_provider()}/"
+        return self.model[len(prefix) :] if self.model.startswith(prefix) else self.model
+
+    def _batch_kwargs(self) -> Dict[str, Any]:
+        kwargs = {"custom_llm_provider": self._batch_llm_provider()}
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        return kwargs
+
+    async def _batch_upload_file(self, path: str) -> str:
+        with open(path, "rb") as f:
+            uploaded = await litellm.acreate_file(file=f, purpose="batch", **self._batch_kwargs())
+        return uploaded.id
+
+    async def _batch_create(self, file_id: str) -> str:
+        batch = await litellm.acreate_batch(
+            completion_window=self.batch_completion_window,
+            endpoint=BATCH_ENDPOINT,
+            input_file_id=file_id,
+            **self._batch_kwargs(),
+        )
+        return batch.id
+
+    async def _batch_retrieve(self, batch_id: str) -> Any:
+        return await litellm.aretrieve_batch(batch_id=batch_id, **self._batch_kwargs())
+
+    async def _batch_file_content(self, file_id: str) -> str:
+        content = await litellm.afile_content(file_id=file_id, **self._batch_kwargs())
+        return content.text if hasattr(content, "text") else content.content.decode("utf-8")
+
 
     def _check_basemodel_class(self, arg):
         """Check if the argument is a Pydantic BaseModel class."""
@@ -1,13 +1,32 @@
 """Ollama API provider implementation using AsyncClient with comprehensive error handling and type safety."""
 
+import asyncio
+import functools
 import inspect
+import time
 from typing import Optional, List, Dict, Any, Union, Tuple, AsyncGenerator
 import json
 from ollama import AsyncClient
-from pydantic import BaseModel, create_model
+from pydantic import BaseModel
+from ..utils.host_pool import DEFAULT_COOLDOWN, DEFAULT_MAX_FAILURES, HostPool, is_host_failure
+from ..utils.images import encode_image
+from ..utils.validation import response_format_model
 from .base_provider import BaseProvider, ProviderError, ClientCreationError, ResponseError, InvalidResponseFormatError
 
 
+@functools.lru_cache(maxsize=None)
+def format_schema(response_format_class: Any) -> Dict[str, Any]:
+    """Return the JSON schema of a response format class, built once per class."""
+    return response_format_class.model_json_schema()
+
+
+@functools.lru_cache(maxsize=None)
+def format_instructions(response_format_class: Any) -> str:
+    """Return the schema instructions appended to the system message when the server lacks structured outputs."""
+    schema_str = json.dumps(format_schema(response_format_class), indent=2)
+    return f"Please provide your response as a JSON object following this schema:\n{schema_str}"
+
+
 class OllamaProvider(BaseProvider):
     provider: str = "Ollama"
     client: Optional[AsyncClient] = None
@@ -15,23 +34,39 @@ class OllamaProvider(BaseProvider):
     response_format_class: Optional[Any] = None
     invalid_keywords: List[str] = ["temperature", "max_tokens"]
     host: str = "http://localhost:11434"  # Default Ollama API endpoint
+    hosts: Optional[List[str]] = None  # several hosts serving the same model; requests are spread across them
+    host_weights: Optional[Dict[str, float]] = None  # relative capacity of each host (default 1)
+    routing: str = "least_outstanding"  # or "weighted"
+    host_max_failures: int = DEFAULT_MAX_FAILURES  # consecutive failures before a host is taken out of rotation
+    host_cooldown: float = DEFAULT_COOLDOWN  # seconds before a removed host is tried again
+    host_pool: Optional[HostPool] = None
+    clients: Dict[str, AsyncClient] = {}
+    keep_alive: Optional[Union[str, float]] = None  # how long the model stays loaded after a request, e.g. "30m" or -1
+    native_format: bool = True  # send the schema as `format`; False for servers before Ollama 0.5 (prompt + "json")
 
     def __init__(self, **data: Any) -> None:
         """Initialize the Ollama provider with error handling."""
         super().__init__(**data)
         try:
-            self.client = self.create_client()
+            if self.hosts:
+                self.host = self.hosts[0]
+                self.host_pool = HostPool(
+                    self.hosts, self.host_weights, self.routing, self.host_max_failures, self.host_cooldown
+                )
+                self.clients = {host: self.create_client(host) for host in self.hosts}
+                self.client = self.clients[self.host]
+            else:
+                self.client = self.create_client()
         except Exception as e:
             raise ClientCreationError(f"Failed to initialize Ollama: {str(e)}")
 
     def _clean_kwargs(self, kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Remove invalid keywords from kwargs."""
-        if kwargs is None:
-            return {}
-
-        cleaned_kwargs = kwargs.copy()
+        """Remove invalid keywords from kwargs and add the provider's `keep_alive`."""
+        cleaned_kwargs = dict(kwargs or {})
         for keyword in self.invalid_keywords:
             cleaned_kwargs.pop(keyword, None)
+        if self.keep_alive is not None:
+            cleaned_kwargs.setdefault("keep_alive", self.keep_alive)
         return cleaned_kwargs
 
     def set_response_format(self, response_format: Dict[str, Any]) -> None:
@@ -41,17 +76,18 @@ class OllamaProvider(BaseProvider):
                 raise InvalidResponseFormatError("Response format cannot be empty")
             if isinstance(response_format, dict):
                 self.response_format = response_format
-                fields = {key: (value, ...) for key, value in response_format.items()}
-                self.response_format_class = create_model("ResponseFormat", **fields)
+                self.response_format_class = response_format_model(response_format)
             elif self._check_basemodel_class(response_format):
                 self.response_format_class = response_format
         except Exception as e:
             raise ProviderError(f"Error setting response format: {str(e)}")
 
-    def create_client(self) -> AsyncClient:
-        """Create and return the Ollama AsyncClient."""
+    def create_client(self, host: Optional[str] = None) -> AsyncClient:
+        """Create and return the Ollama AsyncClient of a host (default: `host`)."""
         try:
-            return AsyncClient(host=self.host)
+            host = host or self.host
+            transport = self._shared_transport(host)
+            return AsyncClient(host=host, **({"transport": transport} if transport else {}))
         except Exception as e:
             raise ClientCreationError(f"Failed to create Ollama client: {str(e)}")
 
@@ -61,11 +97,13 @@ class OllamaProvider(BaseProvider):
         image_path_list: List[str] = [],
         message_list: Optional[List[Dict[str, str]]] = None,
         stream: bool = False,
+        system_message: Optional[str] = None,
         **kwargs: Any,
     ) -> Union[Tuple[Any, Dict[str, float]], AsyncGenerator[str, None]]:
         """Get a response from Ollama, with optional streaming support."""
         try:
-            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list)
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
 
             if stream:
                 return self._stream_response(message_list, kwargs)
@@ -77,6 +115,7 @@ class OllamaProvider(BaseProvider):
                     "output_cost": 0,
                     "total_cost": 0,
                 }  # Ollama models are local and therefore free.
+                cost.update(self._get_usage(response))
                 return txt_response, cost
         except Exception as e:
             raise ResponseError(f"Error getting response: {str(e)}")
@@ -86,50 +125,58 @@ class OllamaProvider(BaseProvider):
         input_prompt: str,
         image_path_list: List[str] = [],
         message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
         **kwargs: Any,
     ) -> Tuple[Any, Dict[str, float]]:
-        """Get a JSON response from Ollama using the defined schema."""
+        """Get a JSON response from Ollama using the request's schema, or the provider's if none is given."""
         try:
-            if not self.response_format_class:
-                raise ValueError("Response format is not set")
-
-            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list)
-
-            # Update system message to request JSON output
-            if message_list and message_list[0]["role"] == "system":
-                schema_str = json.dumps(self.response_format_class.model_json_schema(), indent=2)
-                message_list[0]["content"] = (
-                    f"{message_list[0]['content']}\n\n"
-                    f"Please provide your response as a JSON object following this schema:\n{schema_str}"
-                )
+            response_format_class = self._response_format_class(response_format)
 
-            # Set format parameter to 'json'
-            cleaned_kwargs = self._clean_kwargs(kwargs)
-            cleaned_kwargs["format"] = "json"
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
 
+            cleaned_kwargs = self._json_request_kwargs(message_list, kwargs, response_format_class)
             response = await self._fetch_response(message_list, cleaned_kwargs)
             txt_response = self._extract_content(response)
             cost = {"input_cost": 0, "output_cost": 0, "total_cost": 0}  # Ollama models are local and therefore free.
+            cost.update(self._get_usage(response))
             return txt_response, cost
         except Exception as e:
             raise ResponseError(f"Error getting JSON response: {str(e)}")
 
+    def _json_request_kwargs(
+        self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]], response_format_class: Any
+    ) -> Dict[str, Any]:
+        """Return the request kwargs constraining the output to the schema, from the cache of schemas."""
+        cleaned_kwargs = self._clean_kwargs(kwargs)
+        if self.native_format:
+            cleaned_kwargs["format"] = format_schema(response_format_class)
+        else:
+            # Older servers only constrain output to JSON, so the schema goes into the system message
+            if message_list and message_list[0]["role"] == "system":
+                instructions = format_instructions(response_format_class)
+                message_list[0]["content"] = f"{message_list[0]['content']}\n\n{instructions}"
+            cleaned_kwargs["format"] = "json"
+        return cleaned_kwargs
+
     def _prepare_message_list(
         self,
         input_prompt: str,
         image_path_list: List[str],
         message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
     ) -> List[Dict[str, str]]:
         """Prepare the message list for the API call."""
         try:
-            if len(image_path_list) == 0:
-                image_path_list = None
+            images = [encode_image(path, self.image_max_pixels, self.image_detail)[1] for path in image_path_list]
+            images = images or None
             if message_list:
-                message_list.append({"role": "user", "content": input_prompt, "images": image_path_list})
+                message_list.append({"role": "user", "content": input_prompt, "images": images})
             else:
                 message_list = [
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": input_prompt, "images": image_path_list},
+                    {"role": "system", "content": system_message or self.system_prompt},
+                    {"role": "user", "content": input_prompt, "images": images},
                 ]
             return message_list
         except Exception as e:
@@ -142,15 +189,107 @@ class OllamaProvider(BaseProvider):
                 raise ValueError("Client not initialized")
 
             cleaned_kwargs = self._clean_kwargs(kwargs)
-            response = await self.client.chat(model=self.model, messages=message_list, **cleaned_kwargs)
+            async with self._request_slot(message_list, cleaned_kwargs) as lease:
+                response = await self._routed_chat(message_list, cleaned_kwargs)
+                self._settle_lease(lease, response)
             return response
         except Exception as e:
             raise ResponseError(f"Error fetching response: {str(e)}")
 
+    async def _routed_chat(self, message_list: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Any:
+        """Send a chat request to the client's host, or through the host pool with failover on host failures.
+
+        With a pool, a request whose host fails (connection error, timeout, 5xx) is sent to another host, each host
+        being tried at most once.
+        """
+        if self.host_pool is None:
+            return await self.client.chat(model=self.model, messages=message_list, **kwargs)
+        tried = []
+        while True:
+            state = self.host_pool.acquire(exclude=tried)
+            started = time.monotonic()
+            try:
+                response = await self.clients[state.host].chat(model=self.model, messages=message_list, **kwargs)
+            except Exception as e:
+                self.host_pool.release(state, e, time.monotonic() - started)
+                tried.append(state.host)
+                if not is_host_failure(e) or len(tried) == len(self.clients):
+                    raise
+                continue
+            output_tokens = self._get_usage(response).get("output_tokens", 0)
+            self.host_pool.release(state, None, time.monotonic() - started, output_tokens)
+            return response
+
+    async def warm_up(self) -> Dict[str, bool]:
+        """Load the model on every host, with the provider's `keep_alive`; returns whether each host loaded it.
+
+        Sending an empty prompt makes Ollama load the model without generating, so the first requests of a run do
+        not wait for the model to load. Failures are reported, not raised; the requests themselves will retry.
+        """
+        clients = self.clients or {self.host: self.client}
+
+        async def load(client: AsyncClient) -> bool:
+            try:
+                await client.generate(model=self.model, keep_alive=self.keep_alive)
+                return True
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(load(client) for client in clients.values()))
+        return dict(zip(clients, results))
+
+    async def check_hosts(self) -> Dict[str, bool]:
+        """Probe every host of the pool and re-admit or remove hosts by the result; returns each host's health."""
+        if self.host_pool is None:
+            return {}
+
+        async def probe(host: str) -> bool:
+            try:
+                await self.clients[host].ps()
+                self.host_pool.mark_healthy(host)
+                return True
+            except Exception:
+                self.host_pool.mark_unhealthy(host)
+                return False
+
+        results = await asyncio.gather(*(probe(host) for host in self.clients))
+        return dict(zip(self.clients, results))
+
+    def host_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host requests, failures, latency and output throughput of the pool."""
+        return self.host_pool.stats() if self.host_pool is not None else {}
+
     async def _stream_response(
         self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]] = None
     ) -> AsyncGenerator[str, None]:
         """Stream the response from Ollama."""
+        parts = self._stream_parts(message_list, kwargs)
+        try:
+            async for part in parts:
+                yield part.message.content
+        finally:
+            await parts.aclose()
+
+    async def _stream_json_chunks(
+        self,
+        message_list: List[Dict[str, str]],
+        kwargs: Optional[Dict[str, Any]] = None,
+        response_format_class: Optional[Any] = None,
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Stream a structured response from Ollama; token counts arrive with the last part."""
+        response_format_class = response_format_class or self._response_format_class(None)
+        cleaned_kwargs = self._json_request_kwargs(message_list, kwargs, response_format_class)
+        parts = self._stream_parts(message_list, cleaned_kwargs)
+        try:
+            async for part in parts:
+                yield part.message.content, part if part.done else None
+        finally:
+            await parts.aclose()
+
+    async def _stream_parts(
+        self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[Any, None]:
+        """Stream the response parts from the client's host, or from a host of the pool."""
         try:
             if not self.client:
                 raise ValueError("Client not initialized")
@@ -158,11 +297,42 @@ class OllamaProvider(BaseProvider):
             cleaned_kwargs = self._clean_kwargs(kwargs)
             cleaned_kwargs["stream"] = True
 
-            async for part in self.client.chat(model=self.model, messages=message_list, **cleaned_kwargs):
-                yield part.message.content
+            async with self._request_slot(message_list, cleaned_kwargs):
+                # Streams are closed explicitly, so a consumer that stops early also stops the generation
+                if self.host_pool is None:
+                    stream = await self.client.chat(model=self.model, messages=message_list, **cleaned_kwargs)
+                    try:
+                        async for part in stream:
+                            yield part
+                    finally:
+                        await stream.aclose()
+                else:
+                    state = self.host_pool.acquire()
+                    started = time.monotonic()
+                    error = None
+                    try:
+                        stream = await self.clients[state.host].chat(
+                            model=self.model, messages=message_list, **cleaned_kwargs
+                        )
+                        try:
+                            async for part in stream:
+                                yield part
+                        finally:
+                            await stream.aclose()
+                    except Exception as e:
+                        error = e
+                        raise
+                    finally:
+                        self.host_pool.release(state, error, time.monotonic() - started)
         except Exception as e:
             raise ResponseError(f"Error streaming response: {str(e)}")
 
+    async def _get_response_cost(self, input_prompt: str, completion_text: str, usage: Any) -> Dict[str, float]:
+        """Ollama models are local and therefore free; only the token counts are reported."""
+        cost = {"input_cost": 0, "output_cost": 0, "total_cost": 0}
+        cost.update(self._get_usage(usage))
+        return cost
+
     def _extract_content(self, response: Any) -> str:
         """Extract content from the response."""
         try:
@@ -174,9 +344,9 @@ class OllamaProvider(BaseProvider):
             raise ResponseError(f"Error extracting content: {str(e)}")
 
     async def close(self) -> None:
-        """Close the client session."""
-        if self.client:
-            await self.client.aclose()
+        """Close the client sessions."""
+        for client in {id(client): client for client in [self.client, *self.clients.values()] if client}.values():
+            await client.aclose()
 
     def _check_basemodel_class(self, arg):
         """Check if the argument is a Pydantic BaseModel class."""
@@ -1,12 +1,20 @@
 """OpenAI API provider implementation with comprehensive error handling and type safety."""
 
-import base64
 import inspect
-from typing import Optional, List, Dict, Any, Tuple, Union
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Union
 import os
-from pydantic import BaseModel, create_model
+from pydantic import BaseModel
+import httpx
 import openai
-from .base_provider import BaseProvider, ProviderError, ClientCreationError, ResponseError, InvalidResponseFormatError
+from ..utils.validation import response_format_model
+from .base_provider import (
+    BATCH_ENDPOINT,
+    BaseProvider,
+    ProviderError,
+    ClientCreationError,
+    ResponseError,
+    InvalidResponseFormatError,
+)
 
 
 class OpenAIProvider(BaseProvider):
@@ -31,8 +39,7 @@ class OpenAIProvider(BaseProvider):
                 raise InvalidResponseFormatError("Response format cannot be empty")
             if isinstance(response_format, dict):
                 self.response_format = response_format
-                fields = {key: (value, ...) for key, value in response_format.items()}
-                self.response_format_class = create_model("ResponseFormat", **fields)
+                self.response_format_class = response_format_model(response_format)
             elif self._check_basemodel_class(response_format):
                 self.response_format_class = response_format
         except Exception as e:
@@ -55,29 +62,42 @@ class OpenAIProvider(BaseProvider):
             self.api_key = os.getenv("GEMINI_API_KEY", self.api_key)
             base_url = base_url or gemini_base_url
             try:
-                return openai.AsyncOpenAI(api_key=self.api_key, base_url=base_url)
+                return openai.AsyncOpenAI(
+                    api_key=self.api_key, base_url=base_url, http_client=self._http_client(base_url)
+                )
             except Exception as e:
                 raise ClientCreationError(f"Failed to create OpenAI client: {str(e)}")
         else:
             base_url = base_url or openai_base_url
             try:
-                return openai.AsyncOpenAI(api_key=self.api_key, base_url=base_url)
+                return openai.AsyncOpenAI(
+                    api_key=self.api_key, base_url=base_url, http_client=self._http_client(base_url)
+                )
             except Exception as e:
                 raise ClientCreationError(f"Failed to create OpenAI client: {str(e)}")
 
+    def _http_client(self, base_url: str) -> Optional[httpx.AsyncClient]:
+        """Build an HTTP client on the endpoint's shared connection pool, or None to let the SDK create its own."""
+        transport = self._shared_transport(base_url)
+        if transport is None:
+            return None
+        return openai.DefaultAsyncHttpxClient(transport=transport)
+
     async def get_response(
         self,
         input_prompt: str,
         image_path_list: List[str] = [],
         message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
         **kwargs: Any,
     ) -> Tuple[Any, Dict[str, float]]:
         """Get a response from OpenAI."""
         try:
-            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list)
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
             response = await self._fetch_response(message_list, kwargs)
             txt_response = self._extract_content(response)
-            cost = self._get_cost(input_messages=input_prompt, completion_text=txt_response)
+            cost = await self._get_response_cost(input_prompt, txt_response, getattr(response, "usage", None))
             return txt_response, cost
         except Exception as e:
             raise ResponseError(f"Error getting response: {str(e)}")
@@ -87,16 +107,21 @@ class OpenAIProvider(BaseProvider):
         input_prompt: str,
         image_path_list: List[str] = [],
         message_list: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
         **kwargs: Any,
     ) -> Tuple[Any, Dict[str, float]]:
-        """Get a JSON response from OpenAI."""
+        """Get a JSON response from OpenAI.
+
+        `system_message` and `response_format` apply to this request only, falling back to the provider's own.
+        """
         try:
-            if not self.response_format_class:
-                raise ValueError("Response format is not set")
-            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list)
-            response = await self._fetch_json_response(message_list, kwargs)
+            response_format_class = self._response_format_class(response_format)
+            await self._load_images(image_path_list)
+            message_list = self._prepare_message_list(input_prompt, image_path_list, message_list, system_message)
+            response = await self._fetch_json_response(message_list, kwargs, response_format_class)
             txt_response = self._extract_content(response)
-            cost = self._get_cost(input_messages=input_prompt, completion_text=txt_response)
+            cost = await self._get_response_cost(input_prompt, txt_response, getattr(response, "usage", None))
             return txt_response, cost
         except Exception as e:
             raise ResponseError(f"Error getting JSON response: {str(e)}")
@@ -116,7 +141,7 @@ class OpenAIProvider(BaseProvider):
                 else:
                     content = [{"type": "text", "text": input_prompt}]
                     for image_input in image_path_list:
-                        content.append({"type": "image_url", "image_url": {"url": self._encode_image(image_input)}})
+                        content.append({"type": "image_url", "image_url": self._image_url(image_input)})
                     message_list.append({"role": "user", "content": content})
             else:
                 if len(image_path_list) == 0:
@@ -127,7 +152,7 @@ class OpenAIProvider(BaseProvider):
                 else:
                     content = [{"type": "text", "text": input_prompt}]
                     for image_input in image_path_list:
-                        content.append({"type": "image_url", "image_url": {"url": self._encode_image(image_input)}})
+                        content.append({"type": "image_url", "image_url": self._image_url(image_input)})
                     message_list = [
                         {"role": "system", "content": system_message or self.system_prompt},
                         {"role": "user", "content": content},
@@ -139,21 +164,57 @@ class OpenAIProvider(BaseProvider):
     async def _fetch_response(self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]] = None) -> Any:
         """Fetch the raw response from OpenAI."""
         try:
-            return await self.client.chat.completions.create(model=self.model, messages=message_list, **(kwargs or {}))
+            async with self._request_slot(message_list, kwargs) as lease:
+                response = await self.client.chat.completions.create(
+                    model=self.model, messages=message_list, **(kwargs or {})
+                )
+                self._settle_lease(lease, getattr(response, "usage", None))
+                return response
         except Exception as e:
             raise ResponseError(f"Error fetching response: {str(e)}")
 
     async def _fetch_json_response(
-        self, message_list: List[Dict[str, str]], kwargs: Optional[Dict[str, Any]] = None
+        self,
+        message_list: List[Dict[str, str]],
+        kwargs: Optional[Dict[str, Any]] = None,
+        response_format_class: Optional[Any] = None,
     ) -> Any:
         """Fetch the JSON response from OpenAI."""
         try:
-            return await self.client.beta.chat.completions.parse(
-                model=self.model, messages=message_list, response_format=self.response_format_class, **(kwargs or {})
-            )
+            async with self._request_slot(message_list, kwargs) as lease:
+                response = await self.client.beta.chat.completions.parse(
+                    model=self.model,
+                    messages=message_list,
+                    response_format=response_format_class or self._response_format_class(None),
+                    **(kwargs or {}),
+                )
+                self._settle_lease(lease, getattr(response, "usage", None))
+                return response
         except Exception as e:
             raise ResponseError(f"Error fetching JSON response: {str(e)}")
 
+    async def _stream_json_chunks(
+        self,
+        message_list: List[Dict[str, str]],
+        kwargs: Optional[Dict[str, Any]] = None,
+        response_format_class: Optional[Any] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a structured response from OpenAI; the usage block arrives with the last chunk."""
+        async with self._request_slot(message_list, kwargs) as lease:
+            async with self.client.chat.completions.stream(
+                model=self.model,
+                messages=message_list,
+                response_format=response_format_class or self._response_format_class(None),
+                stream_options={"include_usage": True},
+                **(kwargs or {}),
+            ) as stream:
+                async for event in stream:
+                    if event.type == "content.delta":
+                        yield event.delta, None
+                    elif event.type == "chunk" and event.chunk.usage:
+                        self._settle_lease(lease, event.chunk.usage)
+                        yield "", event.chunk.usage
+
     def _extract_content(self, response: Any) -> str:
         """Extract content from the response."""
         try:
@@ -164,11 +225,24 @@ class OpenAIProvider(BaseProvider):
         except Exception as e:
             raise ResponseError(f"Error extracting content: {str(e)}")
 
-    # Function to encode the image
-    def _encode_image(self, image_path):
-        with open(image_path, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode("utf-8")
-            return f"data:image/{image_path.split('.')[-1]};base64,{base64_image}"
+    async def _batch_upload_file(self, path: str) -> str:
+        with open(path, "rb") as f:
+            uploaded = await self.client.files.create(file=f, purpose="batch")
+        return uploaded.id
+
+    async def _batch_create(self, file_id: str) -> str:
+        batch = await self.client.batches.create(
+            input_file_id=file_id, endpoint=BATCH_ENDPOINT, completion_window=self.batch_completion_window
+        )
+        return batch.id
+
+    async def _batch_retrieve(self, batch_id: str) -> Any:
+        return await self.client.batches.retrieve(batch_id)
+
+    async def _batch_file_content(self, file_id: str) -> str:
+        content = await self.client.files.content(file_id)
+        return content.text
+
 
     def _check_basemodel_class(self, arg):
         """Check if the argument is a Pydantic BaseModel class."""
@@ -1 +1 @@
-from .data_handler import ris_to_dataframe
\ No newline at end of file
+from .data_handler import ris_to_dataframe, find_duplicates
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""Spending caps in dollars and tokens, checked before every request so a run stops dispatching once one is hit."""
+
+from typing import Any, Iterable, Optional
+
+BUDGET_EXHAUSTED = "budget_exhausted"
+CHARS_PER_TOKEN = 4  # token estimate for responses that report no usage
+
+
+class SpendingBudget:
+    """Cap on the dollars and tokens spent by a reviewer, a round or a whole workflow run.
+
+    Requests are charged as they complete. Once a cap is reached no new request is dispatched, while requests
+    already in flight finish, so the spend can exceed the cap by at most their cost.
+    """
+
+    def __init__(
+        self, max_cost: Optional[float] = None, max_tokens: Optional[int] = None, name: str = "budget"
+    ) -> None:
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.name = name
+        self.spent_cost = 0.0
+        self.spent_tokens = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return (self.max_cost is not None and self.spent_cost >= self.max_cost) or (
+            self.max_tokens is not None and self.spent_tokens >= self.max_tokens
+        )
+
+    def charge(self, cost: Any, estimated_tokens: int = 0) -> None:
+        """Add the cost of one completed request; tokens are estimated if the provider reported none."""
+        tokens = estimated_tokens
+        if isinstance(cost, dict):
+            if "input_tokens" in cost or "output_tokens" in cost:
+                tokens = cost.get("input_tokens", 0) + cost.get("output_tokens", 0)
+            cost = cost["total_cost"]
+        self.spent_cost += float(cost or 0.0)
+        self.spent_tokens += int(tokens)
+
+    def describe(self) -> str:
+        limits = []
+        if self.max_cost is not None:
+            limits.append(f"${self.spent_cost:.4f} of ${self.max_cost:.4f}")
+        if self.max_tokens is not None:
+            limits.append(f"{self.spent_tokens} of {self.max_tokens} tokens")
+        return f"{self.name}: {', '.join(limits) or 'unlimited'}"
+
+
+def exhausted_budget(budgets: Iterable[Optional[SpendingBudget]]) -> Optional[SpendingBudget]:
+    """Return the first exhausted budget among the given ones, if any."""
+    return next((budget for budget in budgets if budget is not None and budget.exhausted), None)
+
+
+def estimate_tokens(*texts: Any) -> int:
+    """Rough token count of request and response texts."""
+    return sum(len(text) if isinstance(text, str) else len(str(text or "")) for text in texts) // CHARS_PER_TOKEN
@@ -0,0 +1,214 @@
+"""Persistent, content-addressed cache of LLM responses backed by SQLite."""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = ".lattereview_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 100_000
+EVICTION_INTERVAL = 100  # run eviction every this many writes
+
+
+class CacheError(Exception):
+    """Base exception for cache-related errors."""
+
+    pass
+
+
+_file_hashes: Dict[Tuple[str, float, int], str] = {}
+
+
+def file_content_hash(path: str) -> str:
+    """Return the SHA-256 of a file's content, memoized by path, modification time and size."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def _stable_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=repr, ensure_ascii=False)
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_prompt: Optional[str],
+    input_prompt: str,
+    model_args: Optional[Dict[str, Any]] = None,
+    response_format: Any = None,
+    image_path_list: Optional[List[str]] = None,
+) -> str:
+    """Hash everything that determines a response into a cache key."""
+    if response_format is not None and hasattr(response_format, "model_json_schema"):
+        response_format = response_format.model_json_schema()
+    payload = {
+        "provider": provider,
+        "model": model,
+        "system_prompt": system_prompt,
+        "input_prompt": input_prompt,
+        "model_args": model_args or {},
+        "response_format": response_format,
+        "images": [file_content_hash(path) for path in image_path_list or []],
+    }
+    return hashlib.sha256(_stable_json(payload).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with age, entry-count and size based eviction.
+
+    By default only deterministic requests (temperature 0) are served from the cache, since sampling at a higher
+    temperature is expected to give a different answer on every call.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        max_size_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        deterministic_only: bool = True,
+    ) -> None:
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        self.deterministic_only = deterministic_only
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        try:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)")
+            self._connection.commit()
+        except sqlite3.Error as e:
+            raise CacheError(f"Error opening response cache at {self.path}: {str(e)}")
+
+    def is_cacheable(self, model_args: Optional[Dict[str, Any]] = None) -> bool:
+        """Return True if a request with these model arguments may be served from the cache."""
+        if not self.deterministic_only:
+            return True
+        return (model_args or {}).get("temperature") == 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for `key`, or None."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.max_age_seconds is not None and now - row[1] > self.max_age_seconds:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, response: Any) -> None:
+        """Store a response under `key`."""
+        serialized = json.dumps(response)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized), now, now),
+            )
+            self._connection.commit()
+            self.writes += 1
+            if self.writes % EVICTION_INTERVAL == 0:
+                self._evict()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, response: Any) -> None:
+        await asyncio.to_thread(self.set, key, response)
+
+    def evict(self) -> int:
+        """Remove expired entries and the least recently used entries beyond the size limits."""
+        with self._lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        removed = 0
+        if self.max_age_seconds is not None:
+            removed += self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+        if self.max_entries is not None:
+            removed += self._connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if self.max_size_bytes is not None:
+            total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total_size > self.max_size_bytes:
+                rows = self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+                stale_keys = []
+                for key, size in rows:
+                    if total_size <= self.max_size_bytes:
+                        break
+                    stale_keys.append((key,))
+                    total_size -= size
+                self._connection.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+                removed += len(stale_keys)
+        self._connection.commit()
+        self.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts and the current size of the cache."""
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
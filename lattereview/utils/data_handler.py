@@ -1,8 +1,16 @@
 import pandas as pd
+import numpy as np
 import re
 import asyncio
 import os
-from typing import Optional, Dict, List, Any
+import zlib
+from typing import Optional, Dict, List, Any, Tuple
+
+DOI_PREFIX_PATTERN = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+MINHASH_PRIME = (1 << 31) - 1  # keeps a * x + b of 32-bit shingle hashes within 64 bits
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 5
 
 
 async def ris_to_dataframe(input_file: str, output_csv: Optional[str] = None) -> pd.DataFrame:
@@ -171,6 +179,160 @@ async def ris_to_dataframe(input_file: str, output_csv: Optional[str] = None) ->
         raise
 
 
+def normalize_doi(doi: Any) -> Optional[str]:
+    """Lower-case a DOI and strip its resolver prefix; missing values give None."""
+    if doi is None or (isinstance(doi, float) and np.isnan(doi)):
+        return None
+    doi = DOI_PREFIX_PATTERN.sub("", str(doi).strip()).strip().lower()
+    return doi or None
+
+
+def normalize_title(text: Any) -> str:
+    """Lower-case a text and reduce it to alphanumeric words separated by single spaces."""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    return " ".join(re.findall(r"[a-z0-9]+", str(text).lower()))
+
+
+def _shingles(text: str, shingle_size: int) -> np.ndarray:
+    """Stable 32-bit hashes of the character shingles of a normalized text."""
+    if len(text) <= shingle_size:
+        return np.array([zlib.crc32(text.encode("utf-8"))], dtype=np.uint64)
+    shingles = {text[i : i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64)
+
+
+def _lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) whose LSH S-curve crosses 50% candidate probability closest to the threshold."""
+    best, best_distance = (1, num_perm), float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        distance = abs((1 / bands) ** (1 / rows) - threshold)
+        if distance < best_distance:
+            best, best_distance = (bands, rows), distance
+    return best
+
+
+def find_duplicates(
+    df: pd.DataFrame,
+    title_column: str = "title",
+    abstract_column: Optional[str] = "abstract",
+    doi_column: Optional[str] = None,
+    threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE_SIZE,
+    seed: int = 1,
+) -> pd.Series:
+    """
+    Group exact and near-duplicate records and map every row to the representative of its group.
+
+    Rows are exact duplicates when their normalized DOI or normalized title match, and near duplicates when the
+    MinHash estimate of the Jaccard similarity of their title+abstract character shingles is at least
+    `threshold`. Candidate pairs come from locality-sensitive hashing of the MinHash signatures, so the cost
+    grows with the number of rows rather than the number of pairs. The representative of a group is its first row.
+    Rows without title or abstract text are only matched by DOI, and a group never holds two different DOIs.
+    Without a title column, rows are only matched by DOI and abstract. The index of `df` must be unique.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Records to deduplicate
+    title_column, abstract_column : str
+        Columns compared for near duplicates; a missing column is ignored
+    doi_column : Optional[str], default=None
+        DOI column; by default a "doi" or "DOI" column is used if there is one
+    threshold : float, default=0.8
+        Minimum estimated Jaccard similarity of two near-duplicate records
+    num_perm : int, default=128
+        Number of MinHash permutations
+
+    Returns:
+    --------
+    pd.Series
+        Indexed like `df`, giving the index of each row's representative (itself for representatives)
+    """
+    if not df.index.is_unique:
+        # Representatives are given as index labels, which must identify a single row
+        raise ValueError("The index has duplicate labels; call df.reset_index(drop=True) before deduplicating")
+    positions = list(range(len(df)))
+    parent = positions[:]
+    group_doi: List[Optional[str]] = [None] * len(df)  # the DOI of each group, kept on its representative
+
+    def find(position: int) -> int:
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    def union(a: int, b: int) -> None:
+        a, b = find(a), find(b)
+        if a == b or (group_doi[a] and group_doi[b] and group_doi[a] != group_doi[b]):
+            return
+        # The earlier row stays the representative
+        parent[max(a, b)] = min(a, b)
+        group_doi[min(a, b)] = group_doi[a] or group_doi[b]
+
+    def union_equal_keys(keys: List[Optional[str]]) -> None:
+        first_seen: Dict[str, int] = {}
+        for position, key in enumerate(keys):
+            if not key:
+                continue
+            if key in first_seen:
+                union(first_seen[key], position)
+            else:
+                first_seen[key] = position
+
+    if doi_column is None:
+        doi_column = next((column for column in ("doi", "DOI") if column in df.columns), None)
+    elif doi_column not in df.columns:
+        raise ValueError(f"DOI column {doi_column!r} not found")
+    if doi_column is None and title_column not in df.columns:
+        raise ValueError(f"Title column {title_column!r} not found, and there is no DOI column to match on")
+    if doi_column is not None:
+        dois = [normalize_doi(doi) for doi in df[doi_column]]
+        union_equal_keys(dois)
+        for position, doi in enumerate(dois):
+            group_doi[find(position)] = group_doi[find(position)] or doi
+    # Empty titles are skipped, so rows without text are never matched by title
+    titles = (
+        [normalize_title(title) for title in df[title_column]] if title_column in df.columns else [""] * len(df)
+    )
+    union_equal_keys(titles)
+
+    if threshold < 1.0 and len(df) > 1:
+        abstracts = (
+            [normalize_title(abstract) for abstract in df[abstract_column]]
+            if abstract_column and abstract_column in df.columns
+            else [""] * len(df)
+        )
+        texts = [f"{title} {abstract}".strip() for title, abstract in zip(titles, abstracts)]
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        # Exact duplicates already have a representative, so only the remaining rows are signed and compared;
+        # rows without text would all share one signature, so they are left out
+        signed = [position for position in positions if find(position) == position and texts[position]]
+        signatures = np.empty((len(signed), num_perm), dtype=np.uint64)
+        for row, position in enumerate(signed):
+            shingles = _shingles(texts[position], shingle_size)
+            signatures[row] = ((a[:, None] * shingles[None, :] + b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+        bands, rows = _lsh_bands(threshold, num_perm)
+        candidates = set()
+        for band in range(bands):
+            buckets: Dict[bytes, List[int]] = {}
+            for row in range(len(signed)):
+                key = signatures[row, band * rows : (band + 1) * rows].tobytes()
+                buckets.setdefault(key, []).append(row)
+            for bucket in buckets.values():
+                candidates.update((bucket[0], other) for other in bucket[1:])
+        for first, other in candidates:
+            if np.mean(signatures[first] == signatures[other]) >= threshold:
+                union(signed[first], signed[other])
+
+    return pd.Series([df.index[find(position)] for position in positions], index=df.index)
+
+
 # Example usage
 async def main():
     # Replace with your actual file path
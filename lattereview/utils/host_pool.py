@@ -0,0 +1,139 @@
+"""Routing of requests across several hosts serving the same model, with failure-based removal and re-admission."""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from .retry import CONNECTION_ERROR, SERVER_ERROR, TIMEOUT, classify_error
+
+ROUTING_STRATEGIES = ("least_outstanding", "weighted")
+HOST_FAILURE_ERRORS = {CONNECTION_ERROR, SERVER_ERROR, TIMEOUT}  # errors that say the host, not the request, failed
+DEFAULT_MAX_FAILURES = 3
+DEFAULT_COOLDOWN = 30.0  # seconds a removed host waits before it is tried again
+
+
+class HostPoolError(Exception):
+    """Base exception for host pool errors."""
+
+    pass
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """Return True for errors that count against the host that served the request."""
+    return classify_error(error) in HOST_FAILURE_ERRORS
+
+
+class HostState:
+    """Routing state and throughput counters of one host."""
+
+    def __init__(self, host: str, weight: float = 1.0) -> None:
+        if weight <= 0:
+            raise HostPoolError(f"Host weight must be positive, got {weight} for {host}")
+        self.host = host
+        self.weight = float(weight)
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.removed_at: Optional[float] = None
+        self.busy_seconds = 0.0
+        self.output_tokens = 0
+        self.current_weight = 0.0  # smooth weighted round-robin counter
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "weight": self.weight,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "average_latency": self.busy_seconds / self.requests if self.requests else None,
+            "output_tokens_per_second": self.output_tokens / self.busy_seconds if self.busy_seconds else None,
+        }
+
+
+class HostPool:
+    """Pick a host for each request among the healthy ones.
+
+    "least_outstanding" sends a request to the host with the fewest requests in flight relative to its weight;
+    "weighted" spreads requests in proportion to the weights with smooth weighted round-robin. A host is removed
+    after `max_failures` consecutive host failures and is given a trial request again once `cooldown` seconds have
+    passed; a success re-admits it. If every host is removed, the one removed longest ago is tried.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        weights: Optional[Dict[str, float]] = None,
+        strategy: str = "least_outstanding",
+        max_failures: int = DEFAULT_MAX_FAILURES,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ) -> None:
+        if strategy not in ROUTING_STRATEGIES:
+            raise HostPoolError(
+                f"Invalid routing strategy: {strategy}. Must be one of {', '.join(ROUTING_STRATEGIES)}."
+            )
+        weights = weights or {}
+        self.hosts: Dict[str, HostState] = {host: HostState(host, weights.get(host, 1.0)) for host in hosts}
+        if not self.hosts:
+            raise HostPoolError("A host pool needs at least one host")
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+
+    def _available(self, exclude: Iterable[str]) -> List[HostState]:
+        now = time.monotonic()
+        candidates = [state for state in self.hosts.values() if state.host not in exclude]
+        available = [state for state in candidates if state.healthy or now - state.removed_at >= self.cooldown]
+        if not available and candidates:
+            available = [min(candidates, key=lambda state: state.removed_at)]
+        return available
+
+    def acquire(self, exclude: Iterable[str] = ()) -> HostState:
+        """Choose a host for one request and count it as in flight; raise if every host is excluded."""
+        available = self._available(set(exclude))
+        if not available:
+            raise HostPoolError("No host left to try")
+        if self.strategy == "weighted":
+            total = sum(state.weight for state in available)
+            for state in available:
+                state.current_weight += state.weight
+            chosen = max(available, key=lambda state: state.current_weight)
+            chosen.current_weight -= total
+        else:
+            chosen = min(available, key=lambda state: (state.in_flight / state.weight, state.requests / state.weight))
+        chosen.in_flight += 1
+        chosen.requests += 1
+        return chosen
+
+    def release(
+        self, state: HostState, error: Optional[BaseException] = None, latency: float = 0.0, output_tokens: int = 0
+    ) -> None:
+        """Record the outcome of a request; host failures count towards removing the host."""
+        state.in_flight -= 1
+        state.busy_seconds += latency
+        state.output_tokens += output_tokens
+        if error is None:
+            self.mark_healthy(state.host)
+        elif is_host_failure(error):
+            state.failures += 1
+            state.consecutive_failures += 1
+            if not state.healthy or state.consecutive_failures >= self.max_failures:
+                self.mark_unhealthy(state.host)
+
+    def mark_healthy(self, host: str) -> None:
+        state = self.hosts[host]
+        state.healthy = True
+        state.consecutive_failures = 0
+        state.removed_at = None
+
+    def mark_unhealthy(self, host: str) -> None:
+        state = self.hosts[host]
+        state.healthy = False
+        state.removed_at = time.monotonic()
+
+    @property
+    def healthy_hosts(self) -> List[str]:
+        return [host for host, state in self.hosts.items() if state.healthy]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {host: state.stats() for host, state in self.hosts.items()}
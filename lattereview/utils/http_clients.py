@@ -0,0 +1,138 @@
+"""Process-wide registry of pooled HTTP connections, shared by every provider talking to the same endpoint."""
+
+import asyncio
+import hashlib
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept open
+CONNECT_EVENTS = ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete")
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """One connection pool per event loop behind a single transport, with request and connection counts.
+
+    Pooled connections belong to the loop that opened them, so each running loop (e.g. each `asyncio.run`) gets its
+    own pool. Clients built on this transport do not close it; the pools are closed by the registry.
+    """
+
+    def __init__(self, **transport_kwargs: Any) -> None:
+        self.transport_kwargs = transport_kwargs
+        self.requests = 0
+        self.connections_opened = 0
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = httpx.AsyncHTTPTransport(**self.transport_kwargs)
+            self._pools[loop] = pool
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        trace = request.extensions.get("trace")
+
+        async def count_connections(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name in CONNECT_EVENTS:
+                self.connections_opened += 1
+            if trace is not None:
+                await trace(event_name, info)
+
+        request.extensions["trace"] = count_connections
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Leave the shared pools open when one of the clients using them is closed."""
+        pass
+
+    async def close_pool(self) -> None:
+        """Close the connection pool of the running event loop."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": max(self.requests - self.connections_opened, 0),
+        }
+
+
+class HttpClientRegistry:
+    """Shared transports keyed by base URL and API key, so provider instances reuse connections and TLS sessions."""
+
+    def __init__(self) -> None:
+        self.max_connections = DEFAULT_MAX_CONNECTIONS
+        self.max_keepalive_connections = DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+        self.keepalive_expiry = DEFAULT_KEEPALIVE_EXPIRY
+        self.http2 = False
+        self._transports: Dict[Tuple[str, str], SharedTransport] = {}
+
+    def configure(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ) -> None:
+        """Change the pool settings; they apply to endpoints first used after the call."""
+        if max_connections is not None:
+            self.max_connections = max_connections
+        if max_keepalive_connections is not None:
+            self.max_keepalive_connections = max_keepalive_connections
+        if keepalive_expiry is not None:
+            self.keepalive_expiry = keepalive_expiry
+        if http2 is not None:
+            self.http2 = http2
+
+    def _key(self, base_url: Optional[str], api_key: Optional[str]) -> Tuple[str, str]:
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12] if api_key else "no-key"
+        return (base_url or "default", key_hash)
+
+    def transport(self, base_url: Optional[str] = None, api_key: Optional[str] = None) -> SharedTransport:
+        """Return the shared transport of an endpoint and API key, creating it on first use."""
+        key = self._key(base_url, api_key)
+        if key not in self._transports:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            self._transports[key] = SharedTransport(limits=limits, http2=self.http2)
+        return self._transports[key]
+
+    def client(
+        self, base_url: Optional[str] = None, api_key: Optional[str] = None, **client_kwargs: Any
+    ) -> httpx.AsyncClient:
+        """Return a new `httpx.AsyncClient` sending its requests through the endpoint's shared transport."""
+        return httpx.AsyncClient(transport=self.transport(base_url, api_key), **client_kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Requests sent and connections opened and reused per endpoint, keyed without exposing API keys."""
+        return {"|".join(key): transport.stats() for key, transport in self._transports.items()}
+
+    async def aclose(self) -> None:
+        """Close the connection pools opened in the running event loop."""
+        for transport in self._transports.values():
+            await transport.close_pool()
+
+    def reset(self) -> None:
+        """Forget all transports and their statistics."""
+        self._transports = {}
+
+
+_registry = HttpClientRegistry()
+
+
+def get_http_clients() -> HttpClientRegistry:
+    """Return the process-wide HTTP client registry."""
+    return _registry
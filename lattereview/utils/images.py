@@ -0,0 +1,168 @@
+"""Shared image pipeline for multimodal requests: each file is read, optionally downscaled and encoded only once."""
+
+import asyncio
+import base64
+import io
+import math
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DETAIL_LEVELS = ("low", "high", "auto")
+LOW_DETAIL_SIDE = 512  # vision models read "low" detail images as a single 512px tile
+HIGH_DETAIL_SIDE = 2048  # "high" detail images are fitted into a 2048px square...
+HIGH_DETAIL_SHORT_SIDE = 768  # ...then scaled so their shortest side is at most 768px
+MIME_SUBTYPES = {"jpg": "jpeg", "jpeg": "jpeg", "png": "png", "gif": "gif", "webp": "webp"}
+
+ImageKey = Tuple[str, int, int, Optional[int], Optional[str]]
+
+
+class ImageError(Exception):
+    """Base exception for image-related errors."""
+
+    pass
+
+
+def target_size(
+    width: int, height: int, max_pixels: Optional[int] = None, detail: Optional[str] = None
+) -> Tuple[int, int]:
+    """Return the size an image is downscaled to for a pixel budget and a detail level; images are never upscaled."""
+    scale = 1.0
+    if max_pixels is not None and width * height > max_pixels:
+        scale = min(scale, math.sqrt(max_pixels / (width * height)))
+    if detail == "low":
+        scale = min(scale, LOW_DETAIL_SIDE / max(width, height))
+    elif detail == "high":
+        scale = min(scale, HIGH_DETAIL_SIDE / max(width, height))
+        scale = min(scale, HIGH_DETAIL_SHORT_SIDE / min(width, height))
+    if scale >= 1.0:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class ImageCache:
+    """In-memory LRU cache of encoded image payloads, bounded by entry count and total encoded size.
+
+    Entries are keyed by path, modification time, file size and resize settings, so an edited file is re-encoded.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[ImageKey, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ImageKey) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: ImageKey, payload: Tuple[str, str]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= len(self._entries.pop(key)[1])
+            self._entries[key] = payload
+            self.size_bytes += len(payload[1])
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.size_bytes > self.max_bytes and len(self._entries) > 1)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_image_cache = ImageCache()
+
+
+def get_image_cache() -> ImageCache:
+    """Return the process-wide image cache shared by every provider."""
+    return _image_cache
+
+
+def _image_key(path: str, max_pixels: Optional[int], detail: Optional[str]) -> ImageKey:
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, max_pixels, detail)
+
+
+def _read_image(path: str, max_pixels: Optional[int], detail: Optional[str]) -> Tuple[str, str]:
+    """Read an image file, downscale it if needed and return its MIME subtype and base64 content."""
+    with open(path, "rb") as f:
+        data = f.read()
+    subtype = MIME_SUBTYPES.get(path.rsplit(".", 1)[-1].lower(), path.rsplit(".", 1)[-1].lower())
+    if max_pixels is not None or detail in ("low", "high"):
+        try:
+            from PIL import Image
+        except ImportError:
+            warnings.warn("Pillow is not installed; images are sent without downscaling")
+        else:
+            with Image.open(io.BytesIO(data)) as image:
+                size = target_size(image.width, image.height, max_pixels, detail)
+                if size != (image.width, image.height):
+                    image_format = image.format or "PNG"
+                    resized = image.resize(size, Image.LANCZOS)
+                    if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+                        resized = resized.convert("RGB")
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format=image_format)
+                    data = buffer.getvalue()
+                    subtype = MIME_SUBTYPES.get(image_format.lower(), image_format.lower())
+    return subtype, base64.b64encode(data).decode("utf-8")
+
+
+def encode_image(
+    path: str, max_pixels: Optional[int] = None, detail: Optional[str] = None, cache: Optional[ImageCache] = None
+) -> Tuple[str, str]:
+    """Return the MIME subtype and base64 content of an image, downscaled to `max_pixels` and `detail`.
+
+    Payloads are served from the shared cache after the first encoding of a file.
+    """
+    if detail is not None and detail not in DETAIL_LEVELS:
+        raise ImageError(f"Invalid image detail: {detail}. Must be one of {', '.join(DETAIL_LEVELS)}.")
+    cache = cache or _image_cache
+    key = _image_key(path, max_pixels, detail)
+    payload = cache.get(key)
+    if payload is None:
+        payload = _read_image(path, max_pixels, detail)
+        cache.put(key, payload)
+    return payload
+
+
+def image_data_url(path: str, max_pixels: Optional[int] = None, detail: Optional[str] = None) -> str:
+    """Return an image as a base64 data URL, as accepted by OpenAI-style chat APIs."""
+    subtype, content = encode_image(path, max_pixels, detail)
+    return f"data:image/{subtype};base64,{content}"
+
+
+async def load_images(paths: Iterable[str], max_pixels: Optional[int] = None, detail: Optional[str] = None) -> None:
+    """Encode images into the shared cache in worker threads, so request building never reads files on the loop."""
+    await asyncio.gather(
+        *(asyncio.to_thread(encode_image, path, max_pixels, detail) for path in dict.fromkeys(paths or []))
+    )
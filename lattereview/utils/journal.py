@@ -0,0 +1,87 @@
+"""Append-only JSONL journal of completed review results, used to resume interrupted workflow runs."""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JournalError(Exception):
+    """Base exception for journal-related errors."""
+
+    pass
+
+
+def _json_index(index: Any) -> Any:
+    """Convert a DataFrame index value (e.g. numpy.int64) to a JSON-native value."""
+    return index.item() if hasattr(index, "item") else index
+
+
+def _index_key(index: Any) -> str:
+    return json.dumps(_json_index(index), default=str)
+
+
+def input_hash(text_input_string: str, image_path_list: Optional[List[str]] = None) -> str:
+    """Fingerprint of a reviewer's input, so journaled results are not reused for changed data."""
+    payload = json.dumps([text_input_string, list(image_path_list or [])])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ReviewJournal:
+    """One JSON line per completed (round, reviewer, item) result, flushed as soon as it arrives."""
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._records: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def load(self) -> int:
+        """Read the journal from disk, returning the number of usable records."""
+        self._records = {}
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a truncated last line; the result is simply requested again
+                    continue
+                key = (str(record["round"]), record["reviewer"], _index_key(record["index"]))
+                self._records[key] = record
+        return len(self._records)
+
+    def lookup(self, round_id: str, reviewer_name: str, index: Any, item_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the journaled record for an item, unless its input has changed since it was recorded."""
+        record = self._records.get((str(round_id), reviewer_name, _index_key(index)))
+        if record is None or record.get("input_hash") != item_hash:
+            return None
+        return record
+
+    def append(
+        self, round_id: str, reviewer_name: str, index: Any, item_hash: str, response: Any, cost: Any
+    ) -> None:
+        """Append one completed result to the journal."""
+        if isinstance(cost, dict):
+            cost = cost["total_cost"]
+        record = {
+            "round": str(round_id),
+            "reviewer": reviewer_name,
+            "index": _json_index(index),
+            "input_hash": item_hash,
+            "response": response,
+            "cost": float(cost),
+        }
+        try:
+            line = json.dumps(record, default=str)
+            with self._lock:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                    f.flush()
+                self._records[(record["round"], reviewer_name, _index_key(index))] = record
+        except (OSError, TypeError, ValueError) as e:
+            raise JournalError(f"Error writing to journal {self.path}: {str(e)}")
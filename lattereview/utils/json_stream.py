@@ -0,0 +1,194 @@
+"""Incremental parsing of a streamed JSON object, with each field validated as soon as its value is complete."""
+
+import functools
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+VALUE_START = set('{["-0123456789tfn')  # characters a JSON value can start with
+STRING_SPECIAL = re.compile(r'["\\]')
+MAX_LEADING_TEXT = 200  # characters of prose or code fence allowed before the object starts
+
+
+class JsonStreamError(ValueError):
+    """Raised as soon as a streamed response can no longer be a valid JSON object of the expected format."""
+
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _field_adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+class JsonStreamParser:
+    """Parse a JSON object from text chunks as they arrive.
+
+    Each top-level field is decoded and checked against the response format class when its value ends, so malformed
+    output is rejected at the first bad character or field instead of after the whole completion. Up to
+    `MAX_LEADING_TEXT` characters before the opening brace (e.g. a code fence or a short preamble) are skipped, and text
+    after the closing brace is ignored. `complete` turns True once every key of `required_keys` (default: all fields of
+    the format) has a value.
+    """
+
+    def __init__(self, response_format_class: Optional[Any] = None, required_keys: Optional[Iterable[str]] = None):
+        self.fields = dict(response_format_class.model_fields) if response_format_class is not None else {}
+        self.required_keys = set(self.fields if required_keys is None else required_keys)
+        unknown = self.required_keys - set(self.fields) if self.fields else set()
+        if unknown:
+            raise JsonStreamError(f"Required keys not in the response format: {', '.join(sorted(unknown))}")
+        self.values: Dict[str, Any] = {}
+        self._chunks: List[str] = []
+        self._state = "start"
+        self._buffer: List[str] = []
+        self._key: Optional[str] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._after_comma = False
+        self._value_started = False
+        self._completed: List[str] = []
+        self._leading = 0
+
+    @property
+    def text(self) -> str:
+        """All text received so far."""
+        return "".join(self._chunks)
+
+    @property
+    def complete(self) -> bool:
+        """True once every required key has a value."""
+        return self.required_keys <= self.values.keys()
+
+    @property
+    def done(self) -> bool:
+        """True once the closing brace of the object has been read."""
+        return self._state == "end"
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk of text; returns the keys whose values it completed."""
+        self._chunks.append(chunk)
+        self._completed = []
+        position = 0
+        while position < len(chunk):
+            if self._in_string:
+                position = self._scan_string(chunk, position)
+            else:
+                self._consume(chunk[position])
+                position += 1
+        return self._completed
+
+    def close(self) -> None:
+        """Check that the stream ended with a complete object, or with every required key once generation stopped."""
+        if not self.done and not (self.required_keys and self.complete):
+            raise JsonStreamError("Response ended before the JSON object was complete")
+        missing = [key for key, field in self.fields.items() if field.is_required() and key not in self.values]
+        if self.done and missing:
+            raise JsonStreamError(f"Response is missing required fields: {', '.join(missing)}")
+
+    def result(self) -> Dict[str, Any]:
+        """The fields received, with the format's fields that were not received set to None."""
+        if not self.fields:
+            return dict(self.values)
+        return {key: self.values.get(key) for key in self.fields}
+
+    def _scan_string(self, chunk: str, position: int) -> int:
+        """Copy string content up to the next quote or backslash in one step; returns the new position."""
+        if self._escaped:
+            self._buffer.append(chunk[position])
+            self._escaped = False
+            return position + 1
+        match = STRING_SPECIAL.search(chunk, position)
+        end = match.start() if match else len(chunk)
+        self._buffer.append(chunk[position:end])
+        if match is None:
+            return end
+        self._buffer.append(match.group())
+        if match.group() == "\\":
+            self._escaped = True
+        else:
+            self._in_string = False
+            if self._state == "key":
+                self._end_key()
+            elif self._depth == 0:
+                self._end_value()
+        return end + 1
+
+    def _consume(self, char: str) -> None:
+        state = self._state
+        if state == "value":
+            self._consume_value(char)
+            return
+        if char.isspace():
+            return
+        if state == "start":
+            if char != "{":
+                self._leading += 1
+                if self._leading > MAX_LEADING_TEXT:
+                    raise JsonStreamError(f"Expected a JSON object within {MAX_LEADING_TEXT} characters")
+                return
+            self._state = "key_or_end"
+        elif state == "key_or_end":
+            if char == '"':
+                self._state, self._in_string, self._buffer = "key", True, ['"']
+            elif char == "}" and not self._after_comma:
+                self._state = "end"
+            else:
+                raise JsonStreamError(f"Expected a field name, got {char!r}")
+        elif state == "colon":
+            if char != ":":
+                raise JsonStreamError(f"Expected ':' after field {self._key!r}, got {char!r}")
+            self._state, self._buffer, self._depth, self._value_started = "value", [], 0, False
+        elif state == "comma_or_end":
+            if char == ",":
+                self._state, self._after_comma = "key_or_end", True
+            elif char == "}":
+                self._state = "end"
+            else:
+                raise JsonStreamError(f"Expected ',' or '}}' after field {self._key!r}, got {char!r}")
+        # Text after the closing brace is ignored
+
+    def _end_key(self) -> None:
+        key = json.loads("".join(self._buffer))
+        if key in self.values:
+            raise JsonStreamError(f"Field {key!r} appears twice")
+        self._key, self._state, self._after_comma = key, "colon", False
+
+    def _consume_value(self, char: str) -> None:
+        """Read a value; strings and containers end at their closing character, other values at ',' or '}'."""
+        if not self._value_started:
+            if char.isspace():
+                return
+            if char not in VALUE_START:
+                raise JsonStreamError(f"Invalid start of the value of {self._key!r}: {char!r}")
+            self._value_started = True
+        if self._depth == 0 and (char in ",}" or char.isspace()):
+            self._end_value()
+            self._consume(char)
+            return
+        self._buffer.append(char)
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_value()
+
+    def _end_value(self) -> None:
+        try:
+            value = json.loads("".join(self._buffer))
+        except json.JSONDecodeError as e:
+            raise JsonStreamError(f"Invalid value for {self._key!r}: {e}")
+        field = self.fields.get(self._key)
+        if field is not None:
+            try:
+                _field_adapter(field.annotation).validate_python(value)
+            except ValidationError as e:
+                raise JsonStreamError(f"Invalid value for {self._key!r}: {e.errors()[0]['msg']}")
+        self.values[self._key] = value
+        self._completed.append(self._key)
+        self._state = "comma_or_end"
@@ -0,0 +1,38 @@
+"""Per-token prices, looked up once per model, to price calls from the token usage the API reports."""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+from tokencost import TOKEN_COSTS
+
+
+@lru_cache(maxsize=256)
+def get_model_prices(model: str) -> Optional[Dict[str, float]]:
+    """Return the per-token input, cached input and output prices of a model, or None if it has no known price.
+
+    Names are tried as given and without a provider prefix (e.g. "gemini/gemini-1.5-flash").
+    """
+    for name in dict.fromkeys([model, model.lower(), model.split("/", 1)[-1]]):
+        entry = TOKEN_COSTS.get(name)
+        if entry and entry.get("input_cost_per_token") is not None and entry.get("output_cost_per_token") is not None:
+            input_price = float(entry["input_cost_per_token"])
+            return {
+                "input": input_price,
+                "cached_input": float(entry.get("cache_read_input_token_cost") or input_price),
+                "output": float(entry["output_cost_per_token"]),
+            }
+    return None
+
+
+def cost_from_usage(model: str, usage: Dict[str, int]) -> Optional[Dict[str, float]]:
+    """Price a call from its token counts; cached input tokens are billed at the cache-read price.
+
+    Returns None when the model has no known price or the usage lacks input or output token counts.
+    """
+    prices = get_model_prices(model)
+    if prices is None or "input_tokens" not in usage or "output_tokens" not in usage:
+        return None
+    cached_tokens = min(usage.get("cached_input_tokens", 0), usage["input_tokens"])
+    input_cost = (usage["input_tokens"] - cached_tokens) * prices["input"] + cached_tokens * prices["cached_input"]
+    output_cost = usage["output_tokens"] * prices["output"]
+    return {"input_cost": input_cost, "output_cost": output_cost, "total_cost": input_cost + output_cost}
@@ -0,0 +1,145 @@
+"""Retry policy with error classification, capped exponential backoff, jitter and Retry-After support."""
+
+import asyncio
+import email.utils
+import json
+import random
+import time
+from typing import Iterator, Optional
+
+import pydantic
+
+from .json_stream import JsonStreamError
+from .validation import ResponseValidationError
+
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+SERVER_ERROR = "server_error"
+CONNECTION_ERROR = "connection_error"
+MALFORMED_RESPONSE = "malformed_response"
+AUTHENTICATION_ERROR = "authentication_error"
+BAD_REQUEST = "bad_request"
+UNKNOWN_ERROR = "unknown_error"
+
+RETRYABLE_ERRORS = {RATE_LIMIT, TIMEOUT, SERVER_ERROR, CONNECTION_ERROR, MALFORMED_RESPONSE}
+FATAL_ERRORS = {AUTHENTICATION_ERROR, BAD_REQUEST}
+
+
+def iter_exception_chain(error: BaseException) -> Iterator[BaseException]:
+    """Yield an exception followed by the exceptions it was raised from."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _classify_single(error: BaseException) -> Optional[str]:
+    """Classify one exception by type, status code and name, or return None if it carries no signal."""
+    name = type(error).__name__
+    status_code = getattr(error, "status_code", None)
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in name:
+        return TIMEOUT
+    if status_code == 429 or "RateLimit" in name:
+        return RATE_LIMIT
+    if isinstance(status_code, int) and status_code >= 500:
+        return SERVER_ERROR
+    if status_code in (401, 403) or "Authentication" in name or "PermissionDenied" in name:
+        return AUTHENTICATION_ERROR
+    if status_code in (400, 404, 422) or "BadRequest" in name or "NotFound" in name:
+        return BAD_REQUEST
+    if isinstance(error, (json.JSONDecodeError, pydantic.ValidationError, JsonStreamError, ResponseValidationError)):
+        return MALFORMED_RESPONSE
+    if isinstance(error, ConnectionError) or "Connection" in name:
+        return CONNECTION_ERROR
+    return None
+
+
+def classify_error(error: BaseException) -> str:
+    """Return the error class of the first exception in the chain that carries a recognizable signal."""
+    for exc in iter_exception_chain(error):
+        error_class = _classify_single(exc)
+        if error_class:
+            return error_class
+    return UNKNOWN_ERROR
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Return the server-requested delay in seconds from `Retry-After`/`retry-after-ms` headers, if any."""
+    for exc in iter_exception_chain(error):
+        headers = getattr(exc, "headers", None)
+        if headers is None and getattr(exc, "response", None) is not None:
+            headers = getattr(exc.response, "headers", None)
+        if not headers:
+            continue
+        try:
+            headers = {str(k).lower(): v for k, v in dict(headers).items()}
+        except Exception:
+            continue
+        if headers.get("retry-after-ms"):
+            try:
+                return max(0.0, float(headers["retry-after-ms"]) / 1000)
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+class RetryBudget:
+    """Shared allowance of retries for a whole run, so a failing provider cannot multiply traffic."""
+
+    def __init__(self, max_retries: Optional[int] = None) -> None:
+        self.max_retries = max_retries
+        self.used = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.max_retries is None else max(0, self.max_retries - self.used)
+
+    def try_spend(self) -> bool:
+        """Consume one retry if the budget allows it."""
+        if self.max_retries is not None and self.used >= self.max_retries:
+            return False
+        self.used += 1
+        return True
+
+
+class RetryPolicy(pydantic.BaseModel):
+    max_retries: int = 3  # retries after the first attempt, per item
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    jitter: float = 1.0  # fraction of the backoff randomized ("full jitter" when 1.0)
+    honor_retry_after: bool = True
+    retry_budget: Optional[int] = None  # total retries allowed per run; None means unlimited
+    retry_unknown_errors: bool = True
+
+    def is_retryable(self, error_class: str) -> bool:
+        """Return True if an error of the given class may be retried."""
+        if error_class in RETRYABLE_ERRORS:
+            return True
+        if error_class in FATAL_ERRORS:
+            return False
+        return self.retry_unknown_errors
+
+    def compute_delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Return the delay before retry number `attempt + 1`, honoring Retry-After when present."""
+        backoff = min(self.max_delay, self.base_delay * (2**attempt))
+        delay = backoff - random.uniform(0, backoff * self.jitter)
+        if error is not None and self.honor_retry_after:
+            retry_after = get_retry_after(error)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.max_delay))
+        return max(0.0, delay)
+
+    def new_budget(self) -> RetryBudget:
+        """Create the retry budget for one run."""
+        return RetryBudget(self.retry_budget)
@@ -0,0 +1,362 @@
+"""Process-wide request scheduler enforcing per-endpoint rate and concurrency limits."""
+
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from .retry import RATE_LIMIT, SERVER_ERROR, TIMEOUT, classify_error
+
+
+class SchedulerError(Exception):
+    """Base exception for scheduler-related errors."""
+
+    pass
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously at `per_minute / 60` tokens per second."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Return the seconds to wait before `amount` tokens are available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or charge (negative) tokens after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class EndpointLimiter:
+    """Requests-per-minute, tokens-per-minute and concurrency limits for one endpoint/key."""
+
+    def __init__(
+        self,
+        key: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrent_requests: Optional[int] = None,
+    ) -> None:
+        self.key = key
+        self.requests_per_minute = None
+        self.tokens_per_minute = None
+        self.max_concurrent_requests = None
+        self._request_bucket: Optional[_TokenBucket] = None
+        self._token_bucket: Optional[_TokenBucket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self.in_flight = 0
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.total_wait_seconds = 0.0
+        self.configure(requests_per_minute, tokens_per_minute, max_concurrent_requests)
+
+    def configure(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrent_requests: Optional[int] = None,
+        override: bool = False,
+    ) -> None:
+        """Apply limits to the endpoint.
+
+        By default a limit can only be tightened: when set more than once, the strictest value wins, so providers
+        sharing an endpoint never loosen each other's limits. With `override=True` the given values replace the
+        current ones, which is the only way to raise a limit short of `RequestScheduler.reset`. Limits passed as None
+        are left unchanged either way.
+        """
+        for name, value in (
+            ("requests_per_minute", requests_per_minute),
+            ("tokens_per_minute", tokens_per_minute),
+            ("max_concurrent_requests", max_concurrent_requests),
+        ):
+            if value is None:
+                continue
+            if value <= 0:
+                raise SchedulerError(f"{name} must be positive, got {value}")
+            current = getattr(self, name)
+            if current is None or value < current or (override and value != current):
+                setattr(self, name, value)
+                if name == "requests_per_minute":
+                    self._request_bucket = _TokenBucket(value)
+                elif name == "tokens_per_minute":
+                    self._token_bucket = _TokenBucket(value)
+
+    def _bind_loop(self) -> None:
+        """(Re)create the asyncio primitives when used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._condition = asyncio.Condition()
+            self.in_flight = 0
+
+    def _has_capacity(self) -> bool:
+        return self.max_concurrent_requests is None or self.in_flight < self.max_concurrent_requests
+
+    def _rate_wait_time(self, tokens: float) -> float:
+        wait = 0.0
+        if self._request_bucket:
+            wait = max(wait, self._request_bucket.wait_time(1))
+        if self._token_bucket and tokens:
+            wait = max(wait, self._token_bucket.wait_time(tokens))
+        return wait
+
+    async def acquire(self, tokens: float = 0) -> None:
+        """Wait, in FIFO order, until a request of `tokens` estimated tokens may be sent."""
+        self._bind_loop()
+        started = time.monotonic()
+        async with self._lock:
+            async with self._condition:
+                await self._condition.wait_for(self._has_capacity)
+                self.in_flight += 1
+            try:
+                while True:
+                    wait = self._rate_wait_time(tokens)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+            except BaseException:
+                await self.release()
+                raise
+            if self._request_bucket:
+                self._request_bucket.consume(1)
+            if self._token_bucket and tokens:
+                self._token_bucket.consume(tokens)
+        self.total_requests += 1
+        self.total_tokens += tokens
+        self.total_wait_seconds += time.monotonic() - started
+
+    async def release(self) -> None:
+        """Free the concurrency slot taken by `acquire`."""
+        async with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._condition.notify_all()
+
+    def settle(self, estimated_tokens: float, actual_tokens: float) -> None:
+        """Correct the token budget once the real usage of a request is known."""
+        self.total_tokens += actual_tokens - estimated_tokens
+        if self._token_bucket:
+            self._token_bucket.adjust(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "in_flight": self.in_flight,
+            "total_requests": self.total_requests,
+            "total_tokens": self.total_tokens,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
+
+
+class RequestLease:
+    """Handle for a scheduled request, used to report its actual token usage."""
+
+    def __init__(self, limiter: EndpointLimiter, estimated_tokens: float) -> None:
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self._settled = False
+
+    def settle(self, actual_tokens: Optional[float]) -> None:
+        if actual_tokens is None or self._settled:
+            return
+        self._settled = True
+        self.limiter.settle(self.estimated_tokens, actual_tokens)
+
+
+class RequestScheduler:
+    """Registry of endpoint limiters shared by every provider and reviewer in the process."""
+
+    def __init__(self) -> None:
+        self._limiters: Dict[str, EndpointLimiter] = {}
+
+    def configure(
+        self,
+        key: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrent_requests: Optional[int] = None,
+        override: bool = False,
+    ) -> EndpointLimiter:
+        """Set limits for an endpoint key, creating its limiter if needed.
+
+        The strictest value wins unless `override` is True, in which case the given values replace the current limits
+        (see `EndpointLimiter.configure`).
+        """
+        limiter = self.limiter(key)
+        limiter.configure(requests_per_minute, tokens_per_minute, max_concurrent_requests, override=override)
+        return limiter
+
+    def limiter(self, key: str) -> EndpointLimiter:
+        if key not in self._limiters:
+            self._limiters[key] = EndpointLimiter(key)
+        return self._limiters[key]
+
+    @asynccontextmanager
+    async def slot(self, key: str, tokens: float = 0) -> AsyncIterator[RequestLease]:
+        """Hold a request slot on `key` for the duration of the block."""
+        limiter = self.limiter(key)
+        await limiter.acquire(tokens)
+        try:
+            yield RequestLease(limiter, tokens)
+        finally:
+            await limiter.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: limiter.stats() for key, limiter in self._limiters.items()}
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Forget the limiter of `key`, or all limiters when no key is given, along with their statistics."""
+        if key is None:
+            self._limiters = {}
+        else:
+            self._limiters.pop(key, None)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Return True for rate limits (429), server errors (5xx) and timeouts anywhere in the chain."""
+    return classify_error(error) in (RATE_LIMIT, SERVER_ERROR, TIMEOUT)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase/multiplicative-decrease (AIMD) window of in-flight requests.
+
+    The window grows by `increase` after a full window of requests completes with healthy latency, and is
+    multiplied by `decrease_factor` when a request fails with a rate limit, server error or timeout. Failures
+    of requests started before the last decrease are ignored so one burst of errors only backs off once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        if not 0 < decrease_factor < 1:
+            raise SchedulerError(f"decrease_factor must be between 0 and 1, got {decrease_factor}")
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.history: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+        self._last_decrease = float("-inf")
+        self._successes = 0
+        self._baseline_latency: Optional[float] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._record("initial")
+
+    @property
+    def window(self) -> int:
+        return int(self.limit)
+
+    def _record(self, reason: str) -> None:
+        self.history.append(
+            {"elapsed_seconds": round(time.monotonic() - self._started, 3), "window": self.window, "reason": reason}
+        )
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self.in_flight = 0
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot, feeding the outcome and latency of the block back into the window."""
+        self._bind_loop()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.window)
+            self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.in_flight -= 1
+            self.record_failure(e, started)
+            await self._notify()
+            raise
+        except BaseException:
+            self.in_flight -= 1
+            await self._notify()
+            raise
+        self.in_flight -= 1
+        self.record_success(time.monotonic() - started)
+        await self._notify()
+
+    def record_success(self, latency: float) -> None:
+        """Grow the window by `increase` once per window of healthy completions."""
+        if self._baseline_latency is None or latency < self._baseline_latency:
+            self._baseline_latency = latency
+        else:
+            # Drift slowly upwards so a slow period does not immediately become the new normal
+            self._baseline_latency = 0.95 * self._baseline_latency + 0.05 * latency
+        if latency > self.latency_tolerance * self._baseline_latency:
+            self._successes = 0
+            return
+        self._successes += 1
+        if self._successes >= self.window and self.limit < self.max_limit:
+            self._successes = 0
+            self.limit = min(self.max_limit, self.limit + self.increase)
+            self._record("increase")
+
+    def record_failure(self, error: BaseException, started: Optional[float] = None) -> None:
+        """Shrink the window multiplicatively on overload errors."""
+        if not is_overload_error(error):
+            return
+        if started is not None and started < self._last_decrease:
+            return
+        self._successes = 0
+        self._last_decrease = time.monotonic()
+        new_limit = max(self.min_limit, self.limit * self.decrease_factor)
+        if new_limit != self.limit:
+            self.limit = new_limit
+            self._record("decrease")
+
+
+_scheduler = RequestScheduler()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide request scheduler."""
+    return _scheduler
+
+
+def endpoint_key(provider: str, endpoint: Optional[str] = None, api_key: Optional[str] = None) -> str:
+    """Build the scheduler key for a provider endpoint without exposing the API key."""
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12] if api_key else "no-key"
+    return f"{provider}|{endpoint or 'default'}|{key_hash}"
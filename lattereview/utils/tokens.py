@@ -0,0 +1,46 @@
+"""Token counting and token-based price lookups used to estimate a run before sending any request."""
+
+from functools import lru_cache
+from typing import Any, Optional
+
+from .pricing import cost_from_usage
+
+CHARS_PER_TOKEN = 4  # fallback estimate when no tokenizer is available for a model
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=64)
+def get_encoding(model: str) -> Optional[Any]:
+    """Return the tiktoken encoding of a model, or None when it cannot be loaded (e.g. offline).
+
+    Encodings are loaded once per model; a failed load is cached too, so counting falls back to the
+    character estimate without retrying the download for every prompt.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model.split("/")[-1])
+    except KeyError:
+        pass
+    except Exception:
+        return None
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of a text with the model's tokenizer, or estimate them from its length."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def token_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Price a number of input and output tokens, or return None for models without a known price."""
+    cost = cost_from_usage(model, {"input_tokens": input_tokens, "output_tokens": output_tokens})
+    return None if cost is None else cost["total_cost"]
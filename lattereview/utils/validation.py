@@ -0,0 +1,156 @@
+"""Validation of structured responses with cached compiled validators, and local repair of slightly malformed JSON."""
+
+import functools
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from pydantic import TypeAdapter, ValidationError, create_model
+
+CODE_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+class ResponseValidationError(ValueError):
+    """Raised when a response is not valid for its format, even after repair."""
+
+    pass
+
+
+_response_format_models: Dict[Any, Any] = {}
+
+
+def response_format_model(response_format: Dict[str, Any]) -> Any:
+    """Return the pydantic model of a `{key: type}` response format, built once per distinct format."""
+    try:
+        key = tuple(response_format.items())
+        hash(key)
+    except TypeError:
+        key = None
+    if key is None or key not in _response_format_models:
+        fields = {name: (field_type, ...) for name, field_type in response_format.items()}
+        model = create_model("ResponseFormat", **fields)
+        if key is None:
+            return model
+        _response_format_models[key] = model
+    return _response_format_models[key]
+
+
+@functools.lru_cache(maxsize=None)
+def response_validator(response_format_class: Any) -> TypeAdapter:
+    """Return the compiled validator of a response format class, built once per class."""
+    return TypeAdapter(response_format_class)
+
+
+def _json_span(text: str) -> str:
+    """Return the text from the first '{' to its matching '}' (or to the end), skipping prose around the object."""
+    start = text.find("{")
+    if start < 0:
+        return text
+    depth, quote, escaped = 0, None, False
+    for position in range(start, len(text)):
+        char = text[position]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start : position + 1]
+    return text[start:]
+
+
+def _normalize_tokens(text: str) -> str:
+    """Rewrite single-quoted strings, Python literals and trailing commas as JSON."""
+    out: List[str] = []
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char in "\"'":
+            # Copy a string, re-quoting single-quoted ones with double quotes
+            chars, position = [], position + 1
+            while position < len(text) and text[position] != char:
+                if text[position] == "\\" and position + 1 < len(text):
+                    escaped = text[position + 1]
+                    chars.append(escaped if escaped == "'" else "\\" + escaped)
+                    position += 2
+                    continue
+                chars.append('\\"' if text[position] == '"' else text[position])
+                position += 1
+            out.append('"' + "".join(chars) + '"')
+            position += 1
+        elif char == ",":
+            following = text[position + 1 :].lstrip()
+            if not following.startswith(("}", "]")):
+                out.append(char)
+            position += 1
+        elif char.isalpha():
+            end = position
+            while end < len(text) and text[end].isalnum():
+                end += 1
+            word = text[position:end]
+            out.append(PYTHON_LITERALS.get(word, word))
+            position = end
+        else:
+            out.append(char)
+            position += 1
+    return "".join(out)
+
+
+def repair_json(text: str) -> str:
+    """Repair common defects of model-written JSON: code fences, text around the object, single quotes, Python
+    literals (True/False/None) and trailing commas. The result may still be invalid."""
+    fenced = CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    return _normalize_tokens(_json_span(text.strip()))
+
+
+def load_json(text: Any) -> Any:
+    """Parse JSON text, repairing it locally if it does not parse as is; dictionaries are returned unchanged."""
+    if not isinstance(text, (str, bytes)):
+        return text
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return json.loads(repair_json(text if isinstance(text, str) else text.decode("utf-8")))
+    except ValueError as e:
+        raise ResponseValidationError(f"Response is not valid JSON and could not be repaired: {e}") from e
+
+
+def validate_response(response: Any, response_format_class: Any, repair: bool = True) -> Dict[str, Any]:
+    """Validate a response (JSON text or a dictionary) against a format, coercing values such as "4" to 4.
+
+    Text is validated in one pass by the compiled validator; only when that fails is it repaired and validated again.
+    Returns the response's fields as a dictionary.
+    """
+    validator = response_validator(response_format_class)
+    try:
+        if isinstance(response, (str, bytes)):
+            return validator.validate_json(response).model_dump()
+        return validator.validate_python(response).model_dump()
+    except ValidationError as e:
+        if not repair or not isinstance(response, (str, bytes)):
+            raise ResponseValidationError(f"Invalid response: {_describe(e)}") from e
+    try:
+        return validator.validate_python(load_json(response)).model_dump()
+    except ValidationError as e:
+        raise ResponseValidationError(f"Invalid response: {_describe(e)}") from e
+
+
+def _describe(error: ValidationError) -> str:
+    first: Optional[Dict[str, Any]] = error.errors()[0] if error.errors() else None
+    if first is None:
+        return str(error)
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
@@ -1 +1 @@
-from .review_workflow import ReviewWorkflow
+from .review_workflow import ReviewWorkflow, agreement_rule
@@ -1,11 +1,40 @@
-import json
+import asyncio
 import os
+import time
 import pandas as pd
 import pydantic
-from typing import List, Dict, Any, Union
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple, Union
+from tqdm.asyncio import tqdm
 
+from ..agents.cascade_reviewer import CascadeReviewer
 from ..agents.scoring_reviewer import ScoringReviewer
-from ..utils.data_handler import ris_to_dataframe
+from ..utils.budget import BUDGET_EXHAUSTED, SpendingBudget
+from ..utils.data_handler import find_duplicates, ris_to_dataframe
+from ..utils.journal import ReviewJournal, input_hash
+from ..utils.tokens import count_tokens, token_cost
+from ..utils.validation import load_json
+
+EXECUTION_MODES = ("sequential", "concurrent", "pipelined", "batch")
+DEFAULT_OUTPUT_TOKENS = 150  # expected completion length per call when no pilot measured it
+DEFAULT_SECONDS_PER_CALL = 5.0  # expected latency per call when no pilot measured it
+
+
+def agreement_rule(
+    keyword: str = "evaluation", values: Optional[Tuple[Any, ...]] = (1, 5), min_reviewers: int = 2
+) -> Callable[[List[Dict[str, Any]]], bool]:
+    """Build a consensus rule met once `min_reviewers` reviewers gave the same `keyword` value, one of `values`.
+
+    With the defaults, an item stops being sent to further reviewers once two reviewers both evaluated it 1 or
+    both evaluated it 5. Pass `values=None` to accept agreement on any value.
+    """
+
+    def rule(answers: List[Dict[str, Any]]) -> bool:
+        given = [answer.get(keyword) for answer in answers]
+        if len(given) < min_reviewers or given[0] is None or any(value != given[0] for value in given):
+            return False
+        return values is None or given[0] in values
+
+    return rule
 
 
 class ReviewWorkflowError(Exception):
@@ -14,12 +43,39 @@ class ReviewWorkflowError(Exception):
     pass
 
 
+class WorkflowPlan(pydantic.BaseModel):
+    """Estimated calls, tokens, cost and duration of a workflow run, as returned by `ReviewWorkflow.plan`."""
+
+    reviewers: List[Dict[str, Any]] = list()  # one entry per round and reviewer
+    records: int = 0
+    pilot_size: int = 0
+    total_calls: int = 0
+    total_input_tokens: int = 0
+    total_output_tokens: int = 0
+    total_cost: Optional[float] = None  # None if a reviewer's model has no known price
+    eta_seconds: float = 0.0
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the per-reviewer estimates as a DataFrame."""
+        return pd.DataFrame(self.reviewers)
+
+
 class ReviewWorkflow(pydantic.BaseModel):
     workflow_schema: List[Dict[str, Any]]
     memory: List[Dict] = list()
     reviewer_costs: Dict = dict()
     total_cost: float = 0.0
     verbose: bool = True
+    execution_mode: str = "sequential"  # "sequential", "concurrent", "pipelined" or "batch" (see docs/api/workflows.md)
+    shared_concurrent_requests: Optional[int] = None  # optional limit shared by the reviewers of a concurrent round
+    journal_path: Optional[str] = None  # append-only JSONL record of completed results, see resume()
+    consensus_calls_saved: Dict[str, int] = dict()  # reviewer calls skipped by each round's consensus_rule
+    deduplicate: Union[bool, Dict[str, Any]] = False  # review one record per duplicate group; a dict sets options
+    spending_budget: Optional[SpendingBudget] = None  # caps the dollars and tokens of the whole run
+    warm_up: bool = True  # let each provider load its model before the first request of a run
+
+    class Config:
+        arbitrary_types_allowed = True
 
     def __post_init__(self, __context):
         """Initialize after Pydantic model initialization."""
@@ -61,49 +117,353 @@ class ReviewWorkflow(pydantic.BaseModel):
         except Exception as e:
             raise ReviewWorkflowError(f"Error initializing Review Workflow: {e}")
 
-    async def __call__(self, data: Union[pd.DataFrame, Dict[str, Any], str]) -> pd.DataFrame:
+    async def __call__(self, data: Union[pd.DataFrame, Dict[str, Any], str], resume: bool = False) -> pd.DataFrame:
         """Run the workflow.
         
         Parameters:
             data: Can be a pandas DataFrame, a dictionary, or a path to a RIS file
+            resume: If True, reuse the results already recorded in the journal (see `resume`)
         
         Returns:
             A pandas DataFrame with review results
         """
         try:
-            if isinstance(data, pd.DataFrame):
-                return await self.run(data)
-            elif isinstance(data, dict):
-                return await self.run(pd.DataFrame(data))
-            elif isinstance(data, str):
-                if data.lower().endswith('.ris'):
-                    # Handle RIS file input
-                    self._log(f"Converting RIS file: {data}")
-                    df = await ris_to_dataframe(data)
-                    if df.empty:
-                        raise ReviewWorkflowError(f"No data found in RIS file: {data}")
-                    return await self.run(df)
-                elif data.lower().endswith('.csv'):
-                    # Handle CSV file input
-                    self._log(f"Loading CSV file: {data}")
-                    df = pd.read_csv(data)
-                    if df.empty:
-                        raise ReviewWorkflowError(f"No data found in CSV file: {data}")
-                    return await self.run(df)
-                elif data.lower().endswith(('.xlsx', '.xls')):
-                    # Handle Excel file input, loading first tab by default
-                    self._log(f"Loading Excel file: {data}")
-                    df = pd.read_excel(data)
-                    if df.empty:
-                        raise ReviewWorkflowError(f"No data found in Excel file: {data}")
-                    return await self.run(df)
-                else:
-                    raise ReviewWorkflowError(f"Unsupported file format: {data}. Supported formats are .ris, .csv, .xlsx, and .xls.")
-            else:
-                raise ReviewWorkflowError(f"Invalid data type: {type(data)}. Must be DataFrame, dict, or file path.")
+            return await self._run_deduplicated(await self._load_data(data), resume)
         except Exception as e:
             raise ReviewWorkflowError(f"Error running workflow: {e}")
 
+    async def _load_data(self, data: Union[pd.DataFrame, Dict[str, Any], str]) -> pd.DataFrame:
+        """Turn a DataFrame, a dictionary or a .ris/.csv/.xlsx/.xls file path into a DataFrame."""
+        if isinstance(data, pd.DataFrame):
+            return data
+        elif isinstance(data, dict):
+            return pd.DataFrame(data)
+        elif isinstance(data, str):
+            if data.lower().endswith('.ris'):
+                # Handle RIS file input
+                self._log(f"Converting RIS file: {data}")
+                df = await ris_to_dataframe(data)
+                if df.empty:
+                    raise ReviewWorkflowError(f"No data found in RIS file: {data}")
+                return df
+            elif data.lower().endswith('.csv'):
+                # Handle CSV file input
+                self._log(f"Loading CSV file: {data}")
+                df = pd.read_csv(data)
+                if df.empty:
+                    raise ReviewWorkflowError(f"No data found in CSV file: {data}")
+                return df
+            elif data.lower().endswith(('.xlsx', '.xls')):
+                # Handle Excel file input, loading first tab by default
+                self._log(f"Loading Excel file: {data}")
+                df = pd.read_excel(data)
+                if df.empty:
+                    raise ReviewWorkflowError(f"No data found in Excel file: {data}")
+                return df
+            else:
+                raise ReviewWorkflowError(f"Unsupported file format: {data}. Supported formats are .ris, .csv, .xlsx, and .xls.")
+        else:
+            raise ReviewWorkflowError(f"Invalid data type: {type(data)}. Must be DataFrame, dict, or file path.")
+
+    async def _run_deduplicated(self, data: pd.DataFrame, resume: bool = False) -> pd.DataFrame:
+        """Run the workflow, reviewing only one representative of each group of duplicate records if enabled.
+
+        The representatives' results are copied to the other members of their group, whose `duplicate_of` column
+        holds the index of their representative.
+        """
+        if not self.deduplicate:
+            return await self.run(data, resume=resume)
+        representatives, is_representative = self._find_duplicates(data)
+        self._log(
+            f"Deduplication: reviewing {int(is_representative.sum())} of {len(data)} records "
+            f"({int((~is_representative).sum())} duplicates)"
+        )
+        reviewed = await self.run(data[is_representative.values], resume=resume)
+        df = data.copy()
+        df["duplicate_of"] = representatives.where(~is_representative)
+        new_columns = [column for column in reviewed.columns if column not in df.columns]
+        for column in new_columns:
+            df[column] = reviewed[column].reindex(representatives.values).values
+        return df
+
+    def _find_duplicates(self, data: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """Return each record's representative and whether the record is one, using the `deduplicate` options."""
+        options = self.deduplicate if isinstance(self.deduplicate, dict) else {}
+        representatives = find_duplicates(data, **options)
+        return representatives, representatives == representatives.index.to_series()
+
+    async def plan(
+        self,
+        data: Union[pd.DataFrame, Dict[str, Any], str],
+        pilot_size: int = 0,
+        output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+        seconds_per_call: float = DEFAULT_SECONDS_PER_CALL,
+        seed: int = 0,
+    ) -> "WorkflowPlan":
+        """Estimate the calls, tokens, cost and wall-clock time of running the workflow on `data`.
+
+        The first round's prompts are rendered and their tokens counted. Later rounds depend on earlier outputs, so
+        their pass rates, prompts, output lengths and latency are measured on a pilot run of the workflow over
+        `pilot_size` sampled records. The pilot sends real (billed) requests; without it every record is assumed to
+        reach every reviewer, and `output_tokens` and `seconds_per_call` are used instead of measurements.
+        """
+        try:
+            df = await self._load_data(data)
+            if self.deduplicate:
+                _, is_representative = self._find_duplicates(df)
+                df = df[is_representative.values]
+            pilot = await self._run_pilot(df, pilot_size, seed) if pilot_size else None
+
+            entries = []
+            eta_seconds = 0.0
+            for review_round, review_task in enumerate(self.workflow_schema):
+                round_id = review_task["round"]
+                reviewers = (
+                    review_task["reviewers"]
+                    if isinstance(review_task["reviewers"], list)
+                    else [review_task["reviewers"]]
+                )
+                text_inputs = (
+                    review_task["text_inputs"]
+                    if isinstance(review_task["text_inputs"], list)
+                    else [review_task["text_inputs"]]
+                )
+                image_inputs = review_task.get("image_inputs", [])
+                image_inputs = image_inputs if isinstance(image_inputs, list) else [image_inputs]
+
+                # Records reaching the round, and the rows whose prompts stand for theirs
+                pilot_rows = None
+                if pilot is not None:
+                    results = pilot["results"]
+                    reached = pd.concat(
+                        [results[f"round-{round_id}_{reviewer.name}_output"].notna() for reviewer in reviewers], axis=1
+                    ).any(axis=1)
+                    pilot_rows = results[reached]
+                if review_round == 0:
+                    rows = df[df.apply(review_task.get("filter", lambda x: True), axis=1)]
+                    round_records = len(rows)
+                elif pilot_rows is not None:
+                    rows = pilot_rows
+                    round_records = round(len(df) * len(rows) / len(results))
+                else:
+                    rows = df
+                    round_records = len(df)
+                missing_columns = [column for column in text_inputs if column not in rows.columns]
+                rows = rows.assign(**{column: "" for column in missing_columns})
+                text_input_strings = [
+                    self._build_item_input(row, idx, round_id, text_inputs, image_inputs)[0]
+                    for idx, row in rows.iterrows()
+                ]
+
+                round_entries = []
+                for reviewer in reviewers:
+                    share = 1.0  # e.g. below 1 for reviewers skipped by a consensus rule
+                    if pilot_rows is not None and len(pilot_rows):
+                        share = pilot_rows[f"round-{round_id}_{reviewer.name}_output"].notna().mean()
+                    for unit, unit_share in self._plan_units(reviewer, round_id, pilot_rows):
+                        calls = round(round_records * share * unit_share)
+                        prompt_tokens = [
+                            count_tokens(f"{unit.system_prompt or ''} {unit._render_prompt(text)}", unit.provider.model)
+                            for text in text_input_strings
+                        ]
+                        tokens_per_call = sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else 0
+                        # Columns missing without a pilot are outputs of earlier rounds (e.g. a reviewer's
+                        # reasoning), rendered empty above; each is assumed to be as long as a response
+                        tokens_per_call += output_tokens * len(missing_columns)
+                        unit_output_tokens = (pilot or {}).get("output_tokens", {}).get(id(unit)) or output_tokens
+                        unit_seconds = (pilot or {}).get("seconds_per_call", {}).get(id(unit)) or seconds_per_call
+                        entry = {
+                            "round": round_id,
+                            "reviewer": reviewer.name if unit is reviewer else f"{reviewer.name}/{unit.name}",
+                            "model": unit.provider.model,
+                            "calls": calls,
+                            "input_tokens": round(calls * tokens_per_call),
+                            "output_tokens": round(calls * unit_output_tokens),
+                        }
+                        cost = token_cost(unit.provider.model, entry["input_tokens"], entry["output_tokens"])
+                        if cost is not None and self.execution_mode == "batch":
+                            cost *= unit.provider.batch_discount
+                        concurrency = min(
+                            unit.max_concurrent_requests, unit.provider.max_concurrent_requests or float("inf")
+                        )
+                        entry["cost"] = cost
+                        entry["seconds"] = calls * unit_seconds / concurrency
+                        round_entries.append((entry, unit.provider))
+
+                eta_seconds += self._plan_round_seconds(review_task, round_entries)
+                entries.extend(entry for entry, _ in round_entries)
+
+            costs = [entry["cost"] for entry in entries]
+            plan = WorkflowPlan(
+                reviewers=entries,
+                records=len(df),
+                pilot_size=len(pilot["results"]) if pilot else 0,
+                total_calls=sum(entry["calls"] for entry in entries),
+                total_input_tokens=sum(entry["input_tokens"] for entry in entries),
+                total_output_tokens=sum(entry["output_tokens"] for entry in entries),
+                total_cost=None if None in costs else sum(costs),
+                eta_seconds=eta_seconds,
+            )
+            self._log(
+                f"Plan: {plan.total_calls} calls, {plan.total_input_tokens} input and {plan.total_output_tokens} "
+                f"output tokens, cost {plan.total_cost if plan.total_cost is not None else 'unknown'}, "
+                f"about {plan.eta_seconds / 60:.1f} minutes"
+            )
+            return plan
+        except Exception as e:
+            raise ReviewWorkflowError(f"Error planning workflow: {e}")
+
+    def _plan_units(self, reviewer: Any, round_id: str, pilot_rows: Optional[pd.DataFrame]) -> List[Tuple[Any, float]]:
+        """Return the reviewers that send requests for `reviewer` and the share of its items each one receives."""
+        if isinstance(reviewer, CascadeReviewer):
+            escalated_share = 1.0  # upper bound without a pilot
+            if pilot_rows is not None:
+                escalated = pilot_rows[f"round-{round_id}_{reviewer.name}_escalated"].dropna()
+                escalated_share = escalated.astype(bool).mean() if len(escalated) else 0.0
+            return [(reviewer.first_reviewer, 1.0), (reviewer.second_reviewer, escalated_share)]
+        return [(reviewer, 1.0)]
+
+    def _plan_round_seconds(
+        self, review_task: Dict[str, Any], round_entries: List[Tuple[Dict[str, Any], Any]]
+    ) -> float:
+        """Estimate a round's duration from its reviewers' durations and their endpoints' rate limits."""
+        seconds = [entry["seconds"] for entry, _ in round_entries]
+        parallel = self.execution_mode != "sequential" and review_task.get("consensus_rule") is None
+        round_seconds = max(seconds, default=0.0) if parallel else sum(seconds)
+        endpoints = {}
+        for entry, provider in round_entries:
+            calls, tokens, _ = endpoints.get(provider.endpoint_key(), (0, 0, provider))
+            endpoints[provider.endpoint_key()] = (
+                calls + entry["calls"],
+                tokens + entry["input_tokens"] + entry["output_tokens"],
+                provider,
+            )
+        for calls, tokens, provider in endpoints.values():
+            if provider.requests_per_minute:
+                round_seconds = max(round_seconds, 60.0 * calls / provider.requests_per_minute)
+            if provider.tokens_per_minute:
+                round_seconds = max(round_seconds, 60.0 * tokens / provider.tokens_per_minute)
+        return round_seconds
+
+    async def _warm_up_providers(self) -> None:
+        """Call `warm_up()` once on every provider of the workflow, concurrently."""
+        providers = {}
+        for review_task in self.workflow_schema:
+            reviewers = (
+                review_task["reviewers"] if isinstance(review_task["reviewers"], list) else [review_task["reviewers"]]
+            )
+            for reviewer in reviewers:
+                for unit, _ in self._plan_units(reviewer, review_task["round"], None):
+                    if getattr(unit, "provider", None) is not None:
+                        providers[id(unit.provider)] = unit.provider
+        results = await asyncio.gather(*(provider.warm_up() for provider in providers.values()))
+        for provider, hosts in zip(providers.values(), results):
+            failed = [host for host, loaded in hosts.items() if not loaded]
+            if failed:
+                self._log(f"Warning: {provider.model} could not be loaded on {', '.join(failed)}")
+
+    def _warn_ignored_packing(self) -> None:
+        """Warn about reviewers set up to pack items in an execution mode that reviews items one request each."""
+        if self.execution_mode not in ("pipelined", "batch"):
+            return
+        for review_task in self.workflow_schema:
+            reviewers = (
+                review_task["reviewers"] if isinstance(review_task["reviewers"], list) else [review_task["reviewers"]]
+            )
+            for reviewer in reviewers:
+                packing_enabled = getattr(reviewer, "_packing_enabled", None)
+                if packing_enabled is not None and packing_enabled():
+                    self._log(
+                        f"Warning: packing is ignored in {self.execution_mode} mode; "
+                        f"{reviewer.name} in round {review_task['round']} sends one item per request"
+                    )
+
+    async def _run_pilot(self, df: pd.DataFrame, pilot_size: int, seed: int) -> Dict[str, Any]:
+        """Run the workflow on a sample of records, measuring output lengths and the latency of each request."""
+        sample = df.sample(n=min(pilot_size, len(df)), random_state=seed)
+        units = {}
+        for review_task in self.workflow_schema:
+            reviewers = (
+                review_task["reviewers"] if isinstance(review_task["reviewers"], list) else [review_task["reviewers"]]
+            )
+            for reviewer in reviewers:
+                for unit, _ in self._plan_units(reviewer, review_task["round"], None):
+                    units[id(unit)] = unit
+        before = {
+            key: (
+                len(unit.memory),
+                unit.token_usage.get("output_tokens", 0),
+                unit.request_timing.get("requests", 0),
+                unit.request_timing.get("seconds", 0.0),
+            )
+            for key, unit in units.items()
+        }
+
+        pilot_workflow = self.model_copy(
+            update={
+                "memory": [],
+                "reviewer_costs": {},
+                "consensus_calls_saved": {},
+                "journal_path": None,
+                "deduplicate": False,
+                "verbose": False,
+            }
+        )
+        self._log(f"Running a pilot on {len(sample)} records")
+        results = await pilot_workflow.run(sample)
+
+        output_tokens = {}
+        seconds_per_call = {}
+        for key, unit in units.items():
+            calls = len(unit.memory) - before[key][0]
+            tokens = unit.token_usage.get("output_tokens", 0) - before[key][1]
+            if calls and tokens:
+                output_tokens[key] = tokens / calls
+            # Each request is timed on its own, so the latency does not depend on how many ran side by side
+            requests = unit.request_timing.get("requests", 0) - before[key][2]
+            if requests:
+                seconds_per_call[key] = (unit.request_timing.get("seconds", 0.0) - before[key][3]) / requests
+        return {"results": results, "output_tokens": output_tokens, "seconds_per_call": seconds_per_call}
+
+    async def resume(
+        self, data: Union[pd.DataFrame, Dict[str, Any], str], journal_path: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Resume an interrupted run from its journal, sending only the calls that have no recorded result.
+
+        `data` must be the same input the interrupted run was given. Items whose input changed are reviewed again.
+        """
+        if journal_path is not None:
+            self.journal_path = journal_path
+        if not self.journal_path:
+            raise ReviewWorkflowError("A journal_path is required to resume a workflow")
+        return await self(data, resume=True)
+
+    def _open_journal(self, resume: bool) -> Optional[ReviewJournal]:
+        """Open the run's journal, loading the recorded results when resuming."""
+        if not self.journal_path:
+            return None
+        journal = ReviewJournal(self.journal_path)
+        if resume:
+            self._log(f"Loaded {journal.load()} journaled results from {self.journal_path}")
+        elif journal.exists():
+            raise ReviewWorkflowError(
+                f"Journal {self.journal_path} already contains results. "
+                "Call resume() to continue that run, or remove the file to start over."
+            )
+        return journal
+
+    def _build_item_input(
+        self, row: pd.Series, idx: Any, round_id: str, text_inputs: List[str], image_inputs: List[str]
+    ) -> Tuple[str, List[str]]:
+        """Build the text input and image paths a reviewer receives for one row in one round."""
+        # text_input_string is a single string that is made by combining all text_input columns
+        text_input_string = self._format_text_input(row, text_inputs)
+        text_input_string = f"Review Task ID: {round_id}-{idx}\n" f"{text_input_string}"
+
+        # image_path_list is a list of valid paths to the images provided in the row item
+        image_path_list = self._format_image_input(row, image_inputs)
+        return text_input_string, image_path_list
+
     def _format_text_input(self, row: pd.Series, text_inputs: List[str]) -> tuple:
         """Format input text with content tracking."""
         parts = []
@@ -131,10 +491,20 @@ class ReviewWorkflow(pydantic.BaseModel):
                     self._log(f"Warning: Invalid image format: {row[image_input]}")
         return image_path_list
 
-    async def run(self, data: pd.DataFrame) -> pd.DataFrame:
+    async def run(self, data: pd.DataFrame, resume: bool = False) -> pd.DataFrame:
         """Run the review process with content validation."""
         try:
+            if self.execution_mode not in EXECUTION_MODES:
+                raise ReviewWorkflowError(
+                    f"Invalid execution_mode: {self.execution_mode}. Must be one of {', '.join(EXECUTION_MODES)}."
+                )
+            journal = self._open_journal(resume)
+            if self.warm_up:
+                await self._warm_up_providers()
+            self._warn_ignored_packing()
             df = data.copy()
+            if self.execution_mode == "pipelined":
+                return await self._run_pipelined(df, journal)
             total_rounds = len(self.workflow_schema)
 
             for review_round, review_task in enumerate(self.workflow_schema):
@@ -169,95 +539,420 @@ class ReviewWorkflow(pydantic.BaseModel):
                 eligible_indices = []
 
                 for idx in df[mask].index:
-                    row = df.loc[idx]
-
-                    # text_input_string is a single string that is made by combining all text_input columns
-                    text_input_string = self._format_text_input(row, text_inputs)
-                    text_input_string = f"Review Task ID: {round_id}-{idx}\n" f"{text_input_string}"
+                    text_input_string, image_path_list = self._build_item_input(
+                        df.loc[idx], idx, round_id, text_inputs, image_inputs
+                    )
                     text_input_strings.append(text_input_string)
-
-                    # image_path_list is a list of valid paths to the images provided in the row item
-                    image_path_list = self._format_image_input(row, image_inputs)
                     image_path_lists.append(image_path_list)
-
                     eligible_indices.append(idx)
 
                 # Process each reviewer
-                for reviewer in reviewers:
-                    response_keywords = reviewer.response_format.keys()
-                    response_cols = [f"round-{round_id}_{reviewer.name}_{keyword}" for keyword in response_keywords]
-                    output_col = f"round-{round_id}_{reviewer.name}_output"
-
-                    # Initialize the output column and all expected response columns if they don't exist
-                    # The output column is the entire output from the reviewer, while the response columns are specific
-
-                    if output_col not in df.columns:
-                        df[output_col] = None
-
-                    for response_col in response_cols:
-                        if response_col not in df.columns:
-                            df[response_col] = None
-
-                    # Get reviewer outputs with metadata
-                    outputs, review_cost = await reviewer.review_items(
+                spending_budgets = self._spending_budgets(review_task)
+                consensus_rule = review_task.get("consensus_rule")
+                if consensus_rule is not None:
+                    reviewer_results = await self._review_with_consensus(
+                        reviewers,
+                        round_id,
+                        eligible_indices,
                         text_input_strings,
                         image_path_lists,
-                        {
-                            "round": round_id,
-                            "reviewer_name": reviewer.name,
-                        },
+                        consensus_rule,
+                        journal=journal,
+                        spending_budgets=spending_budgets,
                     )
-                    self.reviewer_costs[(round_id, reviewer.name)] = review_cost
-
-                    # Verify output count
-                    if len(outputs) != len(eligible_indices):
-                        raise ReviewWorkflowError(
-                            f"Reviewer {reviewer.name} returned {len(outputs)} outputs "
-                            f"for {len(eligible_indices)} inputs"
-                        )
-
-                    # Process outputs with content validation
-                    processed_outputs = []
-
-                    for output in outputs:
-                        try:
-                            if isinstance(output, dict):
-                                processed_output = output
-                            else:
-                                processed_output = json.loads(output)
-                            processed_outputs.append(processed_output)
-
-                        except Exception as e:
-                            self._log(f"Warning: Error processing output: {e}")
-                            processed_outputs.append({"reasoning": None, "score": None})
-
-                    # Update dataframe with validated outputs
-                    output_dict = dict(zip(eligible_indices, processed_outputs))
-                    df.loc[eligible_indices, output_col] = pd.Series(output_dict)
-
-                    for response_keyword in response_keywords:
-                        response_col = f"round-{round_id}_{reviewer.name}_{response_keyword}"
-                        response_dict = dict(
-                            zip(
+                elif self.execution_mode in ("concurrent", "batch") and len(reviewers) > 1:
+                    # In batch mode the reviewers' batches are submitted and polled together
+                    shared_limit = review_task.get("shared_concurrent_requests", self.shared_concurrent_requests)
+                    concurrency_limiter = (
+                        asyncio.Semaphore(shared_limit) if shared_limit and self.execution_mode == "concurrent" else None
+                    )
+                    reviewer_outputs = await asyncio.gather(
+                        *[
+                            self._review_with_reviewer(
+                                reviewer,
+                                round_id,
                                 eligible_indices,
-                                [processed_output[response_keyword] for processed_output in processed_outputs],
+                                text_input_strings,
+                                image_path_lists,
+                                concurrency_limiter,
+                                journal,
+                                spending_budgets,
                             )
+                            for reviewer in reviewers
+                        ]
+                    )
+                    reviewer_results = [(eligible_indices, outputs, failures) for outputs, failures in reviewer_outputs]
+                else:
+                    reviewer_results = []
+                    for reviewer in reviewers:
+                        outputs, failures = await self._review_with_reviewer(
+                            reviewer,
+                            round_id,
+                            eligible_indices,
+                            text_input_strings,
+                            image_path_lists,
+                            journal=journal,
+                            spending_budgets=spending_budgets,
                         )
-                        df.loc[eligible_indices, response_col] = pd.Series(response_dict)
+                        reviewer_results.append((eligible_indices, outputs, failures))
 
-                    self._log(
-                        f"The following columns are present in the dataframe at the end of {reviewer.name}'s reivew in round {round_id}: {df.columns.tolist()}"
-                    )
+                # Outputs are written in schema order, whatever order the reviewers finished in
+                for reviewer, (reviewed_indices, outputs, failures) in zip(reviewers, reviewer_results):
+                    self._write_reviewer_outputs(df, round_id, reviewer, reviewed_indices, outputs, failures)
+                    stopped = sum(failure["error_type"] == BUDGET_EXHAUSTED for failure in failures)
+                    self._log_budget_stop(round_id, reviewer.name, stopped)
             return df
 
         except Exception as e:
             raise ReviewWorkflowError(f"Error running workflow: {e}")
 
+    async def _review_with_consensus(
+        self,
+        reviewers: List[Any],
+        round_id: str,
+        eligible_indices: List[Any],
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]],
+        consensus_rule: Callable[[List[Dict[str, Any]]], bool],
+        journal: Optional[ReviewJournal] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> List[Tuple[List[Any], List[Any], List[Dict[str, Any]]]]:
+        """Query the reviewers in order, skipping the remaining reviewers of an item once its consensus rule is met.
+
+        Returns, per reviewer, the indices it reviewed with its outputs and failures.
+        """
+        answers = [[] for _ in eligible_indices]
+        reviewer_results = []
+        calls_saved = 0
+        for position_in_round, reviewer in enumerate(reviewers):
+            positions = [
+                position
+                for position, item_answers in enumerate(answers)
+                if position_in_round == 0 or not consensus_rule(item_answers)
+            ]
+            calls_saved += len(eligible_indices) - len(positions)
+            reviewed_indices = [eligible_indices[position] for position in positions]
+            outputs, failures = await self._review_with_reviewer(
+                reviewer,
+                round_id,
+                reviewed_indices,
+                [text_input_strings[position] for position in positions],
+                [image_path_lists[position] for position in positions],
+                journal=journal,
+                spending_budgets=spending_budgets,
+            )
+            response_keywords = reviewer.response_format.keys()
+            for position, output in zip(positions, outputs):
+                answers[position].append(self._process_output(output, response_keywords))
+            reviewer_results.append((reviewed_indices, outputs, failures))
+
+        self.consensus_calls_saved[round_id] = calls_saved
+        total_calls = len(eligible_indices) * len(reviewers)
+        self._log(f"Consensus in round {round_id} saved {calls_saved} of {total_calls} reviewer calls")
+        return reviewer_results
+
+    async def _review_with_reviewer(
+        self,
+        reviewer: Any,
+        round_id: str,
+        eligible_indices: List[Any],
+        text_input_strings: List[str],
+        image_path_lists: List[List[str]],
+        concurrency_limiter: Optional[Any] = None,
+        journal: Optional[ReviewJournal] = None,
+        spending_budgets: Iterable[SpendingBudget] = (),
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Run one reviewer over the eligible items of a round and return its outputs and failures.
+
+        Items with a result in the journal are not sent again; new results are journaled as they arrive.
+        """
+        outputs = [None] * len(text_input_strings)
+        item_hashes = [input_hash(text, images) for text, images in zip(text_input_strings, image_path_lists)]
+        journaled_cost = 0.0
+        pending = []
+        for position, idx in enumerate(eligible_indices):
+            record = journal.lookup(round_id, reviewer.name, idx, item_hashes[position]) if journal else None
+            if record is None:
+                pending.append(position)
+            else:
+                outputs[position] = record["response"]
+                journaled_cost += record["cost"]
+        if len(pending) < len(outputs):
+            self._log(f"{reviewer.name}: reusing {len(outputs) - len(pending)} journaled results in round {round_id}")
+
+        def on_result(i: int, response: Any, cost: Any, failure: Optional[Dict[str, Any]]) -> None:
+            if failure is None:
+                position = pending[i]
+                journal.append(
+                    round_id, reviewer.name, eligible_indices[position], item_hashes[position], response, cost
+                )
+
+        failures = []
+        review_cost = 0.0
+        if pending:
+            pending_texts = [text_input_strings[position] for position in pending]
+            pending_images = [image_path_lists[position] for position in pending]
+            review_kwargs = {"on_result": on_result} if journal else {}
+            if spending_budgets:
+                review_kwargs["spending_budgets"] = spending_budgets
+            if self.execution_mode == "batch":
+                new_outputs, review_cost = await reviewer.review_items_batch(
+                    pending_texts, pending_images, **review_kwargs
+                )
+            else:
+                if concurrency_limiter:
+                    review_kwargs["concurrency_limiter"] = concurrency_limiter
+                new_outputs, review_cost = await reviewer.review_items(
+                    pending_texts,
+                    pending_images,
+                    {
+                        "round": round_id,
+                        "reviewer_name": reviewer.name,
+                    },
+                    **review_kwargs,
+                )
+
+            # Verify output count
+            if len(new_outputs) != len(pending):
+                raise ReviewWorkflowError(
+                    f"Reviewer {reviewer.name} returned {len(new_outputs)} outputs for {len(pending)} inputs"
+                )
+            for position, output in zip(pending, new_outputs):
+                outputs[position] = output
+            # Failure records index the reviewed subset; map them back to the round's eligible items
+            failures = [
+                {**failure, "index": pending[failure["index"]]} for failure in getattr(reviewer, "failures", [])
+            ]
+        self.reviewer_costs[(round_id, reviewer.name)] = review_cost + journaled_cost
+        return outputs, failures
+
+    def _init_reviewer_columns(self, df: pd.DataFrame, round_id: str, reviewer: Any) -> None:
+        """Create the output column and all expected response columns of a reviewer if they don't exist."""
+        # The output column is the entire output from the reviewer, while the response columns are specific
+        output_col = f"round-{round_id}_{reviewer.name}_output"
+        if output_col not in df.columns:
+            df[output_col] = None
+
+        for keyword in reviewer.response_format.keys():
+            response_col = f"round-{round_id}_{reviewer.name}_{keyword}"
+            if response_col not in df.columns:
+                df[response_col] = None
+
+    def _process_output(self, output: Any, response_keywords: Any) -> Dict[str, Any]:
+        """Turn a raw reviewer output into a dictionary with a value, or None, for each response keyword."""
+        try:
+            if output is None:
+                # The reviewer gave up on this item; its failure is recorded in reviewer.failures
+                return {keyword: None for keyword in response_keywords}
+            output = load_json(output)
+            return {keyword: output.get(keyword) for keyword in response_keywords}
+        except Exception as e:
+            self._log(f"Warning: Error processing output: {e}")
+            return {keyword: None for keyword in response_keywords}
+
+    def _write_reviewer_outputs(
+        self,
+        df: pd.DataFrame,
+        round_id: str,
+        reviewer: Any,
+        eligible_indices: List[Any],
+        outputs: List[Any],
+        failures: List[Dict[str, Any]],
+    ) -> None:
+        """Write a reviewer's outputs into its round-{id}_{name}_* columns."""
+        response_keywords = reviewer.response_format.keys()
+        output_col = f"round-{round_id}_{reviewer.name}_output"
+        self._init_reviewer_columns(df, round_id, reviewer)
+        if not eligible_indices:
+            return
+
+        # Process outputs with content validation
+        processed_outputs = [self._process_output(output, response_keywords) for output in outputs]
+
+        # Update dataframe with validated outputs
+        output_dict = dict(zip(eligible_indices, processed_outputs))
+        df.loc[eligible_indices, output_col] = pd.Series(output_dict)
+
+        for response_keyword in response_keywords:
+            response_col = f"round-{round_id}_{reviewer.name}_{response_keyword}"
+            response_dict = dict(
+                zip(
+                    eligible_indices,
+                    [processed_output[response_keyword] for processed_output in processed_outputs],
+                )
+            )
+            df.loc[eligible_indices, response_col] = pd.Series(response_dict)
+
+        if failures:
+            error_col = f"round-{round_id}_{reviewer.name}_error"
+            if error_col not in df.columns:
+                df[error_col] = None
+            error_dict = {eligible_indices[failure["index"]]: failure["error"] for failure in failures}
+            df.loc[list(error_dict.keys()), error_col] = pd.Series(error_dict)
+
+        self._log(
+            f"The following columns are present in the dataframe at the end of {reviewer.name}'s reivew in round {round_id}: {df.columns.tolist()}"
+        )
+
+    def _write_item_output(
+        self,
+        df: pd.DataFrame,
+        idx: Any,
+        round_id: str,
+        reviewer: Any,
+        output: Any,
+        failure: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Write one reviewer output for a single row into its round-{id}_{name}_* columns."""
+        response_keywords = reviewer.response_format.keys()
+        processed_output = self._process_output(output, response_keywords)
+        df.at[idx, f"round-{round_id}_{reviewer.name}_output"] = processed_output
+        for response_keyword in response_keywords:
+            df.at[idx, f"round-{round_id}_{reviewer.name}_{response_keyword}"] = processed_output[response_keyword]
+        if failure:
+            error_col = f"round-{round_id}_{reviewer.name}_error"
+            if error_col not in df.columns:
+                df[error_col] = None
+            df.at[idx, error_col] = failure["error"]
+
+    async def _run_pipelined(self, df: pd.DataFrame, journal: Optional[ReviewJournal] = None) -> pd.DataFrame:
+        """Stream each row through all rounds on its own, without waiting for the other rows.
+
+        A row enters a round as soon as it has finished the previous rounds and passes the round's filter,
+        so filters must only depend on the row they are given.
+        """
+        rounds = []
+        for review_task in self.workflow_schema:
+            round_id = review_task["round"]
+            reviewers = (
+                review_task["reviewers"] if isinstance(review_task["reviewers"], list) else [review_task["reviewers"]]
+            )
+            text_inputs = (
+                review_task["text_inputs"]
+                if isinstance(review_task["text_inputs"], list)
+                else [review_task["text_inputs"]]
+            )
+            image_inputs = review_task.get("image_inputs", [])
+            image_inputs = image_inputs if isinstance(image_inputs, list) else [image_inputs]
+
+            reviewer_states = []
+            for reviewer in reviewers:
+                reviewer.setup()
+                reviewer.failures = []
+                self._init_reviewer_columns(df, round_id, reviewer)
+                self.reviewer_costs[(round_id, reviewer.name)] = 0.0
+                retry_budget = reviewer._get_retry_policy().new_budget()
+                reviewer_states.append((reviewer, reviewer._new_concurrency_limiter(), retry_budget))
+
+            rounds.append(
+                {
+                    "round_id": round_id,
+                    "reviewers": reviewer_states,
+                    "text_inputs": text_inputs,
+                    "image_inputs": image_inputs,
+                    "filter": review_task.get("filter", lambda x: True),
+                    "consensus_rule": review_task.get("consensus_rule"),
+                    "spending_budgets": self._spending_budgets(review_task),
+                }
+            )
+            if review_task.get("consensus_rule") is not None:
+                self.consensus_calls_saved[round_id] = 0
+
+        started = time.monotonic()
+        completion_times = []
+        budget_stops = {}  # (round, reviewer name) -> items not sent because a budget ran out
+
+        async def process_item(idx: Any) -> None:
+            for review_round in rounds:
+                round_id = review_round["round_id"]
+                if not review_round["filter"](df.loc[idx]):
+                    continue
+                text_input_string, image_path_list = self._build_item_input(
+                    df.loc[idx], idx, round_id, review_round["text_inputs"], review_round["image_inputs"]
+                )
+                item_hash = input_hash(text_input_string, image_path_list)
+
+                async def review(reviewer: Any, limiter: Any, retry_budget: Any) -> Tuple[Any, Any, Any]:
+                    record = journal.lookup(round_id, reviewer.name, idx, item_hash) if journal else None
+                    if record is not None:
+                        return record["response"], record["cost"], None
+                    _, response, input_prompt, cost, failure = await reviewer._review_indexed(
+                        idx, text_input_string, image_path_list, limiter, retry_budget, review_round["spending_budgets"]
+                    )
+                    cost = reviewer._record_review(input_prompt, response, cost)
+                    if journal and failure is None:
+                        journal.append(round_id, reviewer.name, idx, item_hash, response, cost)
+                    return response, cost, failure
+
+                consensus_rule = review_round["consensus_rule"]
+                if consensus_rule is None:
+                    results = await asyncio.gather(
+                        *[review(*reviewer_state) for reviewer_state in review_round["reviewers"]]
+                    )
+                else:
+                    # Reviewers are asked one after another until the item reaches consensus
+                    results, answers = [], []
+                    for reviewer_state in review_round["reviewers"]:
+                        if answers and consensus_rule(answers):
+                            break
+                        results.append(await review(*reviewer_state))
+                        answers.append(self._process_output(results[-1][0], reviewer_state[0].response_format.keys()))
+                    self.consensus_calls_saved[round_id] += len(review_round["reviewers"]) - len(results)
+                for (reviewer, _, _), (response, cost, failure) in zip(review_round["reviewers"], results):
+                    self.reviewer_costs[(round_id, reviewer.name)] += cost
+                    if failure:
+                        # In pipelined mode failure records carry the DataFrame index of the row
+                        reviewer.failures.append(failure)
+                        if failure["error_type"] == BUDGET_EXHAUSTED:
+                            key = (round_id, reviewer.name)
+                            budget_stops[key] = budget_stops.get(key, 0) + 1
+                    self._write_item_output(df, idx, round_id, reviewer, response, failure)
+            completion_times.append(time.monotonic() - started)
+
+        tasks = [process_item(idx) for idx in df.index]
+        async for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Pipelined review"):
+            await task
+
+        if completion_times:
+            self._log(
+                f"Pipelined review finished {len(completion_times)} rows in {completion_times[-1]:.1f}s "
+                f"(first row done after {completion_times[0]:.1f}s)"
+            )
+        for (round_id, reviewer_name), stopped in budget_stops.items():
+            self._log_budget_stop(round_id, reviewer_name, stopped)
+        return df
+
+    def _spending_budgets(self, review_task: Dict[str, Any]) -> List[SpendingBudget]:
+        """Return the round's and the run's spending budgets, which every request of the round is charged to."""
+        return [budget for budget in (review_task.get("spending_budget"), self.spending_budget) if budget is not None]
+
+    def _log_budget_stop(self, round_id: str, reviewer_name: str, stopped: int) -> None:
+        if stopped:
+            self._log(
+                f"Spending budget exhausted: {reviewer_name} left {stopped} items of round {round_id} unreviewed. "
+                f"They are marked in round-{round_id}_{reviewer_name}_error; resume() with a new budget reviews them."
+            )
+
     def _log(self, x):
         """Log message if verbose mode is enabled."""
         if self.verbose:
             print(x)
 
+    def get_token_usage(self) -> Dict[str, int]:
+        """Return the input, output and cached input tokens reported across all reviewers of the workflow."""
+        usage = {}
+        reviewers = {
+            id(reviewer): reviewer
+            for review_task in self.workflow_schema
+            for reviewer in (
+                review_task["reviewers"] if isinstance(review_task["reviewers"], list) else [review_task["reviewers"]]
+            )
+        }
+        for reviewer in reviewers.values():
+            for key, value in getattr(reviewer, "token_usage", {}).items():
+                usage[key] = usage.get(key, 0) + value
+        return usage
+
     def get_total_cost(self) -> float:
         """Return the total cost of the review process."""
         return sum(self.reviewer_costs.values())
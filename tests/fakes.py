@@ -0,0 +1,103 @@
+"""In-process stand-ins for LLM providers, reviewers and HTTP endpoints used across the test-suite."""
+
+import asyncio
+import contextlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from lattereview.agents import TitleAbstractReviewer
+from lattereview.providers.base_provider import BaseProvider
+
+
+class FakeProvider(BaseProvider):
+    """Provider that answers from a callable instead of a remote API."""
+
+    provider: str = "Fake"
+    model: str = "fake-model"
+    handler: Optional[Callable[[str], Any]] = None
+    delay: Any = 0.0  # seconds, or a callable mapping the prompt to seconds
+    calls: List[str] = []
+    system_messages: List[Optional[str]] = []
+
+    def set_response_format(self, response_format: Dict[str, Any]) -> None:
+        self.response_format = response_format
+
+    async def get_json_response(
+        self,
+        input_prompt: str,
+        image_path_list: List[str] = [],
+        system_message: Optional[str] = None,
+        response_format: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> Tuple[Any, Dict[str, float]]:
+        self.calls.append(input_prompt)
+        self.system_messages.append(system_message)
+        delay = self.delay(input_prompt) if callable(self.delay) else self.delay
+        if delay:
+            await asyncio.sleep(delay)
+        response_format = response_format or self.response_format
+        response = self.handler(input_prompt) if self.handler else {key: None for key in response_format}
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, dict):
+            response = json.dumps(response)
+        return response, {"input_cost": 0.001, "output_cost": 0.001, "total_cost": 0.002}
+
+
+class StatusError(Exception):
+    """Exception carrying an HTTP status code, like the SDK errors raised by real providers."""
+
+    def __init__(self, status_code: int, message: str = "", headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def fake_reviewer(
+    handler: Optional[Callable[[str], Any]] = None, delay: Any = 0.0, model: str = "fake-model", **kwargs: Any
+) -> TitleAbstractReviewer:
+    """Title/abstract reviewer answering from a FakeProvider; keyword arguments are passed to the reviewer."""
+    kwargs.setdefault("inclusion_criteria", "x")
+    kwargs.setdefault("verbose", False)
+    return TitleAbstractReviewer(provider=FakeProvider(handler=handler, delay=delay, model=model), **kwargs)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Base for stand-ins of HTTP APIs: keeps connections alive and does not log requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def read_json(self) -> Any:
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+    def send_json(self, payload: Any, status: int = 200, content_type: str = "application/json") -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def stub_server(handler_class: type, **attributes: Any) -> Iterator[ThreadingHTTPServer]:
+    """Serve `handler_class` on a free local port in a background thread; `attributes` are set on the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    for name, value in attributes.items():
+        setattr(server, name, value)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def stub_url(server: ThreadingHTTPServer, path: str = "") -> str:
+    """Base URL of a stub server, optionally followed by a path such as "/v1"."""
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.agents import TitleAbstractReviewer
+from lattereview.providers import OpenAIProvider
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import StubHandler, stub_server, stub_url
+
+
+class _BatchHandler(StubHandler):
+    """Stand-in for the OpenAI files and batches endpoints; each batch completes on its second status check."""
+
+    def _batch(self, batch_id):
+        state = self.server.batches[batch_id]
+        state["checks"] += 1
+        done = state["checks"] > 1
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+            "created_at": 0,
+            "input_file_id": state["input_file_id"],
+            "status": "completed" if done else "in_progress",
+            "output_file_id": state["output_file_id"] if done else None,
+        }
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/files":
+            lines = re.findall(rb'^\{"custom_id".*$', body, re.MULTILINE)
+            file_id = f"file-{len(self.server.files)}"
+            self.server.files[file_id] = [json.loads(line) for line in lines]
+            self.send_json({"id": file_id, "object": "file", "bytes": len(body), "created_at": 0,
+                        "filename": "batch.jsonl", "purpose": "batch", "status": "processed"})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            outputs = []
+            for line in self.server.files[request["input_file_id"]]:
+                self.server.requests.append(line)
+                prompt = line["body"]["messages"][-1]["content"]
+                if "unanswerable" in prompt:
+                    response = {"status_code": 500, "body": {"error": {"message": "server exploded"}}}
+                elif "no-choices" in prompt:
+                    response = {"status_code": 200, "body": {"object": "error"}}
+                elif "not-json" in prompt:
+                    message = {"role": "assistant", "content": "Sorry, I cannot review this."}
+                    response = {"status_code": 200, "body": {"choices": [{"index": 0, "message": message}]}}
+                else:
+                    content = json.dumps({"reasoning": "batch", "evaluation": 2 if "DROP-ME" in prompt else 5})
+                    response = {
+                        "status_code": 200,
+                        "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]},
+                    }
+                record = {"id": "r", "custom_id": line["custom_id"], "response": response, "error": None}
+                outputs.append(json.dumps(record))
+            batch_id = f"batch-{len(self.server.batches)}"
+            output_file_id = f"output-{batch_id}"
+            outputs.append("this line is not JSON")
+            self.server.files[output_file_id] = "\n".join(outputs)
+            self.server.batches[batch_id] = {
+                "checks": -1, "input_file_id": request["input_file_id"], "output_file_id": output_file_id
+            }
+            self.send_json(self._batch(batch_id))
+
+    def do_GET(self):
+        match = re.match(r"^/v1/batches/([^/]+)$", self.path)
+        if match:
+            return self.send_json(self._batch(match.group(1)))
+        match = re.match(r"^/v1/files/([^/]+)/content$", self.path)
+        if match:
+            return self.send_json(self.server.files[match.group(1)].encode("utf-8"), content_type="application/jsonl")
+        self.send_error(404)
+
+
+@pytest.fixture
+def batch_server():
+    with stub_server(_BatchHandler, files={}, batches={}, requests=[]) as server:
+        yield server
+
+
+def _reviewer(server, name="Screener"):
+    provider = OpenAIProvider(
+        model="gpt-4o-mini",
+        api_key="test-key",
+        base_url=stub_url(server, "/v1"),
+        batch_poll_interval=0.01,
+        calculate_cost=False,
+    )
+    return TitleAbstractReviewer(provider=provider, name=name, inclusion_criteria="x", verbose=False)
+
+
+def test_batch_request_lines(batch_server):
+    reviewer = _reviewer(batch_server)
+    outputs, cost = asyncio.run(reviewer.review_items_batch(["first item", "DROP-ME please"]))
+    assert [json.loads(output)["evaluation"] for output in outputs] == [5, 2]
+    line = batch_server.requests[0]
+    assert line["method"] == "POST" and line["url"] == "/v1/chat/completions"
+    assert line["body"]["model"] == "gpt-4o-mini"
+    assert line["body"]["response_format"]["json_schema"]["strict"] is True
+    assert set(line["body"]["response_format"]["json_schema"]["schema"]["required"]) == {"reasoning", "evaluation"}
+
+
+def test_batch_workflow_maps_results_by_custom_id(batch_server):
+    reviewers = [_reviewer(batch_server, "R1"), _reviewer(batch_server, "R2")]
+    schema = [{"round": "A", "reviewers": reviewers, "text_inputs": ["title"]}]
+    workflow = ReviewWorkflow(workflow_schema=schema, execution_mode="batch", verbose=False)
+    df = pd.DataFrame({"title": ["keep me", "DROP-ME please", "unanswerable", "keep me too"]})
+    result = asyncio.run(workflow(df))
+    assert len(batch_server.batches) == 2
+    assert result["round-A_R1_evaluation"].tolist()[:2] == [5, 2]
+    assert result["round-A_R2_evaluation"].tolist()[3] == 5
+    assert pd.isna(result["round-A_R1_evaluation"][2])
+    assert "server exploded" in result["round-A_R1_error"][2]
+
+
+def test_bad_result_lines_only_fail_their_own_items(batch_server):
+    reviewer = _reviewer(batch_server)
+    outputs, _ = asyncio.run(reviewer.review_items_batch(["first item", "no-choices", "not-json"]))
+    assert json.loads(outputs[0])["evaluation"] == 5
+    assert outputs[1:] == [None, None]
+    failures = {failure["index"]: failure for failure in reviewer.failures}
+    assert "Invalid batch result" in failures[1]["error"]
+    requests = [("0", "no-choices", []), ("1", "unanswerable", [])]
+    results = asyncio.run(
+        reviewer.provider.get_json_responses_batch(requests, response_format=reviewer.response_format)
+    )
+    assert [cost for _, cost, _ in results.values()] == [{"input_cost": 0.0, "output_cost": 0.0, "total_cost": 0.0}] * 2
+    assert failures[2]["error_type"] == "malformed_response"
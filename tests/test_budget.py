@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.budget import BUDGET_EXHAUSTED, SpendingBudget
+from lattereview.utils.cache import ResponseCache
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import fake_reviewer
+
+
+def _reviewer(name="R", **kwargs):
+    return fake_reviewer(
+        lambda prompt: {"reasoning": "r", "evaluation": 4}, name=name, max_concurrent_requests=1, **kwargs
+    )
+
+
+def _data(n=6):
+    return pd.DataFrame({"title": [f"title {i}" for i in range(n)]})
+
+
+def test_spending_budget_charges_cost_and_tokens():
+    budget = SpendingBudget(max_cost=1.0, max_tokens=100)
+    budget.charge({"total_cost": 0.5, "input_tokens": 40, "output_tokens": 10}, estimated_tokens=999)
+    assert (budget.spent_cost, budget.spent_tokens, budget.exhausted) == (0.5, 50, False)
+    budget.charge(0.1, estimated_tokens=50)
+    assert budget.exhausted and "100 tokens" in budget.describe()
+
+
+def test_reviewer_budget_stops_new_dispatches():
+    reviewer = _reviewer(spending_budget=SpendingBudget(max_cost=0.005))
+    results, cost = asyncio.run(reviewer.review_items([f"item {i}" for i in range(6)]))
+    # Each call costs 0.002, so the third one crosses the cap and nothing is sent after it
+    assert len(reviewer.provider.calls) == 3
+    assert results.count(None) == 3
+    assert [failure["error_type"] for failure in reviewer.failures] == [BUDGET_EXHAUSTED] * 3
+    assert abs(cost - 0.006) < 1e-9
+
+
+def test_token_budget_uses_estimates_without_reported_usage():
+    reviewer = _reviewer(spending_budget=SpendingBudget(max_tokens=1))
+    asyncio.run(reviewer.review_items(["a", "b"]))
+    assert len(reviewer.provider.calls) == 1
+
+
+def test_cache_hits_are_not_charged_tokens(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    items = [f"item {i}" for i in range(4)]
+    asyncio.run(_reviewer(response_cache=cache, model_args={"temperature": 0}).review_items(items))
+
+    budget = SpendingBudget(max_tokens=1)
+    rerun = _reviewer(response_cache=cache, model_args={"temperature": 0}, spending_budget=budget)
+    results, cost = asyncio.run(rerun.review_items(items))
+    assert rerun.provider.calls == [] and rerun.failures == []
+    assert None not in results and cost == 0
+    assert (budget.spent_tokens, budget.spent_cost) == (0, 0.0)
+
+
+def test_workflow_budget_returns_resumable_partial_result(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    reviewer = _reviewer()
+    schema = [{"round": "A", "reviewers": [reviewer], "text_inputs": ["title"]}]
+    workflow = ReviewWorkflow(
+        workflow_schema=schema, journal_path=journal_path, spending_budget=SpendingBudget(max_cost=0.003), verbose=False
+    )
+    partial = asyncio.run(workflow(_data()))
+    assert partial["round-A_R_evaluation"].notna().sum() == 2
+    assert partial["round-A_R_error"].str.startswith("Spending budget exhausted").sum() == 4
+
+    workflow.spending_budget = SpendingBudget(max_cost=1.0)
+    complete = asyncio.run(workflow.resume(_data()))
+    assert complete["round-A_R_evaluation"].tolist() == [4] * 6
+    assert len(reviewer.provider.calls) == 6
+
+
+def test_round_budget_in_pipelined_mode():
+    reviewer = _reviewer()
+    budget = SpendingBudget(max_cost=0.001)
+    schema = [{"round": "A", "reviewers": [reviewer], "text_inputs": ["title"], "spending_budget": budget}]
+    result = asyncio.run(ReviewWorkflow(workflow_schema=schema, execution_mode="pipelined", verbose=False)(_data()))
+    assert len(reviewer.provider.calls) == 1
+    assert result["round-A_R_error"].notna().sum() == 5
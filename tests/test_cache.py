@@ -0,0 +1,108 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.cache import ResponseCache, make_cache_key
+from lattereview.utils.retry import RetryPolicy
+from tests.fakes import fake_reviewer
+
+
+def _key(**overrides):
+    args = dict(provider="Fake", model="m", system_prompt="sys", input_prompt="prompt", model_args={"temperature": 0})
+    args.update(overrides)
+    return make_cache_key(**args)
+
+
+def test_cache_key_covers_request_inputs(tmp_path):
+    image = tmp_path / "figure.png"
+    image.write_bytes(b"one")
+    base = _key(image_path_list=[str(image)])
+    assert base == _key(image_path_list=[str(image)])
+    assert base != _key(image_path_list=[str(image)], model="other")
+    assert base != _key(image_path_list=[str(image)], system_prompt="other")
+    assert base != _key(image_path_list=[str(image)], model_args={"temperature": 0, "max_tokens": 5})
+    time.sleep(0.01)
+    image.write_bytes(b"two")
+    assert base != _key(image_path_list=[str(image)])
+
+
+def test_cache_persists_and_counts_hits(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path)
+    assert cache.get("k") is None
+    cache.set("k", '{"a": 1}')
+    assert cache.get("k") == '{"a": 1}'
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    cache.close()
+    assert ResponseCache(path).get("k") == '{"a": 1}'
+
+
+def test_cache_eviction(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        time.sleep(0.001)
+    cache.get("a")
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+
+    aged = ResponseCache(tmp_path / "aged.sqlite", max_age_seconds=0)
+    aged.set("k", "v")
+    assert aged.get("k") is None
+
+
+def _reviewer(cache, model_args):
+    return fake_reviewer(
+        lambda prompt: {"reasoning": "ok", "evaluation": 4}, response_cache=cache, model_args=model_args
+    )
+
+
+def test_deterministic_reviews_skip_the_provider(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    first = _reviewer(cache, {"temperature": 0})
+    outputs, cost = asyncio.run(first.review_items(["a", "b"]))
+    assert len(first.provider.calls) == 2 and cost > 0
+
+    second = _reviewer(cache, {"temperature": 0})
+    cached_outputs, cached_cost = asyncio.run(second.review_items(["a", "b"]))
+    assert second.provider.calls == []
+    assert cached_outputs == outputs and cached_cost == 0
+    assert cache.stats()["hits"] == 2
+
+
+def test_sampled_reviews_bypass_the_cache(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    for _ in range(2):
+        reviewer = _reviewer(cache, {"temperature": 0.7})
+        asyncio.run(reviewer.review_items(["a"]))
+        assert len(reviewer.provider.calls) == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalid_replies_are_not_cached(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    answers = iter([{"reasoning": "ok"}, {"reasoning": "ok", "evaluation": 4}])
+    reviewer = fake_reviewer(
+        lambda prompt: next(answers),
+        response_cache=cache,
+        model_args={"temperature": 0},
+        retry_policy=RetryPolicy(max_retries=2, base_delay=0),
+    )
+    outputs, _ = asyncio.run(reviewer.review_items(["only item"]))
+    assert outputs == ['{"reasoning": "ok", "evaluation": 4}']
+    assert len(reviewer.provider.calls) == 2 and reviewer.failures == []
+    assert cache.stats()["entries"] == 1
+
+
+def test_invalid_cached_entries_are_fetched_again(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    reviewer = _reviewer(cache, {"temperature": 0})
+    asyncio.run(reviewer.review_items(["only item"]))
+    [key] = [row[0] for row in cache._connection.execute("SELECT key FROM responses")]
+    cache.set(key, '{"reasoning": "stale"}')  # as stored before replies were validated
+    outputs, _ = asyncio.run(reviewer.review_items(["only item"]))
+    assert outputs == ['{"reasoning": "ok", "evaluation": 4}']
+    assert len(reviewer.provider.calls) == 2
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.agents import CascadeReviewer
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import StatusError, fake_reviewer
+
+
+def _reviewer(name, handler):
+    return fake_reviewer(handler, name=name)
+
+
+def _cascade(**kwargs):
+    # The cheap reviewer is unsure (3) about odd items and certain (5) about even ones
+    cheap = _reviewer("Cheap", lambda prompt: {"reasoning": "cheap", "evaluation": 3 if "odd" in prompt else 5})
+    strong = _reviewer("Strong", lambda prompt: {"reasoning": "strong", "evaluation": 1})
+    return CascadeReviewer(first_reviewer=cheap, second_reviewer=strong, name="Cascade", verbose=False, **kwargs)
+
+
+def _texts(n=4):
+    return [f"item {i} {'odd' if i % 2 else 'even'}" for i in range(n)]
+
+
+def test_only_uncertain_items_are_escalated():
+    cascade = _cascade()
+    results, cost = asyncio.run(cascade.review_items(_texts()))
+    answers = [json.loads(result) for result in results]
+    assert [answer["evaluation"] for answer in answers] == [5, 1, 5, 1]
+    assert [answer["escalated"] for answer in answers] == [False, True, False, True]
+    assert answers[1]["first_output"]["evaluation"] == 3 and answers[1]["second_output"]["reasoning"] == "strong"
+    assert answers[0]["second_output"] is None
+    assert len(cascade.second_reviewer.provider.calls) == 2
+    assert cascade.escalation_rate == 0.5
+    assert abs(cost - 6 * 0.002) < 1e-9
+
+
+def test_certainty_threshold_and_custom_rule():
+    cascade = _cascade(escalation_rule=lambda answer: answer["evaluation"] == 5)
+    assert cascade.needs_escalation('{"evaluation": 5}') and not cascade.needs_escalation({"evaluation": 3})
+    assert cascade.needs_escalation(None) and cascade.needs_escalation("not json")
+    cascade = _cascade(certainty_threshold=70)
+    assert cascade.needs_escalation({"score": 2, "certainty": 50})
+    assert not cascade.needs_escalation({"score": 2, "certainty": 90})
+
+
+def test_failed_escalation_is_reported():
+    cascade = _cascade()
+    cascade.second_reviewer.provider.handler = lambda prompt: StatusError(400)
+    results, _ = asyncio.run(cascade.review_items(_texts()))
+    assert results[0] is not None and results[1] is None and results[3] is None
+    assert [failure["index"] for failure in cascade.failures] == [1, 3]
+
+
+def test_cascade_in_workflow_writes_both_outputs():
+    data = pd.DataFrame({"title": _texts()})
+    for execution_mode in ("sequential", "pipelined"):
+        cascade = _cascade()
+        schema = [{"round": "A", "reviewers": [cascade], "text_inputs": ["title"]}]
+        workflow = ReviewWorkflow(workflow_schema=schema, execution_mode=execution_mode, verbose=False)
+        result = asyncio.run(workflow(data.copy()))
+        assert result["round-A_Cascade_evaluation"].tolist() == [5, 1, 5, 1]
+        assert result["round-A_Cascade_escalated"].tolist() == [False, True, False, True]
+        assert result["round-A_Cascade_first_output"].tolist()[1]["evaluation"] == 3
+        assert cascade.escalation_rate == 0.5
+        assert abs(workflow.get_total_cost() - 6 * 0.002) < 1e-9
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.data_handler import find_duplicates, normalize_doi, normalize_title
+from lattereview.workflows import ReviewWorkflow
+from lattereview.workflows.review_workflow import ReviewWorkflowError
+from tests.fakes import fake_reviewer
+
+ABSTRACT = (
+    "We trained a deep convolutional neural network to classify chest radiographs as normal or abnormal using "
+    "a retrospective cohort of forty thousand studies from three hospitals, and evaluated it on an external set."
+)
+
+
+def _records():
+    return pd.DataFrame(
+        {
+            "title": [
+                "Deep learning for chest radiographs",
+                "Deep Learning for Chest Radiographs.",  # same title after normalization
+                "Deep learning for chest radiograph triage",  # near duplicate: same abstract, small edit
+                "Liver segmentation in CT",
+                "An unrelated title",  # same DOI as the liver paper
+            ],
+            "abstract": [ABSTRACT, ABSTRACT, ABSTRACT.replace("forty", "40"), "Segmentation of the liver.", ""],
+            "doi": ["10.1/a", None, None, "https://doi.org/10.1/LIVER", "doi:10.1/liver"],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def test_normalization():
+    assert normalize_doi(" https://dx.doi.org/10.1000/ABC ") == "10.1000/abc"
+    assert normalize_doi(float("nan")) is None
+    assert normalize_title("  Deep-Learning:   a Review. ") == "deep learning a review"
+
+
+def test_find_duplicates_groups_exact_and_near_duplicates():
+    representatives = find_duplicates(_records())
+    assert representatives.tolist() == [10, 10, 10, 13, 13]
+    assert find_duplicates(_records(), threshold=1.0).tolist() == [10, 10, 12, 13, 13]
+
+
+def test_distinct_records_are_kept():
+    df = pd.DataFrame({"title": [f"study {word}" for word in ("alpha", "beta", "gamma")], "abstract": ["x", "y", "z"]})
+    assert find_duplicates(df).tolist() == [0, 1, 2]
+
+
+def test_workflow_reviews_one_record_per_group():
+    reviewer = fake_reviewer(lambda prompt: {"reasoning": "r", "evaluation": 4}, name="R")
+    schema = [{"round": "A", "reviewers": [reviewer], "text_inputs": ["title", "abstract"]}]
+    workflow = ReviewWorkflow(workflow_schema=schema, deduplicate=True, verbose=False)
+    result = asyncio.run(workflow(_records()))
+    assert len(reviewer.provider.calls) == 2
+    assert result.index.tolist() == [10, 11, 12, 13, 14]
+    assert result["round-A_R_evaluation"].tolist() == [4] * 5
+    assert result["duplicate_of"].tolist()[1:3] == [10, 10] and result["duplicate_of"].isna().tolist()[0]
+
+
+def test_rows_without_text_are_not_grouped():
+    df = pd.DataFrame({"title": ["", None, "", "Liver segmentation in CT", "Brain MRI"], "abstract": [""] * 5})
+    assert find_duplicates(df).tolist() == [0, 1, 2, 3, 4]
+    df["doi"] = ["10.1/a", None, "10.1/A", None, None]
+    assert find_duplicates(df).tolist() == [0, 1, 0, 3, 4]
+
+
+def test_rows_with_different_dois_are_never_merged():
+    df = pd.DataFrame(
+        {
+            "title": ["Editorial", "Editorial", "Editorial"],
+            "abstract": [ABSTRACT, ABSTRACT, ABSTRACT],
+            "doi": ["10.1/first", "10.1/second", None],
+        }
+    )
+    assert find_duplicates(df).tolist() == [0, 1, 0]
+
+
+def test_missing_title_column_falls_back_to_doi():
+    df = pd.DataFrame({"doi": ["10.1/a", "10.1/A", "10.1/b"]})
+    assert find_duplicates(df).tolist() == [0, 0, 2]
+    with pytest.raises(ValueError, match="'title'"):
+        find_duplicates(pd.DataFrame({"name": ["x", "x"]}))
+
+
+def test_duplicate_index_labels_are_rejected_before_reviewing():
+    records = pd.concat([_records().iloc[:2], _records().iloc[3:5]]).reset_index(drop=True)
+    records.index = [0, 1, 0, 1]
+    with pytest.raises(ValueError, match="duplicate labels"):
+        find_duplicates(records)
+    reviewer = fake_reviewer(lambda prompt: {"reasoning": "r", "evaluation": 4}, name="R")
+    schema = [{"round": "A", "reviewers": [reviewer], "text_inputs": ["title", "abstract"]}]
+    with pytest.raises(ReviewWorkflowError, match="duplicate labels"):
+        asyncio.run(ReviewWorkflow(workflow_schema=schema, deduplicate=True, verbose=False)(records))
+    assert reviewer.provider.calls == []
@@ -0,0 +1,106 @@
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.providers import OllamaProvider
+from lattereview.utils.host_pool import HostPool, HostPoolError
+from tests.fakes import StatusError, StubHandler, stub_server, stub_url
+
+
+class _OllamaHandler(StubHandler):
+    """Stand-in for the Ollama chat and process-status endpoints; answers with the server's name."""
+
+    def do_GET(self):
+        if self.server.failing:
+            self.send_json({"error": "down"}, status=500)
+        else:
+            self.send_json({"models": []})
+
+    def do_POST(self):
+        request = self.read_json()
+        self.server.requests += 1
+        if self.server.failing:
+            self.send_json({"error": "GPU lost"}, status=500)
+            return
+        time.sleep(self.server.delay)
+        self.send_json(
+            {
+                "model": request["model"],
+                "created_at": "2026-01-01T00:00:00Z",
+                "message": {"role": "assistant", "content": self.server.name},
+                "done": True,
+                "prompt_eval_count": 10,
+                "eval_count": 5,
+            }
+        )
+
+
+@pytest.fixture
+def stub_servers():
+    with contextlib.ExitStack() as stack:
+        yield [
+            stack.enter_context(stub_server(_OllamaHandler, name=f"box-{i}", requests=0, failing=False, delay=0.05))
+            for i in range(3)
+        ]
+
+
+def _provider(servers, **kwargs):
+    hosts = [stub_url(server) for server in servers]
+    return OllamaProvider(model="stub", hosts=hosts, **kwargs)
+
+
+async def _ask(provider, n):
+    return await asyncio.gather(*(provider.get_response(f"question {i}") for i in range(n)))
+
+
+def test_requests_spread_across_hosts(stub_servers):
+    provider = _provider(stub_servers)
+    results = asyncio.run(_ask(provider, 9))
+    assert {response for response, _ in results} == {"box-0", "box-1", "box-2"}
+    assert [server.requests for server in stub_servers] == [3, 3, 3]
+    stats = provider.host_stats()
+    assert all(host["requests"] == 3 and host["output_tokens_per_second"] > 0 for host in stats.values())
+
+
+def test_failing_host_is_removed_and_readmitted(stub_servers):
+    stub_servers[1].failing = True
+    provider = _provider(stub_servers, host_max_failures=1, host_cooldown=60)
+    results = asyncio.run(_ask(provider, 6))
+    assert {response for response, _ in results} == {"box-0", "box-2"}  # failed requests went to other hosts
+    assert provider.host_pool.healthy_hosts == [provider.hosts[0], provider.hosts[2]]
+    failed_requests = stub_servers[1].requests
+    asyncio.run(_ask(provider, 4))
+    assert stub_servers[1].requests == failed_requests
+
+    stub_servers[1].failing = False
+    health = asyncio.run(provider.check_hosts())
+    assert list(health.values()) == [True, True, True]
+    asyncio.run(_ask(provider, 3))
+    assert stub_servers[1].requests == failed_requests + 1
+
+
+def test_weighted_routing_follows_weights():
+    pool = HostPool(["a", "b"], weights={"a": 3, "b": 1}, strategy="weighted")
+    chosen = []
+    for _ in range(8):
+        state = pool.acquire()
+        chosen.append(state.host)
+        pool.release(state)
+    assert chosen.count("a") == 6 and chosen.count("b") == 2
+
+
+def test_host_pool_only_counts_host_failures():
+    pool = HostPool(["a", "b"], max_failures=2, cooldown=0.05)
+    for error in (StatusError(400), StatusError(503), StatusError(503)):
+        pool.release(pool.acquire(exclude=["b"]), error)
+    assert pool.healthy_hosts == ["b"]
+    assert pool.acquire().host == "b"
+    time.sleep(0.06)
+    assert pool.acquire(exclude=["b"]).host == "a"  # given a trial request after the cooldown
+    with pytest.raises(HostPoolError):
+        pool.acquire(exclude=["a", "b"])
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.providers import OpenAIProvider
+from lattereview.utils.http_clients import HttpClientRegistry, get_http_clients
+from tests.fakes import StubHandler, stub_server, stub_url
+
+
+class _KeepAliveHandler(StubHandler):
+    def do_GET(self):
+        self.send_json({})
+
+
+@pytest.fixture
+def server_url():
+    with stub_server(_KeepAliveHandler) as server:
+        yield stub_url(server)
+
+
+def test_clients_of_one_endpoint_share_connections(server_url):
+    registry = HttpClientRegistry()
+
+    async def run():
+        first = registry.client(server_url, "key-a")
+        second = registry.client(server_url, "key-a")
+        for client in (first, second, first, second):
+            assert (await client.get(f"{server_url}/ping")).status_code == 200
+        await first.aclose()
+        assert (await second.get(f"{server_url}/ping")).status_code == 200
+        await registry.aclose()
+
+    asyncio.run(run())
+    [stats] = registry.stats().values()
+    assert stats == {"requests": 5, "connections_opened": 1, "connections_reused": 4}
+
+
+def test_pools_are_kept_per_event_loop(server_url):
+    registry = HttpClientRegistry()
+    client = registry.client(server_url)
+    for _ in range(2):
+        assert asyncio.run(client.get(f"{server_url}/ping")).status_code == 200
+    assert registry.stats()[f"{server_url}|no-key"]["connections_opened"] == 2
+
+
+def test_pools_are_keyed_by_endpoint_and_api_key():
+    registry = HttpClientRegistry()
+    registry.configure(max_connections=10, keepalive_expiry=5.0)
+    assert registry.transport("https://a", "key") is registry.transport("https://a", "key")
+    assert registry.transport("https://a", "key") is not registry.transport("https://a", "other")
+    assert registry.transport("https://a", "key") is not registry.transport("https://b", "key")
+    assert all("key" not in name.split("|")[1] for name in registry.stats())
+
+
+def test_providers_share_one_transport():
+    first = OpenAIProvider(model="gpt-4o-mini", api_key="test-key", base_url="https://example.test/v1")
+    second = OpenAIProvider(model="gpt-4o-mini", api_key="test-key", base_url="https://example.test/v1")
+    separate = OpenAIProvider(
+        model="gpt-4o-mini", api_key="test-key", base_url="https://example.test/v1", share_connections=False
+    )
+    shared = get_http_clients().transport("https://example.test/v1", "test-key")
+    assert first.client._client._transport is shared and second.client._client._transport is shared
+    assert separate.client._client._transport is not shared
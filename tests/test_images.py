@@ -0,0 +1,74 @@
+import asyncio
+import base64
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.providers import OpenAIProvider
+from lattereview.utils.images import ImageCache, ImageError, encode_image, get_image_cache, load_images, target_size
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "scan.jpg"
+    Image.new("RGB", (1600, 1200), (200, 30, 30)).save(path, format="JPEG")
+    get_image_cache().clear()
+    return str(path)
+
+
+def _decoded_size(content):
+    with Image.open(io.BytesIO(base64.b64decode(content))) as image:
+        return image.size
+
+
+def test_target_size_only_downscales():
+    assert target_size(400, 300) == (400, 300)
+    assert target_size(400, 300, detail="low") == (400, 300)
+    assert target_size(1600, 1200, detail="low") == (512, 384)
+    assert target_size(4096, 1024, detail="high") == (2048, 512)
+    assert target_size(1600, 1200, detail="high") == (1024, 768)
+    assert target_size(1600, 1200, max_pixels=120_000) == (400, 300)
+
+
+def test_encoding_is_cached_until_the_file_changes(image_path):
+    cache = get_image_cache()
+    first = encode_image(image_path)
+    assert encode_image(image_path) is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    Image.new("RGB", (10, 10)).save(image_path, format="JPEG")
+    os.utime(image_path, ns=(os.stat(image_path).st_atime_ns, os.stat(image_path).st_mtime_ns + 1_000_000))
+    assert encode_image(image_path) != first
+
+
+def test_images_are_downscaled_to_the_detail_level(image_path):
+    subtype, content = encode_image(image_path, detail="low")
+    assert subtype == "jpeg"
+    assert _decoded_size(content) == (512, 384)
+    assert _decoded_size(encode_image(image_path)[1]) == (1600, 1200)
+    with pytest.raises(ImageError):
+        encode_image(image_path, detail="medium")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ImageCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put((key, 0, 0, None, None), ("png", key))
+    assert cache.get(("a", 0, 0, None, None)) is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_provider_preloads_images_and_sends_detail(image_path):
+    provider = OpenAIProvider(model="gpt-4o-mini", api_key="test-key", image_detail="low")
+    asyncio.run(load_images([image_path, image_path], detail="low"))
+    assert get_image_cache().stats()["misses"] == 1
+    message_list = provider._prepare_message_list("Describe the image", [image_path])
+    image_url = message_list[-1]["content"][1]["image_url"]
+    assert image_url["detail"] == "low"
+    assert image_url["url"].startswith("data:image/jpeg;base64,")
+    assert _decoded_size(image_url["url"].split(",", 1)[1]) == (512, 384)
+    assert get_image_cache().stats()["hits"] == 1
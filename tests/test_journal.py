@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.journal import ReviewJournal
+from lattereview.utils.retry import RetryPolicy
+from lattereview.workflows import ReviewWorkflow
+from lattereview.workflows.review_workflow import ReviewWorkflowError
+from tests.fakes import StatusError, fake_reviewer
+
+
+def _reviewer(name, handler):
+    return fake_reviewer(handler, name=name, retry_policy=RetryPolicy(max_retries=0))
+
+
+def _schema(screener, second):
+    return [
+        {"round": "A", "reviewers": [screener], "text_inputs": ["title"]},
+        {
+            "round": "B",
+            "reviewers": [second],
+            "text_inputs": ["title", "round-A_Screener_reasoning"],
+            "filter": lambda row: row["round-A_Screener_evaluation"] >= 4,
+        },
+    ]
+
+
+def _data():
+    return pd.DataFrame({"title": [f"title {i}" for i in range(5)]})
+
+
+def _ok(prompt):
+    return {"reasoning": "ok", "evaluation": 5}
+
+
+@pytest.mark.parametrize("execution_mode", ["sequential", "pipelined"])
+def test_resume_sends_only_missing_calls(tmp_path, execution_mode):
+    journal_path = str(tmp_path / "run.jsonl")
+    screener = _reviewer("Screener", _ok)
+    broken = _reviewer("Second", lambda prompt: StatusError(401) if "title 3" in prompt else _ok(prompt))
+    workflow = ReviewWorkflow(
+        workflow_schema=_schema(screener, broken), journal_path=journal_path, execution_mode=execution_mode, verbose=False
+    )
+    first = asyncio.run(workflow(_data()))
+    assert first["round-B_Second_evaluation"].isna().sum() == 1
+
+    with pytest.raises(ReviewWorkflowError):
+        asyncio.run(workflow(_data()))
+
+    screener = _reviewer("Screener", _ok)
+    fixed = _reviewer("Second", _ok)
+    resumed_workflow = ReviewWorkflow(
+        workflow_schema=_schema(screener, fixed), execution_mode=execution_mode, verbose=False
+    )
+    resumed = asyncio.run(resumed_workflow.resume(_data(), journal_path=journal_path))
+    assert screener.provider.calls == []
+    assert len(fixed.provider.calls) == 1 and "title 3" in fixed.provider.calls[0]
+    assert resumed["round-B_Second_evaluation"].tolist() == [5] * 5
+    assert resumed_workflow.get_total_cost() == pytest.approx(workflow.get_total_cost() + 0.002)
+
+
+def test_journal_skips_truncated_lines_and_changed_inputs(tmp_path):
+    journal = ReviewJournal(tmp_path / "run.jsonl")
+    journal.append("A", "R", 0, "hash-0", '{"evaluation": 1}', {"total_cost": 0.5})
+    with open(journal.path, "a") as f:
+        f.write('{"round": "A", "reviewer": "R", "ind')
+
+    reloaded = ReviewJournal(journal.path)
+    assert reloaded.load() == 1
+    assert reloaded.lookup("A", "R", 0, "hash-0")["cost"] == 0.5
+    assert reloaded.lookup("A", "R", 0, "hash-changed") is None
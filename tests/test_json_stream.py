@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+from pydantic import create_model
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.agents import ScoringReviewer
+from lattereview.providers import OllamaProvider
+from lattereview.providers.base_provider import ResponseError
+from lattereview.utils.json_stream import JsonStreamError, JsonStreamParser
+from lattereview.utils.retry import MALFORMED_RESPONSE, classify_error
+from tests.fakes import StubHandler, stub_server, stub_url
+
+Review = create_model("Review", evaluation=(int, ...), reasoning=(str, ...), tags=(list, ...))
+
+
+def test_fields_are_parsed_across_any_chunking():
+    text = '{ "evaluation" : 2, "reasoning": "it \\"fits\\" {x}, yes", "tags": [1, {"a": "]"}]}  '
+    for size in (1, 3, 7, len(text)):
+        parser = JsonStreamParser(Review)
+        completed = [key for start in range(0, len(text), size) for key in parser.feed(text[start : start + size])]
+        parser.close()
+        assert completed == ["evaluation", "reasoning", "tags"]
+        assert parser.result() == {"evaluation": 2, "reasoning": 'it "fits" {x}, yes', "tags": [1, {"a": "]"}]}
+
+
+def test_malformed_output_fails_at_the_first_bad_field():
+    for malformed in ("Sure! " * 50, '{"evaluation": "high", "reasoning": "', '{"evaluation": 1 2'):
+        with pytest.raises(JsonStreamError):
+            JsonStreamParser(Review).feed(malformed)
+    parser = JsonStreamParser(Review)
+    parser.feed('{"evaluation": 1}')
+    with pytest.raises(JsonStreamError, match="missing required fields"):
+        parser.close()
+
+
+def test_code_fences_and_short_preambles_are_skipped():
+    for text in ('```json\n{"evaluation": 3}\n```', 'Here is my review: {"evaluation": 3} Hope it helps!'):
+        parser = JsonStreamParser(create_model("Score", evaluation=(int, ...)))
+        for char in text:
+            parser.feed(char)
+        parser.close()
+        assert parser.result()["evaluation"] == 3
+
+
+def test_parser_is_complete_once_required_keys_arrive():
+    parser = JsonStreamParser(Review, required_keys=["evaluation"])
+    assert parser.feed('{"evaluation": 4, "reason') == ["evaluation"]
+    assert parser.complete and not parser.done
+    parser.close()
+    assert parser.result() == {"evaluation": 4, "reasoning": None, "tags": None}
+    with pytest.raises(JsonStreamError):
+        JsonStreamParser(Review, required_keys=["score"])
+
+
+class _StreamingHandler(StubHandler):
+    """Stand-in for Ollama's streaming chat endpoint, sending the server's parts one line at a time."""
+
+    protocol_version = "HTTP/1.0"  # the stream has no length and ends when the connection closes
+
+    def _part(self, content, done=False):
+        part = {"model": "stub", "created_at": "2026-01-01T00:00:00Z", "done": done}
+        part["message"] = {"role": "assistant", "content": content}
+        if done:
+            part.update({"prompt_eval_count": 10, "eval_count": len(self.server.parts)})
+        self.wfile.write(json.dumps(part).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.server.request = self.read_json()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for content in self.server.parts:
+                self._part(content)
+                self.server.sent += 1
+                time.sleep(0.01)
+            self._part("", done=True)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.disconnected = True
+
+
+@pytest.fixture
+def server():
+    with stub_server(_StreamingHandler, sent=0, disconnected=False) as server:
+        yield server
+
+
+def _provider(server):
+    return OllamaProvider(model="stub", host=stub_url(server))
+
+
+def test_generation_stops_once_required_keys_are_complete(server):
+    server.parts = ['{"evaluation"', ": 1, ", '"reasoning": "'] + ["long reasoning "] * 200 + ['"}']
+    response, cost = asyncio.run(
+        _provider(server).get_streamed_json_response(
+            "Rate this", response_format={"evaluation": int, "reasoning": str}, stop_after=["evaluation"]
+        )
+    )
+    assert json.loads(response) == {"evaluation": 1, "reasoning": None}
+    assert cost["total_cost"] == 0
+    assert server.request["stream"] is True and "properties" in server.request["format"]
+    time.sleep(0.1)
+    assert server.disconnected and server.sent < 50
+
+
+def test_full_stream_reports_usage(server):
+    server.parts = ['{"evaluation": 1, ', '"reasoning": "fine"}']
+    response, cost = asyncio.run(
+        _provider(server).get_streamed_json_response("Rate this", response_format={"evaluation": int, "reasoning": str})
+    )
+    assert json.loads(response) == {"evaluation": 1, "reasoning": "fine"}
+    assert cost["input_tokens"] == 10 and cost["output_tokens"] == 2
+
+
+def test_malformed_stream_fails_fast(server):
+    server.parts = ["Sure, here is my review: "] + ["blah "] * 200
+    started = time.monotonic()
+    with pytest.raises(ResponseError) as error:
+        asyncio.run(_provider(server).get_streamed_json_response("Rate this", response_format={"evaluation": int}))
+    assert time.monotonic() - started < 1.0
+    assert classify_error(error.value) == MALFORMED_RESPONSE
+
+
+def test_reviewer_streams_and_stops_after_its_keys(server):
+    server.parts = ['{"reasoning": "short", "score": 1, ', '"certainty": 90}']
+    reviewer = ScoringReviewer(
+        provider=_provider(server),
+        name="Scorer",
+        scoring_task="Rate relevance",
+        stream_responses=True,
+        stream_stop_after=["score"],
+        verbose=False,
+    )
+    outputs, _ = asyncio.run(reviewer.review_items(["paper one"]))
+    assert json.loads(outputs[0]) == {"reasoning": "short", "score": 1, "certainty": None}
+    assert server.request["stream"] is True
+
+
+def test_fenced_stream_is_parsed(server):
+    server.parts = ["```json\n", '{"evaluation": 1, ', '"reasoning": "fine"}', "\n```"]
+    response, _ = asyncio.run(
+        _provider(server).get_streamed_json_response("Rate this", response_format={"evaluation": int, "reasoning": str})
+    )
+    assert json.loads(response) == {"evaluation": 1, "reasoning": "fine"}
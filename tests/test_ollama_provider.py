@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.providers import OllamaProvider
+from lattereview.providers.ollama_provider import format_schema
+from lattereview.workflows import ReviewWorkflow
+from lattereview.agents import ScoringReviewer
+from tests.fakes import StubHandler, stub_server, stub_url
+
+
+class _RecordingHandler(StubHandler):
+    """Stand-in for the Ollama chat and generate endpoints that records every request body."""
+
+    def do_POST(self):
+        request = self.read_json()
+        self.server.received.append((self.path, request))
+        payload = {"model": request["model"], "created_at": "2026-01-01T00:00:00Z", "done": True}
+        if self.path == "/api/chat":
+            content = json.dumps({"reasoning": "fits", "score": 1, "certainty": 90}) if "format" in request else "hello"
+            payload.update({"message": {"role": "assistant", "content": content}, "eval_count": 5})
+        else:
+            payload["response"] = ""
+        self.send_json(payload)
+
+
+@pytest.fixture
+def server():
+    with stub_server(_RecordingHandler, received=[]) as server:
+        yield server
+
+
+def _provider(server, **kwargs):
+    return OllamaProvider(model="stub", host=stub_url(server), **kwargs)
+
+
+def test_schema_is_sent_as_native_format(server):
+    provider = _provider(server, keep_alive="30m")
+    response_format = {"reasoning": str, "score": int}
+    for _ in range(2):
+        asyncio.run(provider.get_json_response("Rate this", response_format=response_format))
+    [(path, request), _] = server.received
+    assert path == "/api/chat"
+    assert request["format"]["properties"].keys() == {"reasoning", "score"}
+    assert request["keep_alive"] == "30m"
+    assert "schema" not in request["messages"][0]["content"]
+    response_format_class = provider._response_format_class(response_format)
+    assert format_schema(response_format_class) is format_schema(response_format_class)
+    assert format_schema.cache_info().hits >= 2
+
+
+def test_prompt_schema_for_servers_without_structured_outputs(server):
+    provider = _provider(server, native_format=False)
+    asyncio.run(provider.get_json_response("Rate this", response_format={"score": int}))
+    [(_, request)] = server.received
+    assert request["format"] == "json"
+    assert "following this schema" in request["messages"][0]["content"]
+    assert "keep_alive" not in request
+
+
+def test_workflow_warms_up_each_provider_once(server):
+    provider = _provider(server, keep_alive=-1)
+    reviewers = [
+        ScoringReviewer(
+            provider=provider,
+            name=name,
+            scoring_task="Is this relevant?",
+            scoring_set=[1, 2],
+            scoring_rules="1 yes, 2 no",
+            verbose=False,
+        )
+        for name in ("first", "second")
+    ]
+    workflow = ReviewWorkflow(
+        workflow_schema=[{"round": "A", "reviewers": reviewers, "text_inputs": ["title"]}], verbose=False
+    )
+    asyncio.run(workflow.run(pd.DataFrame({"title": ["paper one", "paper two"]})))
+    paths = [path for path, _ in server.received]
+    assert paths[0] == "/api/generate" and paths.count("/api/generate") == 1
+    assert paths.count("/api/chat") == 4
+    assert server.received[0][1]["keep_alive"] == -1
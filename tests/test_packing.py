@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import fake_reviewer
+
+
+def _score(title_number):
+    return 1 + int(title_number) % 5
+
+
+def _handler(drop=()):
+    def handler(prompt):
+        if "are reviewed together" in prompt:
+            items = []
+            for task_id, number in re.findall(r"Review Task ID: (\S+) (?:=== title === )?title (\d+)", prompt):
+                if number not in drop:
+                    items.append({"review_task_id": task_id, "reasoning": "packed", "evaluation": _score(number)})
+            return {"items": items}
+        number = re.search(r"title (\d+)", prompt).group(1)
+        return {"reasoning": "single", "evaluation": _score(number)}
+
+    return handler
+
+
+def _reviewer(handler, **kwargs):
+    return fake_reviewer(handler, name="Packer", **kwargs)
+
+
+def _run(reviewer, n):
+    workflow = ReviewWorkflow(
+        workflow_schema=[{"round": "A", "reviewers": [reviewer], "text_inputs": ["title"]}], verbose=False
+    )
+    return asyncio.run(workflow(pd.DataFrame({"title": [f"title {i}" for i in range(n)]})))
+
+
+def test_packed_results_match_items():
+    reviewer = _reviewer(_handler(), pack_size=3)
+    df = _run(reviewer, 7)
+    assert df["round-A_Packer_evaluation"].tolist() == [_score(i) for i in range(7)]
+    assert len(reviewer.provider.calls) == 3
+    assert df["round-A_Packer_reasoning"].tolist() == ["packed"] * 6 + ["single"]
+    assert reviewer.provider.response_format is None  # formats go with each request; the provider is never modified
+
+
+def test_missing_items_fall_back_to_single_calls():
+    reviewer = _reviewer(_handler(drop={"1"}), pack_size=4)
+    outputs, cost = asyncio.run(reviewer.review_items([f"title {i}" for i in range(4)]))
+    assert [json.loads(output)["evaluation"] for output in outputs] == [_score(i) for i in range(4)]
+    assert json.loads(outputs[1])["reasoning"] == "single"
+    assert len(reviewer.provider.calls) == 2
+    assert cost == 0.004
+
+
+def test_token_budget_limits_packs():
+    reviewer = _reviewer(_handler(), pack_size=10, pack_token_budget=10)
+    texts = ["x" * 20, "x" * 20, "x" * 20, "x" * 80]
+    assert reviewer._build_packs(texts, [[]] * 4) == [[0, 1], [2], [3]]
+    assert reviewer._build_packs(["a", "b", "c"], [[], ["figure.png"], []]) == [[1], [0, 2]]
+
+
+def test_packs_are_described_by_the_packed_system_prompt():
+    reviewer = _reviewer(_handler(), pack_size=2)
+    asyncio.run(reviewer.review_items([f"title {i}" for i in range(3)]))
+    packed_message, single_message = reviewer.provider.system_messages
+    assert "items: a list with one entry per input item" in packed_message
+    assert "review_task_id (str)" in packed_message
+    assert single_message == reviewer.system_prompt and "items:" not in single_message
+
+
+def test_callable_context_disables_packing():
+    contexts = []
+
+    async def context(item):
+        contexts.append(item)
+        return "extra"
+
+    reviewer = _reviewer(_handler(), pack_size=3, additional_context=context)
+    outputs, _ = asyncio.run(reviewer.review_items([f"title {i}" for i in range(3)]))
+    assert sorted(contexts) == [f"title {i}" for i in range(3)]
+    assert len(reviewer.provider.calls) == 3
+    assert [json.loads(output)["reasoning"] for output in outputs] == ["single"] * 3
+
+
+def test_workflow_warns_when_packing_is_ignored(capsys):
+    reviewer = _reviewer(_handler(), pack_size=3)
+    workflow = ReviewWorkflow(
+        workflow_schema=[{"round": "A", "reviewers": [reviewer], "text_inputs": ["title"]}],
+        execution_mode="pipelined",
+        verbose=True,
+    )
+    df = asyncio.run(workflow(pd.DataFrame({"title": [f"title {i}" for i in range(3)]})))
+    assert "packing is ignored in pipelined mode" in capsys.readouterr().out
+    assert df["round-A_Packer_reasoning"].tolist() == ["single"] * 3
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.tokens import count_tokens, token_cost
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import fake_reviewer
+
+
+def _answer(prompt):
+    return {"reasoning": "r", "evaluation": 1 if "title 1" in prompt else 5}
+
+
+def _reviewer(name, model="gpt-4o-mini", **kwargs):
+    return fake_reviewer(_answer, model=model, name=name, **kwargs)
+
+
+def _data(n=10):
+    return pd.DataFrame({"title": [f"title {i}" for i in range(n)], "abstract": [f"abstract {i}" for i in range(n)]})
+
+
+def _schema():
+    screener = _reviewer("Screener", max_concurrent_requests=5)
+    expert = _reviewer("Expert")
+    return [
+        {"round": "A", "reviewers": [screener], "text_inputs": ["title", "abstract"]},
+        {
+            "round": "B",
+            "reviewers": [expert],
+            "text_inputs": ["title", "round-A_Screener_reasoning"],
+            "filter": lambda row: row["round-A_Screener_evaluation"] == 1,
+        },
+    ]
+
+
+def test_token_helpers():
+    assert count_tokens("x" * 400, "unknown-model") > 0
+    assert token_cost("gpt-4o-mini", 1000, 0) > 0
+    assert token_cost("not-a-real-model", 1000, 1000) is None
+
+
+def test_plan_without_pilot_sends_nothing():
+    schema = _schema()
+    workflow = ReviewWorkflow(workflow_schema=schema, verbose=False)
+    plan = asyncio.run(workflow.plan(_data(), output_tokens=100, seconds_per_call=2.0))
+    assert not schema[0]["reviewers"][0].provider.calls
+    entries = plan.to_dataframe().set_index("reviewer")
+    # Without a pilot, every record is assumed to pass round B's filter
+    assert entries["calls"].tolist() == [10, 10]
+    assert entries.loc["Screener", "output_tokens"] == 1000
+    assert entries.loc["Screener", "seconds"] == 10 * 2.0 / 5
+    assert plan.total_calls == 20 and plan.total_cost > 0
+    first_prompt_tokens = entries.loc["Screener", "input_tokens"] / 10
+    assert first_prompt_tokens > 100
+
+
+def test_plan_with_pilot_uses_measured_pass_rates():
+    schema = _schema()
+    workflow = ReviewWorkflow(workflow_schema=schema, verbose=False)
+    plan = asyncio.run(workflow.plan(_data(), pilot_size=10))
+    assert plan.pilot_size == 10
+    assert plan.to_dataframe()["calls"].tolist() == [10, 1]
+    assert workflow.reviewer_costs == {}
+
+
+def test_plan_respects_rate_limits_and_unknown_prices():
+    schema = _schema()
+    for review_task in schema:
+        review_task["reviewers"][0].provider.model = "private-model"
+        review_task["reviewers"][0].provider.requests_per_minute = 6
+    plan = asyncio.run(ReviewWorkflow(workflow_schema=schema, verbose=False).plan(_data(), seconds_per_call=1.0))
+    assert plan.total_cost is None
+    assert plan.eta_seconds == 2 * 60.0 * 10 / 6
+
+
+def test_pilot_measures_the_latency_of_each_call():
+    schema = _schema()
+    screener = schema[0]["reviewers"][0]
+    screener.max_concurrent_requests = 2
+    screener.provider.delay = 0.05
+    plan = asyncio.run(ReviewWorkflow(workflow_schema=schema, verbose=False).plan(_data(), pilot_size=10))
+    # 10 calls of about 0.05s, two at a time; the pilot's wall time over its steps would give about 0.75s
+    seconds = plan.to_dataframe().set_index("reviewer").loc["Screener", "seconds"]
+    assert 0.2 <= seconds < 0.4
+    assert screener.request_timing["requests"] == 10
+
+
+def test_plan_counts_earlier_round_outputs_in_later_prompts():
+    workflow = ReviewWorkflow(workflow_schema=_schema(), verbose=False)
+    short = asyncio.run(workflow.plan(_data(), output_tokens=0)).to_dataframe().set_index("reviewer")
+    long = asyncio.run(workflow.plan(_data(), output_tokens=100)).to_dataframe().set_index("reviewer")
+    # Round B's prompt includes round A's reasoning, which only exists after round A ran
+    assert long.loc["Expert", "input_tokens"] - short.loc["Expert", "input_tokens"] == 10 * 100
+    assert long.loc["Screener", "input_tokens"] == short.loc["Screener", "input_tokens"]
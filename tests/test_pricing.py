@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.providers import OpenAIProvider
+from lattereview.utils.pricing import cost_from_usage, get_model_prices
+from lattereview.utils.scheduler import EndpointLimiter, RequestLease
+
+
+class _Usage:
+    prompt_tokens = 1000
+    completion_tokens = 200
+    prompt_tokens_details = {"cached_tokens": 400}
+
+
+def test_cost_from_usage_bills_cached_tokens_at_cache_price():
+    prices = get_model_prices("gpt-4o-mini")
+    cost = cost_from_usage("gpt-4o-mini", {"input_tokens": 1000, "cached_input_tokens": 400, "output_tokens": 200})
+    assert cost["input_cost"] == pytest.approx(600 * prices["input"] + 400 * prices["cached_input"])
+    assert cost["output_cost"] == pytest.approx(200 * prices["output"])
+    assert cost["total_cost"] == pytest.approx(cost["input_cost"] + cost["output_cost"])
+
+
+def test_cost_from_usage_strips_provider_prefix_and_rejects_unknowns():
+    assert get_model_prices("openai/gpt-4o-mini") == get_model_prices("gpt-4o-mini")
+    assert cost_from_usage("no-such-model", {"input_tokens": 1, "output_tokens": 1}) is None
+    assert cost_from_usage("gpt-4o-mini", {"input_tokens": 1}) is None
+
+
+def test_provider_prices_from_usage_without_tokenizing(monkeypatch):
+    provider = OpenAIProvider(model="gpt-4o-mini", api_key="test-key")
+    monkeypatch.setattr(provider, "_get_cost", lambda *args: pytest.fail("the usage block should be used"))
+    cost = asyncio.run(provider._get_response_cost("prompt", "completion", _Usage()))
+    assert cost["input_tokens"] == 1000 and cost["cached_input_tokens"] == 400 and cost["output_tokens"] == 200
+    assert cost["total_cost"] == pytest.approx(
+        cost_from_usage("gpt-4o-mini", {"input_tokens": 1000, "cached_input_tokens": 400, "output_tokens": 200})[
+            "total_cost"
+        ]
+    )
+
+
+def test_provider_falls_back_to_tokenizing_without_usage(monkeypatch):
+    provider = OpenAIProvider(model="gpt-4o-mini", api_key="test-key")
+    fallback = {"input_cost": 0.5, "output_cost": 0.25, "total_cost": 0.75}
+    monkeypatch.setattr(provider, "_get_cost", lambda *args: dict(fallback))
+    assert asyncio.run(provider._get_response_cost("prompt", "completion", None)) == fallback
+
+
+def test_lease_settles_with_reported_tokens():
+    provider = OpenAIProvider(model="gpt-4o-mini", api_key="test-key")
+    limiter = EndpointLimiter("test")
+    lease = RequestLease(limiter, estimated_tokens=50)
+    provider._settle_lease(lease, _Usage())
+    assert limiter.total_tokens == 1200 - 50
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.agents.basic_reviewer import _static_prefix_template
+from lattereview.agents.prompt_template import compile_prompt
+from tests.fakes import fake_reviewer
+
+
+
+
+def _two_pass(reviewer, text, context):
+    """The original rendering: substitute and clean the whole prompt once per key."""
+    prompt = reviewer._process_prompt(reviewer.formatted_prompt, {"item": text})
+    return reviewer._process_prompt(prompt, {"additional_context": context})
+
+
+@pytest.mark.parametrize(
+    "text, context",
+    [
+        ("A title\n\n  with   odd\twhitespace  ", None),
+        ("plain", ""),
+        ("", "some context"),
+        ("  ", "  spaced\ncontext  "),
+        ("Review Task ID: A-1\n=== title ===\nDeep learning", "Use the following additional context: <<x>>"),
+    ],
+)
+def test_render_matches_two_pass_substitution(text, context):
+    reviewer = fake_reviewer()
+    template = compile_prompt(reviewer.formatted_prompt)
+    assert template.render({"item": text, "additional_context": context}) == _two_pass(reviewer, text, context)
+
+
+def test_render_handles_adjacent_and_edge_slots():
+    template = compile_prompt("${a}$ \n start ${b}$${c}$  middle ${d}$")
+    assert template.slots == ("a", "b", "c", "d")
+    assert template.render({}) == "start middle"
+    assert template.render({"a": " x ", "c": "y\nz", "d": 1}) == "x start y z middle 1"
+
+
+def test_templates_are_compiled_once():
+    assert compile_prompt("Review ${item}$ now") is compile_prompt("Review ${item}$ now")
+
+
+def test_reviewer_prompt_includes_context():
+    reviewer = fake_reviewer(additional_context="Focus on   trials")
+    prompt = asyncio.run(reviewer._build_input_prompt("An   item"))
+    assert "An item" in prompt and "<<Focus on trials>>" in prompt and "${" not in prompt
+
+
+def test_static_prefix_layout_shares_leading_text():
+    reviewer = fake_reviewer(prompt_layout="static_prefix", additional_context="Focus on trials")
+    first = asyncio.run(reviewer._build_input_prompt("First item"))
+    misses = _static_prefix_template.cache_info().misses
+    second = asyncio.run(reviewer._build_input_prompt("Second item"))
+    assert _static_prefix_template.cache_info().misses == misses  # compiled once, reused for later items
+    prefix = first[: first.index("First item")]
+    assert second.startswith(prefix)
+    assert "State your reasoning before giving the score." in prefix
+    assert first.endswith(
+        "**Input item:** <<First item>> Use the following additional context for your scoring: <<Focus on trials>>"
+    )
+    assert reviewer._item_template() is reviewer._item_template()
+
+
+def test_token_usage_is_recorded():
+    reviewer = fake_reviewer()
+    usage = reviewer.provider._get_usage(
+        {"prompt_tokens": 1200, "completion_tokens": 40, "prompt_tokens_details": {"cached_tokens": 1024}}
+    )
+    assert usage == {"input_tokens": 1200, "output_tokens": 40, "cached_input_tokens": 1024}
+    reviewer._record_review("prompt", "{}", {"total_cost": 0.01, **usage})
+    reviewer._record_review("prompt", "{}", {"total_cost": 0.01, **usage})
+    assert reviewer.token_usage["cached_input_tokens"] == 2048
+    assert reviewer.memory[-1]["usage"] == usage
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.retry import (
+    AUTHENTICATION_ERROR,
+    BAD_REQUEST,
+    MALFORMED_RESPONSE,
+    RATE_LIMIT,
+    SERVER_ERROR,
+    TIMEOUT,
+    UNKNOWN_ERROR,
+    RetryBudget,
+    RetryPolicy,
+    classify_error,
+    get_retry_after,
+)
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import StatusError, fake_reviewer
+
+NO_DELAY = RetryPolicy(max_retries=3, base_delay=0, honor_retry_after=False)
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (StatusError(429), RATE_LIMIT),
+        (StatusError(503), SERVER_ERROR),
+        (StatusError(401), AUTHENTICATION_ERROR),
+        (StatusError(400), BAD_REQUEST),
+        (asyncio.TimeoutError(), TIMEOUT),
+        (ValueError("boom"), UNKNOWN_ERROR),
+    ],
+)
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_classify_error_looks_through_wrappers():
+    try:
+        try:
+            json.loads("{not json")
+        except Exception as e:
+            raise RuntimeError(f"Error getting JSON response: {e}")
+    except RuntimeError as wrapped:
+        assert classify_error(wrapped) == MALFORMED_RESPONSE
+
+
+def test_retry_after_header():
+    assert get_retry_after(StatusError(429, headers={"Retry-After": "7"})) == 7
+    assert get_retry_after(StatusError(429, headers={"retry-after-ms": "1500"})) == 1.5
+    assert get_retry_after(StatusError(429)) is None
+
+
+def test_backoff_is_capped_and_honors_retry_after():
+    policy = RetryPolicy(base_delay=1, max_delay=8, jitter=0)
+    assert [policy.compute_delay(attempt) for attempt in range(5)] == [1, 2, 4, 8, 8]
+    assert policy.compute_delay(0, StatusError(429, headers={"Retry-After": "5"})) == 5
+    jittered = RetryPolicy(base_delay=1, max_delay=8, jitter=1.0)
+    assert all(0 <= jittered.compute_delay(3) <= 8 for _ in range(50))
+
+
+def test_retry_budget():
+    budget = RetryBudget(2)
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    assert RetryBudget(None).try_spend()
+
+
+def _reviewer(handler, **kwargs):
+    kwargs.setdefault("retry_policy", NO_DELAY)
+    return fake_reviewer(handler, **kwargs)
+
+
+def test_transient_errors_are_retried_then_succeed():
+    attempts = []
+
+    def handler(prompt):
+        attempts.append(prompt)
+        return StatusError(429) if len(attempts) < 3 else {"reasoning": "ok", "evaluation": 4}
+
+    reviewer = _reviewer(handler)
+    outputs, _ = asyncio.run(reviewer.review_items(["only item"]))
+    assert len(attempts) == 3
+    assert outputs == ['{"reasoning": "ok", "evaluation": 4}']
+    assert reviewer.failures == []
+
+
+def test_fatal_errors_are_not_retried_and_do_not_abort_batch():
+    attempts = []
+
+    def handler(prompt):
+        attempts.append(prompt)
+        return StatusError(401) if "bad item" in prompt else {"reasoning": "ok", "evaluation": 4}
+
+    reviewer = _reviewer(handler)
+    outputs, _ = asyncio.run(reviewer.review_items(["good item", "bad item", "good item"]))
+    assert outputs[1] is None and outputs[0] is not None and outputs[2] is not None
+    assert len(attempts) == 3
+    assert reviewer.failures[0]["index"] == 1
+    assert reviewer.failures[0]["error_type"] == AUTHENTICATION_ERROR
+    assert reviewer.failures[0]["attempts"] == 1
+
+
+def test_persistent_errors_stop_after_max_retries():
+    attempts = []
+
+    def handler(prompt):
+        attempts.append(prompt)
+        return "{malformed"
+
+    reviewer = _reviewer(handler)
+    outputs, _ = asyncio.run(reviewer.review_items(["item"]))
+    assert outputs == [None]
+    assert len(attempts) == 4
+    assert reviewer.failures[0]["error_type"] == MALFORMED_RESPONSE
+
+
+def test_retry_budget_is_shared_across_items():
+    attempts = []
+
+    def handler(prompt):
+        attempts.append(prompt)
+        return StatusError(500)
+
+    reviewer = _reviewer(handler, retry_policy=RetryPolicy(max_retries=3, base_delay=0, retry_budget=2))
+    asyncio.run(reviewer.review_items([f"item {i}" for i in range(5)]))
+    assert len(attempts) == 5 + 2
+
+
+def test_workflow_records_failed_items():
+    reviewer = _reviewer(
+        lambda prompt: StatusError(400) if "broken" in prompt else {"reasoning": "ok", "evaluation": 5}, name="Rev"
+    )
+    workflow = ReviewWorkflow(
+        workflow_schema=[{"round": "A", "reviewers": [reviewer], "text_inputs": ["title"]}], verbose=False
+    )
+    df = asyncio.run(workflow(pd.DataFrame({"title": ["fine", "broken"]})))
+    assert df["round-A_Rev_evaluation"].tolist()[0] == 5
+    assert df["round-A_Rev_evaluation"].isna().tolist()[1]
+    assert "bad_request" in df["round-A_Rev_error"][1]
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.agents import ScoringReviewer, TitleAbstractReviewer
+from lattereview.workflows import ReviewWorkflow, agreement_rule
+from lattereview.workflows.review_workflow import ReviewWorkflowError
+from tests.fakes import FakeProvider, fake_reviewer
+
+
+def _reviewer(name, evaluation=5, delay=0.0, **kwargs):
+    return fake_reviewer(lambda prompt: {"reasoning": name, "evaluation": evaluation}, delay=delay, name=name, **kwargs)
+
+
+def _data(n=4):
+    return pd.DataFrame({"title": [f"title {i}" for i in range(n)], "abstract": [f"abstract {i}" for i in range(n)]})
+
+
+def test_concurrent_reviewers_write_deterministic_columns():
+    reviewers = [_reviewer("Slow", 1, delay=0.05), _reviewer("Fast", 5)]
+    schema = [{"round": "A", "reviewers": reviewers, "text_inputs": ["title", "abstract"]}]
+    sequential = asyncio.run(ReviewWorkflow(workflow_schema=schema, verbose=False)(_data()))
+    concurrent = asyncio.run(
+        ReviewWorkflow(workflow_schema=schema, execution_mode="concurrent", verbose=False)(_data())
+    )
+    pd.testing.assert_frame_equal(sequential, concurrent)
+    assert concurrent.columns.tolist()[2:5] == ["round-A_Slow_output", "round-A_Slow_reasoning", "round-A_Slow_evaluation"]
+    assert concurrent["round-A_Fast_evaluation"].tolist() == [5, 5, 5, 5]
+
+
+def test_concurrent_round_overlaps_reviewers():
+    reviewers = [_reviewer(f"R{i}", delay=0.1, max_concurrent_requests=4) for i in range(3)]
+    schema = [{"round": "A", "reviewers": reviewers, "text_inputs": ["title"]}]
+    workflow = ReviewWorkflow(workflow_schema=schema, execution_mode="concurrent", verbose=False)
+    started = time.monotonic()
+    asyncio.run(workflow(_data(4)))
+    assert time.monotonic() - started < 0.25
+
+
+def test_shared_concurrency_limit_spans_reviewers():
+    reviewers = [_reviewer(f"R{i}", delay=0.05) for i in range(2)]
+    schema = [{"round": "A", "reviewers": reviewers, "text_inputs": ["title"], "shared_concurrent_requests": 1}]
+    workflow = ReviewWorkflow(workflow_schema=schema, execution_mode="concurrent", verbose=False)
+    started = time.monotonic()
+    asyncio.run(workflow(_data(3)))
+    assert time.monotonic() - started >= 0.3
+
+
+def test_reviewers_share_one_provider_concurrently():
+    provider = FakeProvider(
+        handler=lambda prompt: {"reasoning": "r", "evaluation": 1, "score": 1, "certainty": 90}, delay=0.01
+    )
+    screener = TitleAbstractReviewer(provider=provider, name="Screener", inclusion_criteria="x", verbose=False)
+    scorer = ScoringReviewer(provider=provider, name="Scorer", scoring_task="Rate relevance", verbose=False)
+    schema = [{"round": "A", "reviewers": [screener, scorer], "text_inputs": ["title"]}]
+    df = asyncio.run(ReviewWorkflow(workflow_schema=schema, execution_mode="concurrent", verbose=False)(_data()))
+    assert {"round-A_Screener_evaluation", "round-A_Scorer_score", "round-A_Scorer_certainty"} <= set(df.columns)
+    assert "round-A_Screener_score" not in df.columns
+    assert sorted(provider.system_messages) == sorted([screener.system_prompt] * 4 + [scorer.system_prompt] * 4)
+    assert provider.response_format is None and provider.system_prompt == "You are a helpful assistant."
+
+
+def test_invalid_execution_mode():
+    schema = [{"round": "A", "reviewers": [_reviewer("R")], "text_inputs": ["title"]}]
+    with pytest.raises(ReviewWorkflowError):
+        asyncio.run(ReviewWorkflow(workflow_schema=schema, execution_mode="parallel", verbose=False)(_data()))
+
+
+def _two_round_schema(round_a_delay=0.0):
+    screener = _reviewer("Screener", delay=round_a_delay)
+    screener.provider.handler = lambda prompt: {"reasoning": "r", "evaluation": 1 if "title 1" in prompt else 5}
+    expert = _reviewer("Expert", 4)
+    return [
+        {"round": "A", "reviewers": [screener], "text_inputs": ["title"]},
+        {
+            "round": "B",
+            "reviewers": [expert],
+            "text_inputs": ["title", "abstract"],
+            "filter": lambda row: row["round-A_Screener_evaluation"] >= 4,
+        },
+    ]
+
+
+def test_pipelined_matches_sequential_results():
+    sequential = asyncio.run(ReviewWorkflow(workflow_schema=_two_round_schema(), verbose=False)(_data()))
+    pipelined = asyncio.run(
+        ReviewWorkflow(workflow_schema=_two_round_schema(), execution_mode="pipelined", verbose=False)(_data())
+    )
+    columns = ["round-A_Screener_evaluation", "round-B_Expert_evaluation", "round-B_Expert_reasoning"]
+    pd.testing.assert_frame_equal(sequential[columns].astype(object), pipelined[columns].astype(object))
+    assert pipelined["round-B_Expert_evaluation"].isna().tolist() == [False, True, False, False]
+
+
+def test_pipelined_starts_next_round_before_stragglers_finish():
+    schema = _two_round_schema(round_a_delay=lambda prompt: 0.3 if "title 3" in prompt else 0.0)
+    expert = schema[1]["reviewers"][0]
+    expert_call_times = []
+    expert.provider.handler = lambda prompt: expert_call_times.append(time.monotonic()) or {
+        "reasoning": "r",
+        "evaluation": 4,
+    }
+    workflow = ReviewWorkflow(workflow_schema=schema, execution_mode="pipelined", verbose=False)
+    started = time.monotonic()
+    asyncio.run(workflow(_data()))
+    assert len(expert_call_times) == 3
+    # Rows 0 and 2 reach round B while round A is still waiting on the straggler (row 3)
+    assert sorted(expert_call_times)[1] - started < 0.2
+    assert sorted(expert_call_times)[2] - started >= 0.3
+    assert workflow.reviewer_costs[("B", "Expert")] == pytest.approx(3 * 0.002)
+
+
+def _consensus_schema():
+    first = _reviewer("First")
+    second = _reviewer("Second")
+    # The two screeners disagree on "title 1" only, so only that item reaches the tie-breaker
+    second.provider.handler = lambda prompt: {"reasoning": "r", "evaluation": 1 if "title 1" in prompt else 5}
+    third = _reviewer("Third", 3)
+    rule = agreement_rule()
+    return [{"round": "A", "reviewers": [first, second, third], "text_inputs": ["title"], "consensus_rule": rule}]
+
+
+@pytest.mark.parametrize("execution_mode", ["sequential", "pipelined"])
+def test_consensus_rule_skips_remaining_reviewers(execution_mode):
+    schema = _consensus_schema()
+    workflow = ReviewWorkflow(workflow_schema=schema, execution_mode=execution_mode, verbose=False)
+    result = asyncio.run(workflow(_data(4)))
+    third = schema[0]["reviewers"][2]
+    assert len(third.provider.calls) == 1 and "title 1" in third.provider.calls[0]
+    assert workflow.consensus_calls_saved == {"A": 3}
+    assert result["round-A_Third_evaluation"].tolist()[1] == 3
+    assert result["round-A_Third_evaluation"].isna().tolist() == [True, False, True, True]
+
+
+def test_agreement_rule():
+    rule = agreement_rule(values=(5,))
+    assert rule([{"evaluation": 5}, {"evaluation": 5}])
+    assert not rule([{"evaluation": 5}])
+    assert not rule([{"evaluation": 1}, {"evaluation": 1}])
+    assert not rule([{"evaluation": 5}, {"evaluation": 4}])
+    assert agreement_rule(values=None)([{"evaluation": 3}, {"evaluation": 3}])
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.scheduler import (
+    AdaptiveConcurrencyLimiter,
+    RequestScheduler,
+    SchedulerError,
+    _TokenBucket,
+    endpoint_key,
+    is_overload_error,
+)
+from tests.fakes import StatusError, fake_reviewer
+
+
+def test_endpoint_key_hides_api_key():
+    key = endpoint_key("OpenAI", "https://api.openai.com/v1", "sk-secret")
+    assert "sk-secret" not in key
+    assert key == endpoint_key("OpenAI", "https://api.openai.com/v1", "sk-secret")
+    assert key != endpoint_key("OpenAI", "https://api.openai.com/v1", "sk-other")
+
+
+def test_configure_keeps_strictest_limit():
+    scheduler = RequestScheduler()
+    scheduler.configure("k", max_concurrent_requests=10, requests_per_minute=100)
+    limiter = scheduler.configure("k", max_concurrent_requests=4, requests_per_minute=500)
+    assert limiter.max_concurrent_requests == 4
+    assert limiter.requests_per_minute == 100
+
+
+def test_override_and_reset_raise_limits():
+    scheduler = RequestScheduler()
+    scheduler.configure("k", max_concurrent_requests=4, requests_per_minute=100)
+    limiter = scheduler.configure("k", max_concurrent_requests=8, override=True)
+    assert limiter.max_concurrent_requests == 8
+    assert limiter.requests_per_minute == 100
+    scheduler.reset("k")
+    assert scheduler.configure("k", requests_per_minute=500).requests_per_minute == 500
+    assert scheduler.limiter("k").max_concurrent_requests is None
+
+
+def test_configure_rejects_non_positive_limits():
+    with pytest.raises(SchedulerError):
+        RequestScheduler().configure("k", tokens_per_minute=0)
+
+
+def test_concurrency_limit_is_shared_across_callers():
+    scheduler = RequestScheduler()
+    scheduler.configure("shared", max_concurrent_requests=3)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with scheduler.slot("shared"):
+            peak = max(peak, scheduler.limiter("shared").in_flight)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        # Two "reviewers" with 10 requests each submit to the same endpoint
+        await asyncio.gather(*[request() for _ in range(20)])
+
+    asyncio.run(main())
+    assert peak == 3
+    assert scheduler.stats()["shared"]["total_requests"] == 20
+    assert scheduler.stats()["shared"]["in_flight"] == 0
+
+
+def test_scheduler_survives_multiple_event_loops():
+    scheduler = RequestScheduler()
+    scheduler.configure("k", max_concurrent_requests=1)
+
+    async def request():
+        async with scheduler.slot("k"):
+            await asyncio.sleep(0)
+
+    asyncio.run(request())
+    asyncio.run(request())
+    assert scheduler.limiter("k").total_requests == 2
+
+
+def test_token_bucket_wait_time():
+    bucket = _TokenBucket(per_minute=60)
+    assert bucket.wait_time(60) == 0
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(30)
+    assert bucket.wait_time(30) == 0
+
+
+def test_lease_settles_actual_tokens():
+    scheduler = RequestScheduler()
+    scheduler.configure("k", tokens_per_minute=1000)
+
+    async def main():
+        async with scheduler.slot("k", tokens=400) as lease:
+            lease.settle(100)
+
+    asyncio.run(main())
+    assert scheduler.limiter("k").total_tokens == 100
+
+
+def test_adaptive_limiter_grows_while_healthy():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=5)
+    for _ in range(20):
+        limiter.record_success(0.1)
+    assert limiter.window == 5
+    assert [entry["reason"] for entry in limiter.history].count("increase") == 3
+
+
+def test_adaptive_limiter_backs_off_once_per_burst():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+    started = time.monotonic()
+    limiter.record_failure(StatusError(429), started)
+    limiter.record_failure(StatusError(503), started)
+    assert limiter.window == 8
+    limiter.record_failure(ValueError("bad request"), time.monotonic())
+    assert limiter.window == 8
+    limiter.record_failure(asyncio.TimeoutError(), time.monotonic())
+    assert limiter.window == 4
+
+
+def test_overload_detection_follows_exception_chain():
+    try:
+        try:
+            raise StatusError(429)
+        except Exception as e:
+            raise RuntimeError(f"Error getting JSON response: {e}")
+    except RuntimeError as wrapped:
+        assert is_overload_error(wrapped)
+    assert not is_overload_error(StatusError(401))
+
+
+def test_adaptive_limiter_caps_in_flight_requests():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3, max_limit=3)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*[request() for _ in range(12)])
+
+    asyncio.run(main())
+    assert peak == 3
+
+
+def test_reviewer_reports_adaptive_window():
+    reviewer = fake_reviewer(
+        lambda prompt: {"reasoning": "ok", "evaluation": 5}, adaptive_concurrency=True, max_concurrent_requests=2
+    )
+    outputs, _ = asyncio.run(reviewer.review_items([f"item {i}" for i in range(30)]))
+    assert len(outputs) == 30
+    assert reviewer.concurrency_history[0] == {"elapsed_seconds": 0.0, "window": 2, "reason": "initial"}
+    assert reviewer.concurrency_history[-1]["window"] > 2
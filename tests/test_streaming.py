@@ -0,0 +1,74 @@
+import asyncio
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from tests.fakes import StatusError, fake_reviewer
+
+
+def _reviewer(handler=None, delay=0.0):
+    return fake_reviewer(handler or (lambda prompt: {"reasoning": prompt[-8:], "evaluation": 4}), delay=delay)
+
+
+async def _collect(stream):
+    return [result async for result in stream]
+
+
+def test_stream_from_sync_iterable():
+    reviewer = _reviewer()
+    results = asyncio.run(_collect(reviewer.astream_review_items([f"item {i}" for i in range(10)])))
+    assert sorted(index for index, _, _ in results) == list(range(10))
+    assert all(cost == 0.002 for _, _, cost in results)
+    assert len(reviewer.memory) == 10
+
+
+def test_stream_bounds_read_ahead_on_unbounded_feed():
+    consumed = []
+
+    def feed():
+        for i in itertools.count():
+            consumed.append(i)
+            yield f"item {i}"
+
+    async def main():
+        reviewer = _reviewer(delay=0.01)
+        stream = reviewer.astream_review_items(feed(), max_pending=3, keep_memory=False)
+        results = []
+        async for result in stream:
+            results.append(result)
+            if len(results) == 20:
+                break
+        await stream.aclose()
+        return reviewer, results
+
+    reviewer, results = asyncio.run(main())
+    assert len(consumed) <= 20 + 3 + 1
+    assert reviewer.memory == []
+
+
+def test_stream_yields_while_async_feed_is_quiet():
+    async def feed():
+        yield "first"
+        await asyncio.sleep(0.3)
+        yield "second"
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        arrivals = []
+        async for index, _, _ in _reviewer().astream_review_items(feed()):
+            arrivals.append((index, loop.time() - started))
+        return arrivals
+
+    arrivals = asyncio.run(main())
+    assert [index for index, _ in arrivals] == [0, 1]
+    assert arrivals[0][1] < 0.2
+
+
+def test_stream_reports_failures_in_place():
+    reviewer = _reviewer(lambda prompt: StatusError(401) if "bad" in prompt else {"reasoning": "ok", "evaluation": 1})
+    stream = reviewer.astream_review_items(["good", ("bad", [])])
+    results = {index: response for index, response, _ in asyncio.run(_collect(stream))}
+    assert results[1] is None and results[0] is not None
+    assert reviewer.failures[0]["index"] == 1
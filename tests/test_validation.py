@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lattereview.utils.retry import MALFORMED_RESPONSE, RetryPolicy
+from lattereview.utils.validation import (
+    ResponseValidationError,
+    repair_json,
+    response_format_model,
+    response_validator,
+    validate_response,
+)
+from lattereview.workflows import ReviewWorkflow
+from tests.fakes import fake_reviewer
+
+Screening = response_format_model({"reasoning": str, "evaluation": int})
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '```json\n{"reasoning": "ok", "evaluation": 2,}\n```',
+        'Here is my review: {"reasoning": "ok", "evaluation": 2} Let me know if you need more.',
+        "{'reasoning': 'ok', 'evaluation': 2}",
+        '{"reasoning": "ok", "evaluation": "2", "final": True}',
+    ],
+)
+def test_malformed_json_is_repaired_and_coerced(text):
+    assert validate_response(text, Screening) == {"reasoning": "ok", "evaluation": 2}
+
+
+def test_repair_keeps_string_contents():
+    repaired = repair_json("{'reasoning': 'it\\'s \"None\", {x},', 'evaluation': None}")
+    assert json.loads(repaired) == {"reasoning": 'it\'s "None", {x},', "evaluation": None}
+
+
+def test_unrecoverable_responses_raise():
+    for response in ("I cannot review this item.", '{"reasoning": "ok"}', '{"reasoning": "ok", "evaluation": "high"}'):
+        with pytest.raises(ResponseValidationError):
+            validate_response(response, Screening)
+
+
+def test_models_and_validators_are_built_once():
+    assert response_format_model({"reasoning": str, "evaluation": int}) is Screening
+    assert response_validator(Screening) is response_validator(Screening)
+
+
+def _reviewer(handler):
+    return fake_reviewer(handler, retry_policy=RetryPolicy(max_retries=2, base_delay=0))
+
+
+def test_repairable_responses_are_not_retried():
+    reviewer = _reviewer(lambda prompt: "```json\n{'reasoning': 'ok', 'evaluation': '4'}\n```")
+    outputs, _ = asyncio.run(reviewer.review_items(["only item"]))
+    assert outputs == ['{"reasoning": "ok", "evaluation": 4}']
+    assert len(reviewer.provider.calls) == 1
+
+
+def test_unrepairable_responses_are_retried():
+    answers = iter(["Sorry, I cannot answer.", '{"reasoning": "ok", "evaluation": 5}'])
+    reviewer = _reviewer(lambda prompt: next(answers))
+    outputs, _ = asyncio.run(reviewer.review_items(["only item"]))
+    assert outputs == ['{"reasoning": "ok", "evaluation": 5}']
+    assert len(reviewer.provider.calls) == 2
+
+    reviewer = _reviewer(lambda prompt: "Sorry, I cannot answer.")
+    outputs, _ = asyncio.run(reviewer.review_items(["only item"]))
+    assert outputs == [None] and reviewer.failures[0]["error_type"] == MALFORMED_RESPONSE
+
+
+def test_workflow_outputs_keep_the_reviewer_keys():
+    workflow = ReviewWorkflow(workflow_schema=[], verbose=False)
+    keywords = ["reasoning", "evaluation"]
+    assert workflow._process_output("not json at all", keywords) == {"reasoning": None, "evaluation": None}
+    assert workflow._process_output('{"reasoning": "ok", "evaluation": 1,}', keywords) == {
+        "reasoning": "ok",
+        "evaluation": 1,
+    }